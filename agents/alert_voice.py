@@ -0,0 +1,36 @@
+import asyncio
+from core.base import BaseAgent
+from core.state import PatientState
+
+class AlertVoiceAgent(BaseAgent):
+    """
+    Synthesizes the spoken version of executed staff alerts and patient
+    notifications for the dashboard. Runs alongside FeedbackAgent and leaves
+    URLs of the cached clips in `state.alert_audio`.
+    """
+    reads = ("executed_actions",)
+    writes = ("alert_audio",)
+
+    def __init__(self, voice_generator):
+        super().__init__("AlertVoiceAgent")
+        self.voice_generator = voice_generator
+
+    async def process(self, state: PatientState) -> PatientState:
+        vocal_messages = []
+        for action in state.executed_actions:
+            if action.get("type") in ["alert_staff", "notify_patient"]:
+                msg = action.get("message")
+                if msg and msg not in vocal_messages:
+                    vocal_messages.append(msg)
+
+        if not vocal_messages:
+            return state
+
+        # One clip per message: the fixed patient messages are then always cache hits
+        keys = await asyncio.gather(*(self.voice_generator.synthesize_async(msg) for msg in vocal_messages))
+        state.alert_audio = [self.voice_generator.audio_url(key) for key in keys if key]
+        if state.alert_audio:
+            self.log(state, f"Synthesized alert audio for {len(state.alert_audio)} messages.")
+        else:
+            self.log(state, "Voice gen error: no audio synthesized.")
+        return state
@@ -0,0 +1,22 @@
+import os
+from core.audit_store import DEFAULT_AUDIT_DB, AuditStore, entry_from_state
+from core.base import BaseAgent
+from core.state import PatientState
+
+class AuditAgent(BaseAgent):
+    """
+    Records the encounter's audit trail in the audit store (`<log_dir>/audit.db`
+    unless a store is given). Recording only queues the entry.
+    """
+    reads = ("session_id", "risk_level", "transcript", "symptoms", "reasoning",
+             "executed_actions", "response_text", "observations")
+    writes = ()
+
+    def __init__(self, log_dir: str = "logs", store: AuditStore = None):
+        super().__init__("AuditAgent")
+        self.log_dir = log_dir
+        self.store = store or AuditStore(os.path.join(log_dir, DEFAULT_AUDIT_DB))
+
+    async def process(self, state: PatientState) -> PatientState:
+        self.store.record(entry_from_state(state))
+        return state
@@ -1,25 +1,25 @@
-import re
+from typing import Optional
 from core.base import BaseAgent
+from core.lexicon import SymptomLexicon
 from core.state import PatientState
 
 class DetectorAgent(BaseAgent):
     """
     Identifies symptoms and patient intent from the transcript.
     """
-    def __init__(self):
+    reads = ("transcript",)
+    writes = ("symptoms", "intent")
+    memoize = True
+
+    def __init__(self, lexicon_path: Optional[str] = None):
         super().__init__("DetectorAgent")
-        # Synthetic symptom keywords for risk detection
-        self.symptom_keywords = {
-            "chest pain": "cardiac",
-            "shortness of breath": "respiratory",
-            "difficulty breathing": "respiratory",
-            "dizziness": "neurological",
-            "severe headache": "neurological",
-            "bleeding": "trauma",
-            "fever": "infection",
-            "cough": "respiratory",
-            "nausea": "gastrointestinal"
-        }
+        # Symptom terms, synonyms and negation cues, compiled once (see data/symptom_lexicon.json)
+        self.lexicon = SymptomLexicon.load(lexicon_path)
+
+    @property
+    def symptom_keywords(self) -> dict:
+        # Canonical symptom -> category
+        return self.lexicon.categories
 
     async def process(self, state: PatientState) -> PatientState:
         if not state.transcript:
@@ -28,13 +28,10 @@ class DetectorAgent(BaseAgent):
 
         text = state.transcript.lower()
         
-        # 1. Detect Symptoms
-        detected_symptoms = []
-        for symptom in self.symptom_keywords:
-            if re.search(rf"\b{symptom}\b", text):
-                detected_symptoms.append(symptom)
-        
-        state.symptoms = list(set(detected_symptoms))
+        # 1. Detect Symptoms (synonyms resolve to the canonical name; "no chest pain" is not a symptom)
+        matches = self.lexicon.match(text)
+        state.symptoms = list(dict.fromkeys(m.symptom for m in matches if not m.negated))
+        negated = [m.symptom for m in matches if m.negated and m.symptom not in state.symptoms]
         
         # 2. Detect Intent (Simple heuristic)
         if any(word in text for word in ["help", "emergency", "pain", "hurts"]):
@@ -45,4 +42,6 @@ class DetectorAgent(BaseAgent):
             state.intent = "General Communication"
 
         self.log(state, f"Detected Symptoms: {state.symptoms}, Intent: {state.intent}")
+        if negated:
+            self.log(state, f"Negated Symptoms: {negated}")
         return state
@@ -1,14 +1,29 @@
 import time
 from core.base import BaseAgent
+from core.metrics import LatencyWindow
 from core.state import PatientState
 
+ALERT_PRIORITIES = ["standard", "emergency"]
+
 class ExecutorAgent(BaseAgent):
     """
     Executes the deterministic actions planned by the PlannerAgent.
     In a real system, this would call APIs, send SMS, or trigger alarms.
+    Staff are paged at most once per session and priority within
+    `dedup_window_s`; repeats (or lower-priority follow-ups) are sent as
+    annotations to the open alert, while a higher priority still pages.
+    With `dry_run`, actions are recorded as "dry_run" and nothing is sent.
     """
-    def __init__(self):
+    reads = ("session_id", "planned_actions", "created_monotonic")
+    writes = ("executed_actions", "response_text")
+
+    def __init__(self, dedup_window_s: float = 120.0, dry_run: bool = False):
         super().__init__("ExecutorAgent")
+        self.dedup_window = dedup_window_s
+        self.dry_run = dry_run
+        # Transcript-to-page latency, by dispatch path ("fast" or "standard")
+        self.alert_latency = {}
+        self._paged = {}
 
     async def process(self, state: PatientState) -> PatientState:
         if not state.planned_actions:
@@ -19,26 +34,57 @@ class ExecutorAgent(BaseAgent):
             action_type = action.get("type")
             self.log(state, f"Executing: {action_type}...")
             
+            # Record execution
+            executed = action.copy()
+            executed["status"] = "success"
+
             # Simulate side effects
-            if action_type == "alert_staff":
-                self._send_staff_alert(action)
+            if self.dry_run:
+                executed["status"] = "dry_run"
+                if action_type == "notify_patient":
+                    state.response_text = action.get("message")
+            elif action_type == "alert_staff":
+                if self._already_paged(state.session_id, action):
+                    self._send_alert_annotation(action)
+                    executed["status"] = "deduplicated"
+                else:
+                    self._send_staff_alert(action)
+                    latency = time.monotonic() - state.created_monotonic
+                    path = action.get("path", "standard")
+                    self.alert_latency.setdefault(path, LatencyWindow()).observe(latency)
+                    executed["alert_latency_ms"] = round(latency * 1000, 1)
             elif action_type == "notify_patient":
                 self._send_patient_notification(action)
                 state.response_text = action.get("message")
             
-            # Record execution
-            executed = action.copy()
-            executed["status"] = "success"
             executed["executed_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
             state.executed_actions.append(executed)
 
         self.log(state, f"Successfully executed {len(state.executed_actions)} actions.")
         return state
 
+    def _already_paged(self, session_id: str, action) -> bool:
+        now = time.monotonic()
+        for key in [k for k, sent_at in self._paged.items() if now - sent_at > self.dedup_window]:
+            del self._paged[key]
+
+        priority = action.get("priority")
+        rank = ALERT_PRIORITIES.index(priority) if priority in ALERT_PRIORITIES else 0
+        # An alert at the same or a higher priority already covers this one
+        for paged_priority in ALERT_PRIORITIES[rank:]:
+            if (session_id, paged_priority) in self._paged:
+                return True
+        self._paged[(session_id, priority)] = now
+        return False
+
     def _send_staff_alert(self, action):
         # Placeholder for actual alerting service (e.g., PagerDuty, Twilio, Hospital Dashboard)
         print(f">>> [SYSTEM ALERT] Target: {action['target']} | Priority: {action['priority']} | Message: {action['message']}")
 
+    def _send_alert_annotation(self, action):
+        # Updates the open alert instead of paging again
+        print(f">>> [ALERT UPDATE] Target: {action['target']} | Message: {action['message']}")
+
     def _send_patient_notification(self, action):
         # Placeholder for Text-to-Speech or Voice Response
         print(f">>> [PATIENT MESSAGE] {action['message']}")
@@ -1,20 +1,19 @@
-import pyttsx3
 from core.base import BaseAgent
+from core.speech import SpeechWorker
 from core.state import PatientState
 
 class FeedbackAgent(BaseAgent):
     """
     Feedback & Observation Agent.
-    Responds to the patient using synthesized voice.
+    Responds to the patient using synthesized voice. Speech is queued on a
+    SpeechWorker, so the pipeline never waits for the sentence to be spoken.
     """
-    def __init__(self, rate=150):
+    reads = ("risk_level", "response_text")
+    writes = ("response_text", "observations")
+
+    def __init__(self, rate=150, speak: bool = True):
         super().__init__("FeedbackAgent")
-        try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty('rate', rate)
-        except Exception as e:
-            print(f"Failed to initialize TTS engine: {e}")
-            self.engine = None
+        self.speech = SpeechWorker(rate) if speak else None
 
     async def process(self, state: PatientState) -> PatientState:
         if not state.response_text:
@@ -26,12 +25,8 @@ class FeedbackAgent(BaseAgent):
 
         self.log(state, f"Responding: \"{state.response_text}\"")
         
-        if self.engine:
-            try:
-                self.engine.say(state.response_text)
-                self.engine.runAndWait()
-            except Exception as e:
-                self.log(state, f"TTS Error: {str(e)}")
+        if self.speech and not self.speech.failed:
+            self.speech.say(state.session_id, state.response_text, state.risk_level)
         else:
             self.log(state, "TTS skipped - Engine not initialized.")
 
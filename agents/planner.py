@@ -1,55 +1,103 @@
+import asyncio
+from typing import List, Optional
 from core.base import BaseAgent
+from core.decision_table import DecisionTable
 from core.state import PatientState
 
+# Fixed patient-facing messages; their speech is precomputed at server startup
+PATIENT_MESSAGES = {
+    "assistance": "Assistant: I have received your request and notified the clinical staff. Help is on the way.",
+    "logged": "Assistant: Thank you for your input. I have logged your status for the medical team.",
+    "alerted": "Assistant: Clinicians have been alerted. Please stay calm.",
+}
+
+# Used when the rules file is missing or unreadable (same rules as data/planner_rules.json)
+BUILTIN_RULES = {
+    "groups": [
+        {"name": "staff_alert", "rules": [
+            # High/Critical Risk -> Immediate Nurse/Doctor Alert
+            {"name": "urgent", "when": {"risk_level": ["High", "Critical"]},
+             "action": {"type": "alert_staff", "priority": "emergency", "target": "Nurse Station",
+                        "message": "CRITICAL: Patient session {session_id} - {reasoning}"},
+             "human_in_the_loop": True},
+            # Symptoms detected but lower risk -> Scheduled Check-in
+            {"name": "observation", "when": {"risk_level": ["Moderate"]},
+             "action": {"type": "alert_staff", "priority": "standard", "target": "Assigned Nurse",
+                        "message": "Observation: Patient session {session_id} reports {symptoms}."}},
+        ]},
+        {"name": "patient_notice", "rules": [
+            # Patient Intent is a Request -> Notification
+            {"name": "assistance", "when": {"intent": ["Requesting Assistance"]},
+             "action": {"type": "notify_patient", "message": PATIENT_MESSAGES["assistance"]}},
+            {"name": "logged", "when": {"risk_level": ["Low"]},
+             "action": {"type": "notify_patient", "message": PATIENT_MESSAGES["logged"]}},
+            {"name": "alerted",
+             "action": {"type": "notify_patient", "message": PATIENT_MESSAGES["alerted"]}},
+        ]},
+    ]
+}
+
 class PlannerAgent(BaseAgent):
     """
     Deterministic rule-based planning for action execution.
-    Converts risk level and intent into a set of planned actions.
+    Converts risk level and intent into a set of planned actions using a
+    decision table (see data/planner_rules.json), compiled once.
+    With `batched`, states planned concurrently on one event loop (e.g. the
+    records of a batch.py chunk) are collected until the loop's next turn
+    and planned together by `plan_batch`, the vectorized lookup.
     """
-    def __init__(self):
+    reads = ("session_id", "risk_level", "intent", "symptoms", "reasoning")
+    writes = ("planned_actions", "human_in_the_loop_required")
+    memoize = True
+
+    def __init__(self, rules_path: Optional[str] = None, batched: bool = False):
         super().__init__("PlannerAgent")
+        self.rules = DecisionTable.load(rules_path, fallback=BUILTIN_RULES)
+        self.batched = batched
+        # (state, future) waiting for the next plan_batch call
+        self._pending = []
+
+    def apply(self, state: PatientState, actions: list, human_in_the_loop: bool) -> PatientState:
+        state.planned_actions = actions
+        if human_in_the_loop:
+            state.human_in_the_loop_required = True
+        return state
+
+    def plan_batch(self, states: List[PatientState]) -> List[PatientState]:
+        """
+        Plans many states in one call (e.g. batch re-scoring); same result as `process` on each.
+        """
+        for state, (actions, human_in_the_loop) in zip(states, self.rules.plan_batch(states)):
+            self.apply(state, actions, human_in_the_loop)
+        return states
+
+    async def _plan_batched(self, state: PatientState):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append((state, future))
+        return await future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        try:
+            decisions = self.rules.plan_batch([state for state, _ in pending])
+        except Exception as e:
+            decisions = None
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+        for (_, future), decision in zip(pending, decisions or ()):
+            if not future.done():
+                future.set_result(decision)
 
     async def process(self, state: PatientState) -> PatientState:
         self.log(state, "Determining action plan based on risk and reasoning...")
-        
-        actions = []
-        
-        # Rule 1: High/Critical Risk -> Immediate Nurse/Doctor Alert
-        if state.risk_level in ["High", "Critical"]:
-            actions.append({
-                "type": "alert_staff",
-                "priority": "emergency",
-                "target": "Nurse Station",
-                "message": f"CRITICAL: Patient session {state.session_id} - {state.reasoning}"
-            })
-            state.human_in_the_loop_required = True
-        
-        # Rule 2: Symptoms detected but low risk -> Scheduled Check-in
-        elif state.risk_level == "Moderate":
-            actions.append({
-                "type": "alert_staff",
-                "priority": "standard",
-                "target": "Assigned Nurse",
-                "message": f"Observation: Patient session {state.session_id} reports {', '.join(state.symptoms)}."
-            })
-
-        # Rule 3: Patient Intent is a Request -> Notification
-        if state.intent == "Requesting Assistance":
-            actions.append({
-                "type": "notify_patient",
-                "message": "Assistant: I have received your request and notified the clinical staff. Help is on the way."
-            })
-        elif state.risk_level == "Low":
-            actions.append({
-                "type": "notify_patient",
-                "message": "Assistant: Thank you for your input. I have logged your status for the medical team."
-            })
+        if self.batched:
+            actions, human_in_the_loop = await self._plan_batched(state)
         else:
-            actions.append({
-                "type": "notify_patient",
-                "message": "Assistant: Clinicians have been alerted. Please stay calm."
-            })
-
-        state.planned_actions = actions
+            actions, human_in_the_loop = self.rules.plan(state)
+        self.apply(state, actions, human_in_the_loop)
         self.log(state, f"Planned {len(actions)} actions.")
         return state
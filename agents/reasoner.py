@@ -1,18 +1,111 @@
+import asyncio
+import contextlib
+import hashlib
+import re
+import time
 try:
     import ollama
 except ImportError:
     ollama = None
+from core.admission import AdmissionController, LoadShed, is_urgent, priority_class
 from core.base import BaseAgent
+from core.cache import AsyncResultCache
+from core.metrics import ERRORS, OLLAMA_SECONDS, LatencyWindow
 from core.state import PatientState
 
+RISK_LEVELS = ["Low", "Moderate", "High", "Critical"]
+
+# Symptoms that are Critical by rule, whatever the LLM says
+CRITICAL_SYMPTOMS = {"chest pain", "difficulty breathing"}
+
+# Disfluencies that live partial transcripts add without changing meaning
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "hmm", "ah"}
+
 class ReasonerAgent(BaseAgent):
     """
     LLM-based reasoning for patient risk assessment.
     STRICT CONSTRAINTS: NO diagnosis, NO treatment suggestions.
+    The LLM gets `latency_budget_s` to answer. Past that, the rule-based
+    assessment is committed and a late LLM answer is handed to
+    `on_late_assessment` so it can still upgrade the reasoning; when it
+    raises the risk level, `on_late_escalation` runs first (the orchestrator
+    plans and executes again, so the escalation pages staff).
+    With an `admission` controller, LLM requests wait for a slot by priority
+    (urgent sessions and final transcripts first); a shed live request gets
+    the rule-based assessment.
     """
-    def __init__(self, model_name: str = "llama3"):
+    reads = ("transcript", "symptoms")
+    writes = ("risk_level", "reasoning")
+    # Skipped when the prompt fingerprint is unchanged; fallbacks are never reused
+    memoize = True
+
+    def __init__(self, model_name: str = "llama3", cache_size: int = 512, cache_ttl_s: float = 300.0,
+                 latency_budget_s: float = 4.0, keep_alive: str = "30m", host: str = None,
+                 request_timeout_s: float = 120.0, admission: AdmissionController = None):
         super().__init__("ReasonerAgent")
+        self.admission = admission
         self.model_name = model_name
+        self.latency_budget = latency_budget_s
+        self.keep_alive = keep_alive
+        self.host = host
+        self.request_timeout = request_timeout_s
+        # Assessments keyed on a normalized prompt fingerprint
+        self.cache = AsyncResultCache(max_entries=cache_size, ttl_s=cache_ttl_s)
+        # Optional coroutine(state) called when a late LLM answer updates a state
+        self.on_late_assessment = None
+        # Optional coroutine(state) called first when that answer raised the risk level
+        self.on_late_escalation = None
+
+        self._client = None
+        self._latency = {}
+        self._assessments = {}
+        self._fallbacks = {}
+
+    @property
+    def client(self):
+        # One long-lived client: its HTTP connection pool is reused across calls
+        if self._client is None:
+            self._client = ollama.AsyncClient(host=self.host, timeout=self.request_timeout)
+        return self._client
+
+    def fingerprint(self, state: PatientState) -> str:
+        words = re.findall(r"[a-z0-9']+", (state.transcript or "").lower())
+        normalized = " ".join(w for w in words if w not in FILLER_WORDS)
+        symptoms = ",".join(sorted(set(state.symptoms)))
+        return hashlib.sha1(f"{self.model_name}|{normalized}|{symptoms}".encode("utf-8")).hexdigest()
+
+    def input_fingerprint(self, state: PatientState) -> str:
+        # Filler words added to a live transcript don't change the assessment
+        return self.fingerprint(state)
+
+    def stats(self) -> dict:
+        """
+        Per-model LLM latency and fallback rate.
+        """
+        return {
+            model: {
+                **self._latency[model].summary(),
+                "assessments": self._assessments.get(model, 0),
+                "fallbacks": self._fallbacks.get(model, 0),
+                "fallback_rate": round(self._fallbacks.get(model, 0) / self._assessments[model], 3)
+                if self._assessments.get(model) else 0.0
+            }
+            for model in self._latency
+        }
+
+    async def warm_up(self) -> bool:
+        """
+        Loads the model into Ollama's memory and pins it for `keep_alive`.
+        Returns whether the model is loaded.
+        """
+        if ollama is None or not self.model_name:
+            return False
+        try:
+            await self.client.generate(model=self.model_name, prompt="", keep_alive=self.keep_alive)
+            return True
+        except Exception as e:
+            print(f"Ollama warm-up failed: {e}")
+            return False
 
     async def process(self, state: PatientState) -> PatientState:
         if not state.symptoms and not state.transcript:
@@ -20,6 +113,112 @@ class ReasonerAgent(BaseAgent):
             state.risk_level = "Low"
             return state
 
+        if not self.model_name:
+            # Rules-only mode (e.g. batch back-testing of rule changes)
+            self._apply_rules(state)
+            self.log(state, f"No LLM configured. Rule-based Risk Level: {state.risk_level}")
+            return state
+
+        self._latency.setdefault(self.model_name, LatencyWindow())
+        self._assessments[self.model_name] = self._assessments.get(self.model_name, 0) + 1
+
+        try:
+            if ollama is None:
+                raise ImportError("Ollama library missing")
+            
+            key = self.fingerprint(state)
+            lookup = asyncio.ensure_future(self.cache.get_or_compute(key, lambda: self._assess(state),
+                                                                     retry_on=(LoadShed,)))
+            try:
+                (risk_level, reasoning), source = await asyncio.wait_for(asyncio.shield(lookup), self.latency_budget)
+            except asyncio.CancelledError:
+                # The run was superseded (e.g. by a final transcript)
+                self._abandon(lookup, key)
+                raise
+            except asyncio.TimeoutError:
+                self._count_fallback()
+                self.log(state, f"{self.model_name} exceeded {self.latency_budget:.1f}s budget. Committing rule-based assessment.")
+                self._apply_rules(state)
+                self._forget_inputs(state)
+                lookup.add_done_callback(lambda task: self._on_late(task, state))
+                return state
+
+            if risk_level:
+                state.risk_level = risk_level
+            state.reasoning = reasoning
+
+            if source == "miss":
+                self.log(state, f"Reasoning Complete. Risk Level: {state.risk_level}")
+            else:
+                label = "cached" if source == "hit" else "in-flight"
+                self.log(state, f"Reused {label} assessment for identical input. Risk Level: {state.risk_level}")
+        
+        except LoadShed:
+            self._count_fallback()
+            self.log(state, f"{self.model_name} saturated; committing rule-based assessment for this live update.")
+            self._apply_rules(state)
+            self._forget_inputs(state)
+
+        except Exception as e:
+            self._count_fallback()
+            ERRORS.inc("ollama")
+            self.log(state, f"Ollama connection error: {str(e)}. Falling back to rule-based safety.")
+            self._apply_rules(state)
+            self._forget_inputs(state)
+
+        return state
+
+    def _count_fallback(self):
+        self._fallbacks[self.model_name] = self._fallbacks.get(self.model_name, 0) + 1
+
+    def _abandon(self, lookup: asyncio.Future, key: str):
+        """
+        Stops waiting for the LLM on behalf of a cancelled run. The cache
+        cancels the pending Ollama request unless another run shares it.
+        """
+        # Retrieve the outcome so a failure isn't reported as unhandled
+        lookup.add_done_callback(lambda task: task.cancelled() or task.exception())
+        lookup.cancel()
+
+    def _forget_inputs(self, state: PatientState):
+        # The next run asks the LLM again instead of reusing this rule-based assessment
+        state.stage_inputs.pop(self.name, None)
+
+    @staticmethod
+    def is_rule_critical(state: PatientState) -> bool:
+        return any(symptom in CRITICAL_SYMPTOMS for symptom in state.symptoms)
+
+    def _apply_rules(self, state: PatientState):
+        # Safety fallback
+        if self.is_rule_critical(state):
+            state.risk_level = "Critical"
+            state.reasoning = "Rule-based fallback: High-risk symptoms detected."
+        else:
+            state.risk_level = "Moderate" if state.symptoms else "Low"
+            state.reasoning = "Rule-based fallback used."
+
+    def _on_late(self, task, state: PatientState):
+        if task.cancelled() or task.exception() is not None:
+            return
+        (risk_level, reasoning), _ = task.result()
+        # A late answer may escalate the committed risk level but never lower it
+        escalated = bool(risk_level) and RISK_LEVELS.index(risk_level) > RISK_LEVELS.index(state.risk_level)
+        if escalated:
+            state.risk_level = risk_level
+        state.reasoning = reasoning
+        self.log(state, f"Late {self.model_name} assessment arrived. Risk Level: {state.risk_level}")
+        asyncio.ensure_future(self._after_late(state, escalated))
+
+    async def _after_late(self, state: PatientState, escalated: bool):
+        if escalated and self.on_late_escalation:
+            try:
+                await self.on_late_escalation(state)
+            except Exception as e:
+                print(f"Acting on late escalation failed: {e}")
+        if self.on_late_assessment:
+            await self.on_late_assessment(state)
+
+    async def _assess(self, state: PatientState):
         prompt = f"""
         TASK: Assess patient risk level based on the following input.
         CONSTRAINTS: 
@@ -37,40 +236,28 @@ class ReasonerAgent(BaseAgent):
         Reasoning: [Explanation]
         """
 
-        try:
-            if ollama is None:
-                raise ImportError("Ollama library missing")
-            
-            self.log(state, f"Involving {self.model_name} for risk reasoning...")
-            
-            # Use AsyncClient to prevent blocking the event loop
-            client = ollama.AsyncClient()
-            response = await client.generate(model=self.model_name, prompt=prompt)
-            output = response['response']
-            
-            # Basic parsing of the LLM output
-            if "Risk Level:" in output:
-                risk_part = output.split("Risk Level:")[1].split("\n")[0].strip().capitalize()
-                for level in ["Low", "Moderate", "High", "Critical"]:
-                    if level in risk_part:
-                        state.risk_level = level
-                        break
-            
-            if "Reasoning:" in output:
-                state.reasoning = output.split("Reasoning:")[1].strip()
-            else:
-                state.reasoning = output.strip()
-
-            self.log(state, f"Reasoning Complete. Risk Level: {state.risk_level}")
+        self.log(state, f"Involving {self.model_name} for risk reasoning...")
         
-        except Exception as e:
-            self.log(state, f"Ollama connection error: {str(e)}. Falling back to rule-based safety.")
-            # Safety fallback
-            if "chest pain" in state.symptoms or "difficulty breathing" in state.symptoms:
-                state.risk_level = "Critical"
-                state.reasoning = "Rule-based fallback: High-risk symptoms detected."
-            else:
-                state.risk_level = "Moderate" if state.symptoms else "Low"
-                state.reasoning = "Rule-based fallback used."
-
-        return state
+        priority = priority_class(is_urgent(state) or self.is_rule_critical(state), not state.is_partial)
+        async with self.admission.slot(priority) if self.admission else contextlib.nullcontext():
+            start = time.monotonic()
+            response = await self.client.generate(model=self.model_name, prompt=prompt, keep_alive=self.keep_alive)
+            elapsed = time.monotonic() - start
+        self._latency[self.model_name].observe(elapsed)
+        OLLAMA_SECONDS.observe(elapsed, self.model_name)
+        output = response['response']
+        
+        # Basic parsing of the LLM output
+        risk_level = None
+        if "Risk Level:" in output:
+            risk_part = output.split("Risk Level:")[1].split("\n")[0].strip().capitalize()
+            for level in RISK_LEVELS:
+                if level in risk_part:
+                    risk_level = level
+                    break
+        
+        if "Reasoning:" in output:
+            reasoning = output.split("Reasoning:")[1].strip()
+        else:
+            reasoning = output.strip()
+        return risk_level, reasoning
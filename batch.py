@@ -0,0 +1,199 @@
+"""
+Offline batch scoring: runs historical encounters through HospitalOrchestrator.
+
+    python batch.py encounters.jsonl -o scored.jsonl
+    python batch.py encounters.csv -o scored.jsonl --rules-only --workers 8
+    python batch.py recordings/ -o scored.jsonl --whisper-model base
+
+Input is a JSONL or CSV file of records with a `transcript` (or `text`) and
+optionally `id`, `session_id` and `audio_path` columns, or a directory of
+audio files. Records are scored in a process pool, each worker holding one
+orchestrator and, for audio, one Whisper model. Staff alerts and speech are
+disabled (actions are recorded as "dry_run"). Results are written as JSONL in
+input order as they complete; at most `--workers * 2` chunks are in flight, so
+memory stays bounded whatever the input size.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg", ".oga", ".webm", ".flac"}
+
+# Per-worker state, created once by _init_worker
+_orchestrator = None
+_transcriber = None
+# One Whisper call at a time per worker: the model is not thread-safe, and its
+# torch threads are this worker's share of the cores
+_transcribe_lock = None
+_loop = None
+_options = {}
+
+
+def read_records(path: str):
+    """
+    Yields input records as dicts without loading the whole input.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+                yield {"id": os.path.splitext(name)[0], "audio_path": os.path.join(path, name)}
+        return
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size: int):
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(options: dict):
+    global _orchestrator, _loop, _options, _transcribe_lock
+    _options = options
+    if not options["verbose"]:
+        # Agents print every step; thousands of records would flood the terminal
+        sys.stdout = open(os.devnull, "w")
+
+    from core.orchestrator import HospitalOrchestrator
+    _orchestrator = HospitalOrchestrator(
+        ollama_model=None if options["rules_only"] else options["ollama_model"],
+        reasoning_budget_s=options["reasoning_budget_s"],
+        audit_dir=None,
+        dry_run=True,
+        # A chunk's records are scored concurrently; plan them in one vectorized lookup
+        batch_planning=True,
+    )
+    _loop = asyncio.new_event_loop()
+    _transcribe_lock = asyncio.Lock()
+    if options["audio"]:
+        _get_transcriber()
+
+
+def _get_transcriber():
+    global _transcriber
+    if _transcriber is None:
+        try:
+            import torch
+            # Split the cores between workers instead of every worker using all of them
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // _options["workers"]))
+        except ImportError:
+            pass
+        from core.transcriber import WhisperTranscriber
+        _transcriber = WhisperTranscriber(model_size=_options["whisper_model"])
+    return _transcriber
+
+
+async def _score(index: int, record: dict) -> dict:
+    from core.state import PatientState
+
+    record_id = record.get("id") or record.get("session_id") or str(index)
+    try:
+        transcript = record.get("transcript") or record.get("text")
+        if not transcript and record.get("audio_path"):
+            with open(record["audio_path"], "rb") as f:
+                audio = f.read()
+            try:
+                async with _transcribe_lock:
+                    transcript = await asyncio.to_thread(_get_transcriber().transcribe, audio, raise_errors=True)
+            except Exception as e:
+                # Nothing to score: the record gets an error, not a risk level for the error message
+                return {"id": record_id, "error": f"Transcription failed: {e}"}
+
+        state = PatientState(session_id=str(record.get("session_id") or record_id), transcript=transcript or None)
+        state = await _orchestrator.run_pipeline(state)
+        result = state.to_dict()
+        if not _options["include_logs"]:
+            del result["agent_logs"]
+        return {"id": record_id, **result}
+    except Exception as e:
+        return {"id": record_id, "error": str(e)}
+
+
+def score_chunk(start: int, records: list) -> list:
+    """
+    Scores one chunk in the worker; records within a chunk run concurrently,
+    except for transcription, which runs one record at a time.
+    """
+    async def run():
+        return await asyncio.gather(*(_score(start + i, r) for i, r in enumerate(records)))
+    return _loop.run_until_complete(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file, or a directory of audio files")
+    parser.add_argument("-o", "--output", required=True, help="Output JSONL file ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--ollama-model", default="llama3")
+    parser.add_argument("--rules-only", action="store_true", help="Skip the LLM; score with the rule-based assessment")
+    parser.add_argument("--reasoning-budget-s", type=float, default=None,
+                        help="Seconds to wait for the LLM before falling back to rules (default: wait)")
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--include-logs", action="store_true", help="Keep agent_logs in the output")
+    parser.add_argument("--verbose", action="store_true", help="Show agent output from the workers")
+    args = parser.parse_args()
+
+    options = {
+        "workers": args.workers,
+        "ollama_model": args.ollama_model,
+        "rules_only": args.rules_only,
+        "reasoning_budget_s": args.reasoning_budget_s,
+        "whisper_model": args.whisper_model,
+        "audio": os.path.isdir(args.input),
+        "include_logs": args.include_logs,
+        "verbose": args.verbose,
+    }
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    written = errors = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(options,)) as pool:
+            pending = deque()
+
+            def drain_one():
+                nonlocal written, errors
+                for result in pending.popleft().result():
+                    errors += "error" in result
+                    out.write(json.dumps(result, default=str) + "\n")
+                    written += 1
+                out.flush()
+                rate = written / (time.perf_counter() - started) * 60
+                print(f"\rScored {written} records ({rate:.0f}/min, {errors} errors)", end="", file=sys.stderr)
+
+            start = 0
+            for chunk in chunked(read_records(args.input), args.chunk_size):
+                if len(pending) >= args.workers * 2:
+                    drain_one()
+                pending.append(pool.submit(score_chunk, start, chunk))
+                start += len(chunk)
+            while pending:
+                drain_one()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nDone: {written} records in {elapsed:.1f}s ({errors} errors).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
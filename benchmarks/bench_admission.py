@@ -0,0 +1,141 @@
+"""
+Admission control under a surge: a burst of routine requests (final and
+live partial) to the LLM and to Whisper, with a few urgent sessions
+arriving in the middle of it. Compares the previous behaviour (every
+request goes straight to the model, which serves them first come first
+served) with priority admission (core/admission.py).
+
+    python benchmarks/bench_admission.py --routine 48 --partials 48 --urgent 4 --ollama-parallel 4
+
+Reports latency per request class (LLM: pipeline run until the risk
+assessment; Whisper: the transcription call), requests shed and the
+admission counters per class.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SAMPLE_RATE, ToneVocabulary
+from benchmarks.harness import summarize, write_report
+from benchmarks.stubs import LATENCY, StubLatency, StubTranscriber, install_stubs
+
+MODES = ("fifo", "priority")
+ROUTINE = "When is my medication due, I asked about dose {i}"
+URGENT = "Help, I have crushing chest pain, call {i}"
+
+
+async def surge(args, submit) -> dict:
+    """
+    Fires the routine burst, then the urgent requests; `submit(kind, i)` runs one
+    request and returns False if it was shed. Returns latencies (ms) per kind.
+    """
+    latencies = {"routine_partial": [], "routine_final": [], "urgent_final": []}
+    shed = {kind: 0 for kind in latencies}
+
+    async def one(kind, i):
+        start = time.perf_counter()
+        if await submit(kind, i):
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+        else:
+            shed[kind] += 1
+
+    tasks = []
+    for i in range(max(args.routine, args.partials)):
+        if i < args.routine:
+            tasks.append(asyncio.create_task(one("routine_final", i)))
+        if i < args.partials:
+            tasks.append(asyncio.create_task(one("routine_partial", i)))
+    await asyncio.sleep(args.urgent_after_ms / 1000)
+    tasks.extend(asyncio.create_task(one("urgent_final", i)) for i in range(args.urgent))
+    await asyncio.gather(*tasks)
+    return {kind: {**summarize(samples), "shed": shed[kind]} for kind, samples in latencies.items()}
+
+
+async def run_llm(mode: str, args) -> dict:
+    from core.admission import AdmissionController
+    from core.orchestrator import HospitalOrchestrator
+    from core.state import PatientState
+
+    admission = AdmissionController("ollama", args.ollama_parallel, args.max_queue) if mode == "priority" else None
+    # Without admission control the (stub) Ollama server queues requests itself, first come first served
+    LATENCY.ollama_parallel = 0 if admission else args.ollama_parallel
+    orchestrator = HospitalOrchestrator(audit_dir=None, dry_run=True, llm_admission=admission,
+                                        reasoning_budget_s=args.reasoning_budget_s)
+
+    async def submit(kind, i):
+        # Distinct prompts, so no request shares another's LLM call through the cache
+        text = (URGENT if kind.startswith("urgent") else ROUTINE).format(i=f"{kind} {i}")
+        state = PatientState(session_id=f"{kind}-{i}", transcript=text, is_partial=kind.endswith("partial"))
+        await orchestrator.run_pipeline(state, max_agents=2)
+        # A shed live request is assessed by rule; so is a request that exceeded the budget
+        return not any("saturated" in entry["message"] for entry in state.agent_logs)
+
+    result = await surge(args, submit)
+    result["admission"] = admission.stats if admission else None
+    return result
+
+
+async def run_whisper(mode: str, args) -> dict:
+    from core.admission import AdmissionController, LoadShed
+    from core.inference import InferenceService
+
+    admission = AdmissionController("whisper", args.whisper_batch, args.max_queue) if mode == "priority" \
+        else AdmissionController("whisper", 1 << 30)
+    service = InferenceService(StubTranscriber(ToneVocabulary([])), max_batch=args.whisper_batch,
+                               admission=admission)
+    window = np.zeros(int(args.window_s * SAMPLE_RATE), dtype=np.float32)
+
+    async def submit(kind, i):
+        try:
+            # The previous behaviour had no priority classes: everything is one class, served in order
+            await service.transcribe_segments(window, priority=kind if mode == "priority" else "routine_final")
+            return True
+        except LoadShed:
+            return False
+
+    result = await surge(args, submit)
+    service.close()
+    result["admission"] = admission.stats if mode == "priority" else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routine", type=int, default=48, help="Routine final requests in the burst")
+    parser.add_argument("--partials", type=int, default=48, help="Routine live partial requests in the burst")
+    parser.add_argument("--urgent", type=int, default=4)
+    parser.add_argument("--urgent-after-ms", type=float, default=100)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--ollama-ms", type=float, default=250)
+    parser.add_argument("--ollama-parallel", type=int, default=4)
+    parser.add_argument("--reasoning-budget-s", type=float, default=30.0)
+    parser.add_argument("--whisper-ms", type=float, default=50)
+    parser.add_argument("--whisper-batch", type=int, default=8)
+    parser.add_argument("--window-s", type=float, default=4.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    install_stubs(StubLatency(ollama_s=args.ollama_ms / 1000, whisper_s=args.whisper_ms / 1000,
+                              ollama_parallel=args.ollama_parallel))
+
+    import builtins
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        results = []
+        for mode in MODES:
+            results.append({"resource": "ollama", "mode": mode, **asyncio.run(run_llm(mode, args))})
+            results.append({"resource": "whisper", "mode": mode, **asyncio.run(run_whisper(mode, args))})
+    finally:
+        builtins.print = real_print
+    write_report("admission", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Audit trail: the previous one-text-file-per-session writer against the
+SQLite audit store, for writes and for the queries a reviewer runs.
+
+    python benchmarks/bench_audit.py --entries 20000 --sessions 2000
+
+Writes: entries per second and the time the caller spends per entry (the
+old writer's thread hop plus file write; the store's `record` call), then
+the wall time until the last entry is written. Queries: one session's history,
+critical encounters in a one-hour window and counts by risk level, by
+scanning and parsing the text files against indexed lookups.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import summarize, write_report
+from core.audit_store import AuditStore, parse_text_log
+from core.lexicon import BUILTIN_LEXICON
+
+RISK_LEVELS = ["Low", "Moderate", "High", "Critical"]
+DAY_S = 24 * 3600
+
+
+def build_entries(count: int, sessions: int, rng: random.Random, start: float) -> list:
+    symptoms = [entry["name"] for entry in BUILTIN_LEXICON["symptoms"]]
+    entries = []
+    for i in range(count):
+        recorded_at = start + i * DAY_S / count
+        timestamp = datetime.fromtimestamp(recorded_at).isoformat()
+        entries.append({
+            "session_id": f"s{rng.randrange(sessions):05d}",
+            "recorded_at": recorded_at,
+            "risk_level": rng.choices(RISK_LEVELS, weights=(60, 25, 10, 5))[0],
+            "transcript": "I have had chest pain since this morning and feel dizzy",
+            "symptoms": rng.sample(symptoms, rng.randint(0, 3)),
+            "reasoning": "Reported chest pain with dizziness.",
+            "response_text": "Your report has been logged.",
+            "actions": [{"type": "notify_patient", "message": "Your report has been logged."}],
+            "observations": [],
+            "logs": [{"timestamp": timestamp, "agent": agent, "message": "done"}
+                     for agent in ("DetectorAgent", "ReasonerAgent", "PlannerAgent", "ExecutorAgent")],
+        })
+    return entries
+
+
+def text_log(entry: dict) -> str:
+    """
+    The file the previous AuditAgent wrote.
+    """
+    lines = [
+        f"Session: {entry['session_id']}",
+        f"Risk Level: {entry['risk_level']}",
+        f"Transcript: {entry['transcript']}",
+        f"Symptoms: {entry['symptoms']}",
+        f"Reasoning: {entry['reasoning']}",
+        "Logs:",
+    ]
+    lines.extend(f" - [{e['timestamp']}] {e['agent']}: {e['message']}" for e in entry["logs"])
+    return "\n".join(lines) + "\n"
+
+
+def write_files(directory: str, entries: list) -> dict:
+    def write(path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    async def run():
+        caller = []
+        start = time.perf_counter()
+        for i, entry in enumerate(entries):
+            # Unique names keep every entry; the old writer overwrote a session's previous file
+            path = os.path.join(directory, f"{entry['session_id']}-{i}.txt")
+            t = time.perf_counter()
+            await asyncio.to_thread(write, path, text_log(entry))
+            caller.append((time.perf_counter() - t) * 1000)
+        return time.perf_counter() - start, caller
+
+    elapsed, caller = asyncio.run(run())
+    return {"entries_per_s": round(len(entries) / elapsed), "caller_per_entry": summarize(caller),
+            "total_s": round(elapsed, 3)}
+
+
+def write_store(path: str, entries: list) -> dict:
+    store = AuditStore(path)
+    caller = []
+    start = time.perf_counter()
+    for entry in entries:
+        t = time.perf_counter()
+        store.record(entry)
+        caller.append((time.perf_counter() - t) * 1000)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    result = {"entries_per_s": round(len(entries) / elapsed), "caller_per_entry": summarize(caller),
+              "total_s": round(elapsed, 3), "commits": store.batches}
+    store.close()
+    return result
+
+
+def scan_files(directory: str, match) -> list:
+    found = []
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            entry = parse_text_log(f.read())
+        if match(entry):
+            found.append(entry)
+    return found
+
+
+def timed_ms(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many query runs")
+    parser.add_argument("--seed", type=int, default=21)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 2).timestamp()
+    entries = build_entries(args.entries, args.sessions, random.Random(args.seed), start)
+    session = entries[len(entries) // 2]["session_id"]
+    since, until = start + 7 * 3600, start + 8 * 3600
+
+    def in_window(entry):
+        timestamp = datetime.fromisoformat(entry["logs"][-1]["timestamp"]).timestamp()
+        return since <= timestamp < until
+
+    with tempfile.TemporaryDirectory() as directory:
+        files_dir = os.path.join(directory, "logs")
+        os.makedirs(files_dir)
+        files_write = write_files(files_dir, entries)
+        store_write = write_store(os.path.join(directory, "audit.db"), entries)
+
+        store = AuditStore(os.path.join(directory, "audit.db"))
+        queries = {
+            "session_history": (
+                lambda: scan_files(files_dir, lambda e: e["session_id"] == session),
+                lambda: store.query(session_id=session, limit=args.entries),
+            ),
+            "critical_in_hour": (
+                lambda: scan_files(files_dir, lambda e: e["risk_level"] == "Critical" and in_window(e)),
+                lambda: store.query(since=since, until=until, risk_levels=["Critical"], limit=args.entries),
+            ),
+            "count_by_risk": (
+                lambda: scan_files(files_dir, lambda e: True),
+                lambda: store.count_by_risk(),
+            ),
+        }
+        query_results = {}
+        for name, (scan, indexed) in queries.items():
+            scan_ms, scanned = timed_ms(scan, args.repeat)
+            store_ms, found = timed_ms(indexed, args.repeat)
+            matched = len(scanned) == (sum(found.values()) if isinstance(found, dict) else len(found))
+            query_results[name] = {"files_scan_ms": scan_ms, "store_ms": store_ms, "same_rows": matched}
+        store.close()
+
+    results = [{
+        "entries": args.entries,
+        "write": {"files": files_write, "store": store_write},
+        "query": query_results,
+    }]
+    write_report("audit", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Whisper cascade tiers on a local clip corpus: latency and word error rate of
+the partial model (live partials), the final model, and the gated cascade
+(finals decoded by the partial model, escalated to the final model when it
+is not confident) at one or more escalation thresholds.
+
+    python benchmarks/bench_cascade.py recordings/ --partial-model tiny.en --final-model small.en \\
+        --escalate-logprob -0.3 -0.5 -0.8 --partial-threads 2
+
+The corpus is a directory of audio files (any format core/audio.py decodes),
+each with its reference transcript next to it: `clip01.wav` and `clip01.txt`.
+`--synthesize N` first writes N clips of the benchmark corpus there with the
+TTS backend (TTS_BACKEND). Needs the real Whisper models, unlike the other
+benchmarks.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import build_corpus, tokenize
+from benchmarks.harness import summarize, write_report
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".webm", ".ogg", ".m4a", ".flac")
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """
+    Word-level edit distance (substitutions, insertions, deletions) after normalization.
+    """
+    ref, hyp = tokenize(reference), tokenize(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, candidate in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (word != candidate))
+    return row[-1]
+
+
+def synthesize_corpus(directory: str, size: int):
+    from core.voice_generator import default_backend
+    backend = default_backend()
+    os.makedirs(directory, exist_ok=True)
+    for i, item in enumerate(build_corpus(size)):
+        stem = os.path.join(directory, f"clip{i:03d}")
+        with open(f"{stem}.{backend.extension}", "wb") as f:
+            f.write(backend.synthesize(item["text"]))
+        with open(f"{stem}.txt", "w") as f:
+            f.write(item["text"] + "\n")
+
+
+def load_clips(directory: str) -> list:
+    """
+    (name, PCM, reference) for every audio file with a reference transcript.
+    """
+    from core.audio import decode_audio
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        reference_path = os.path.join(directory, stem + ".txt")
+        if extension.lower() not in AUDIO_EXTENSIONS or not os.path.exists(reference_path):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            audio = decode_audio(f.read())
+        with open(reference_path) as f:
+            clips.append((name, audio, f.read().strip()))
+    return clips
+
+
+def run_tier(name: str, transcriber, clips: list, final: bool) -> dict:
+    # The first call on a model pays for buffer allocation; keep it out of the timings
+    transcriber.transcribe_segments(clips[0][1], final=final)
+    accepted, escalated = transcriber.accepted, transcriber.escalated
+
+    latencies = []
+    errors = words = 0
+    for _, audio, reference in clips:
+        start = time.perf_counter()
+        segments = transcriber.transcribe_segments(audio, final=final)
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += word_errors(reference, " ".join(seg["text"] for seg in segments))
+        words += len(tokenize(reference))
+
+    result = {
+        "tier": name,
+        "latency": summarize(latencies),
+        "word_error_rate": round(errors / max(words, 1), 4),
+        "reference_words": words,
+    }
+    if transcriber.escalate_logprob is not None:
+        result["escalate_logprob"] = transcriber.escalate_logprob
+        escalated = transcriber.escalated - escalated
+        result["escalated"] = escalated
+        result["escalation_rate"] = round(escalated / max(escalated + transcriber.accepted - accepted, 1), 4)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", help="Directory of audio clips with .txt reference transcripts")
+    parser.add_argument("--partial-model", default="tiny.en")
+    parser.add_argument("--final-model", default="base.en")
+    parser.add_argument("--partial-threads", type=int)
+    parser.add_argument("--final-threads", type=int)
+    parser.add_argument("--escalate-logprob", type=float, nargs="*", default=[-0.5],
+                        help="Escalation thresholds to evaluate the gated cascade at")
+    parser.add_argument("--escalate-no-speech", type=float, default=0.6)
+    parser.add_argument("--synthesize", type=int, default=0, help="First write this many clips with the TTS backend")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize_corpus(args.clips, args.synthesize)
+    clips = load_clips(args.clips)
+    if not clips:
+        sys.exit(f"No clips with reference transcripts in {args.clips}")
+
+    from core.transcriber import WhisperTranscriber
+
+    def cascade(escalate_logprob=None):
+        # Both share the models loaded by the first (core.transcriber.load_model caches them)
+        return WhisperTranscriber(args.final_model, partial_model_size=args.partial_model,
+                                  partial_threads=args.partial_threads, final_threads=args.final_threads,
+                                  escalate_logprob=escalate_logprob, escalate_no_speech=args.escalate_no_speech)
+
+    import builtins
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        transcriber = cascade()
+        results = [
+            {"clips": len(clips), **run_tier("partial", transcriber, clips, final=False)},
+            {"clips": len(clips), **run_tier("final", transcriber, clips, final=True)},
+        ]
+        for threshold in args.escalate_logprob:
+            results.append({"clips": len(clips), **run_tier("cascade", cascade(threshold), clips, final=True)})
+    finally:
+        builtins.print = real_print
+    write_report("cascade", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
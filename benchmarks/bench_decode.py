@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: in-memory audio decoding vs. the old temp-file + ffmpeg path.
+
+    python benchmarks/bench_decode.py [--seconds 4] [--repeat 50]
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio import SAMPLE_RATE, decode_audio, get_ffmpeg_exe, pcm16_to_float32
+
+
+def make_pcm16(seconds: float) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # Amplitude-modulated tone: cheap stand-in for voiced speech
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    return (signal * 32767).astype(np.int16).tobytes()
+
+
+def make_wav(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm)
+    return buf.getvalue()
+
+
+def make_webm(wav: bytes):
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+             "-c:a", "libopus", "-f", "webm", "pipe:1"],
+            input=wav, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        return result.stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tempfile_decode(data: bytes) -> np.ndarray:
+    # What WhisperTranscriber.transcribe used to do: temp file + whisper.load_audio's ffmpeg launch
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
+        tmp.write(data)
+        path = tmp.name
+    try:
+        out = subprocess.run(
+            [get_ffmpeg_exe(), "-nostdin", "-threads", "0", "-i", path,
+             "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"],
+            capture_output=True, check=True,
+        ).stdout
+        return pcm16_to_float32(out)
+    finally:
+        os.remove(path)
+
+
+def bench(fn, data, repeat):
+    fn(data)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pcm = make_pcm16(args.seconds)
+    wav = make_wav(pcm)
+    webm = make_webm(wav)
+
+    cases = [
+        ("pcm16 in-memory", lambda d: decode_audio(d, codec="pcm16"), pcm),
+        ("wav in-memory", decode_audio, wav),
+    ]
+    if webm is not None:
+        cases.append(("webm in-memory", decode_audio, webm))
+        cases.append(("webm temp-file", tempfile_decode, webm))
+        cases.append(("wav temp-file", tempfile_decode, wav))
+    else:
+        print("ffmpeg not available: skipping webm and temp-file cases")
+
+    print(f"{'case':<18}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, fn, data in cases:
+        p50, p95 = bench(fn, data, args.repeat)
+        print(f"{name:<18}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
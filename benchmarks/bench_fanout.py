@@ -0,0 +1,154 @@
+"""
+Dashboard fan-out: the previous broadcast loop (serialize and await each
+send in turn) against core.pubsub.PubSubHub, with many in-process dashboards
+of which a few are slow.
+
+    python benchmarks/bench_fanout.py --dashboards 10 100 500 --slow 5
+
+Every dashboard follows the all-critical topic, so both variants deliver every
+message to every connection. Reports publish-to-send latency at the healthy
+dashboards, time spent in the publisher and how many slow ones were dropped.
+"""
+import argparse
+import asyncio
+import builtins
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import build_corpus
+from benchmarks.harness import summarize, write_report
+from core.pubsub import CRITICAL_TOPIC, PubSubHub
+from core.state import PatientState
+
+
+class FakeDashboard:
+    def __init__(self, send_delay_s: float, slow: bool):
+        self.send_delay = send_delay_s
+        self.slow = slow
+        self.latencies_ms = []
+        self.closed = False
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.send_delay)
+        sent_at = json.loads(text)["published_at"]
+        self.latencies_ms.append((time.perf_counter() - sent_at) * 1000)
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def build_messages(count: int) -> list:
+    messages = []
+    for i, item in enumerate(build_corpus(count)):
+        state = PatientState(session_id=f"s{i:05d}", transcript=item["text"], risk_level="Critical",
+                             symptoms=["chest pain"], reasoning="Stub reasoning " * 20)
+        state.add_log("DetectorAgent", "Detected Symptoms: ['chest pain']")
+        messages.append({"type": "agent_update", "agent": "PlannerAgent", "state": state.to_dict()})
+    return messages
+
+
+async def run_loop(dashboards, messages, interval_s: float) -> float:
+    """
+    The old broadcast_agent_status: one json.dumps and one awaited send per connection.
+    """
+    busy = 0.0
+    for message in messages:
+        start = time.perf_counter()
+        message = dict(message, published_at=start)
+        for dashboard in list(dashboards):
+            try:
+                await dashboard.send_text(json.dumps(message, default=str))
+            except Exception:
+                dashboards.remove(dashboard)
+        busy += time.perf_counter() - start
+        await asyncio.sleep(interval_s)
+    return busy
+
+
+async def run_hub(dashboards, messages, interval_s: float, max_queue: int, send_timeout_s: float):
+    hub = PubSubHub(max_queue=max_queue, send_timeout_s=send_timeout_s)
+    for dashboard in dashboards:
+        hub.register(dashboard, [CRITICAL_TOPIC])
+    busy = 0.0
+    for message in messages:
+        start = time.perf_counter()
+        hub.publish([CRITICAL_TOPIC], "agent_update", dict(message, published_at=time.perf_counter()))
+        busy += time.perf_counter() - start
+        await asyncio.sleep(interval_s)
+    # Let the healthy writers drain
+    deadline = time.perf_counter() + 5
+    while time.perf_counter() < deadline and any(s.pending for s in hub.subscribers.values() if not s.websocket.slow):
+        await asyncio.sleep(0.01)
+    for websocket in list(hub.subscribers):
+        hub.unregister(websocket)
+    return busy, hub.dropped
+
+
+def make_dashboards(count: int, slow: int, send_delay_s: float, slow_delay_s: float) -> list:
+    return [FakeDashboard(slow_delay_s if i < slow else send_delay_s, i < slow) for i in range(count)]
+
+
+def healthy_latencies(dashboards) -> list:
+    return [ms for d in dashboards if not d.slow for ms in d.latencies_ms]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dashboards", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--slow", type=int, default=5, help="Dashboards whose sends take --slow-ms")
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=20)
+    parser.add_argument("--send-ms", type=float, default=0.2)
+    parser.add_argument("--slow-ms", type=float, default=500)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--send-timeout-s", type=float, default=2.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages)
+    # The hub reports every dropped connection; keep the report readable
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    results = []
+    for count in args.dashboards:
+        slow = min(args.slow, count - 1)
+        delays = (args.send_ms / 1000, args.slow_ms / 1000)
+
+        loop_dashboards = make_dashboards(count, slow, *delays)
+        start = time.perf_counter()
+        loop_busy = asyncio.run(run_loop(list(loop_dashboards), messages, args.interval_ms / 1000))
+        loop_elapsed = time.perf_counter() - start
+
+        hub_dashboards = make_dashboards(count, slow, *delays)
+        start = time.perf_counter()
+        hub_busy, dropped = asyncio.run(run_hub(hub_dashboards, messages, args.interval_ms / 1000,
+                                                args.max_queue, args.send_timeout_s))
+        hub_elapsed = time.perf_counter() - start
+
+        results.append({
+            "dashboards": count,
+            "slow_dashboards": slow,
+            "broadcast_loop": {
+                "elapsed_s": round(loop_elapsed, 3),
+                "publisher_busy_ms": round(loop_busy * 1000, 1),
+                "delivery": summarize(healthy_latencies(loop_dashboards)),
+            },
+            "pubsub_hub": {
+                "elapsed_s": round(hub_elapsed, 3),
+                "publisher_busy_ms": round(hub_busy * 1000, 1),
+                "delivery": summarize(healthy_latencies(hub_dashboards)),
+                "dropped_slow": dropped,
+            },
+        })
+        real_print(f"{count} dashboards done", file=sys.stderr)
+
+    builtins.print = real_print
+    write_report("fanout", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
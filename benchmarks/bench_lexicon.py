@@ -0,0 +1,127 @@
+"""
+Symptom matching at clinical-lexicon scale: the per-term `re.search` loop
+DetectorAgent used to run against the compiled SymptomLexicon trie.
+
+    python benchmarks/bench_lexicon.py --terms 10000 --transcripts 200
+
+Terms are generated pseudo-words (plus the real symptom list); transcripts are
+the benchmark corpus with generated terms spliced in. Reports per-transcript
+latency for both matchers, lexicon build time and how many transcripts the two
+disagree on (expected: none; generated terms never overlap).
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import build_corpus
+from benchmarks.harness import summarize, write_report
+from core.lexicon import BUILTIN_LEXICON, SymptomLexicon
+
+SYLLABLES = ["ka", "lo", "mi", "ter", "san", "vu", "rel", "po", "dax", "en", "quo", "bri", "tal", "ush", "gen", "or"]
+CATEGORIES = ["cardiac", "respiratory", "neurological", "trauma", "infection", "gastrointestinal", "renal", "dermal"]
+
+
+def generate_lexicon(terms: int, synonyms_per_symptom: int, rng: random.Random) -> dict:
+    # Every word is used by one term only, so no term contains another and
+    # both matchers must agree exactly
+    used = set()
+
+    def word():
+        while True:
+            text = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            if text not in used:
+                used.add(text)
+                return text
+
+    def phrase():
+        return " ".join(word() for _ in range(rng.randint(1, 3)))
+
+    symptoms = [dict(entry) for entry in BUILTIN_LEXICON["symptoms"]]
+    total = len(symptoms)
+    while total < terms:
+        count = min(synonyms_per_symptom, terms - total - 1)
+        symptoms.append({
+            "name": phrase(),
+            "category": rng.choice(CATEGORIES),
+            "synonyms": [phrase() for _ in range(count)],
+        })
+        total += 1 + count
+    return dict(BUILTIN_LEXICON, symptoms=symptoms)
+
+
+def build_transcripts(lexicon: dict, count: int, rng: random.Random) -> list:
+    all_terms = [t for e in lexicon["symptoms"] for t in [e["name"]] + e.get("synonyms", [])]
+    transcripts = []
+    for item in build_corpus(count, seed=rng.randint(0, 10**6)):
+        extra = rng.sample(all_terms, rng.randint(0, 3))
+        transcripts.append(" ".join([item["text"]] + [f"and {t}" for t in extra]))
+    return transcripts
+
+
+def loop_matcher(keywords: dict):
+    """
+    The previous DetectorAgent implementation, generalized to synonyms.
+    """
+    def detect(text):
+        detected = []
+        for term in keywords:
+            if re.search(rf"\b{term}\b", text):
+                detected.append(keywords[term])
+        return set(detected)
+    return detect
+
+
+def time_calls(fn, transcripts) -> list:
+    samples = []
+    for text in transcripts:
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--synonyms", type=int, default=3, help="Synonyms per generated symptom")
+    parser.add_argument("--transcripts", type=int, default=200)
+    parser.add_argument("--loop-transcripts", type=int, default=20,
+                        help="The regex loop is slow at scale; time it on this many transcripts")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = []
+    for terms in args.terms:
+        rng = random.Random(args.seed)
+        data = generate_lexicon(terms, args.synonyms, rng)
+        transcripts = [t.lower() for t in build_transcripts(data, args.transcripts, rng)]
+
+        start = time.perf_counter()
+        lexicon = SymptomLexicon.from_dict(data)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        keywords = {t.lower(): e["name"] for e in data["symptoms"] for t in [e["name"]] + e.get("synonyms", [])}
+        loop = loop_matcher(keywords)
+        loop_set = transcripts[:args.loop_transcripts]
+
+        mismatches = sum(1 for text in loop_set if loop(text) != set(lexicon.detect(text)))
+        results.append({
+            "terms": lexicon.term_count,
+            "build_ms": round(build_ms, 3),
+            "regex_loop": summarize(time_calls(loop, loop_set)),
+            "compiled_lexicon": summarize(time_calls(lexicon.detect, transcripts)),
+            "parity_checked": len(loop_set),
+            "parity_mismatches": mismatches,
+        })
+
+    write_report("lexicon", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Load test for HospitalOrchestrator.run_pipeline with stubbed Ollama/TTS.
+
+    python benchmarks/bench_pipeline.py --concurrency 1 4 16 64 --requests 200 --ollama-ms 250
+
+Reports throughput, per-stage p50/p95/p99 (from PatientState.stage_timings),
+end-to-end pipeline latency and transcript-to-staff-alert latency as JSON.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import build_corpus
+from benchmarks.harness import stage_summaries, summarize, write_report
+from benchmarks.stubs import StubLatency, install_stubs
+
+
+async def run_level(orchestrator, corpus, concurrency: int, requests: int) -> dict:
+    from core.state import PatientState
+
+    semaphore = asyncio.Semaphore(concurrency)
+    stage_samples = {}
+    e2e_ms = []
+    alert_ms = []
+
+    async def one(i):
+        item = corpus[i % len(corpus)]
+        async with semaphore:
+            state = PatientState(session_id=f"bench{i:06d}", transcript=item["text"])
+            start = time.perf_counter()
+            state = await orchestrator.run_pipeline(state)
+            e2e_ms.append((time.perf_counter() - start) * 1000)
+        for stage, ms in state.stage_timings.items():
+            stage_samples.setdefault(stage, []).append(ms)
+        for action in state.executed_actions:
+            if "alert_latency_ms" in action:
+                alert_ms.append(action["alert_latency_ms"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "end_to_end": summarize(e2e_ms),
+        "staff_alert": summarize(alert_ms),
+        "stages": stage_summaries(stage_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--ollama-ms", type=float, default=250)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--reasoning-budget-s", type=float, default=4.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    install_stubs(StubLatency(ollama_s=args.ollama_ms / 1000, tts_s=args.tts_ms / 1000))
+
+    import builtins
+    from core.orchestrator import HospitalOrchestrator
+    from core.voice_generator import VoiceGenerator
+
+    corpus = build_corpus(max(args.requests, 50))
+    results = []
+    with tempfile.TemporaryDirectory() as audit_dir:
+        # Agents print every step; keep the report readable
+        real_print = builtins.print
+        builtins.print = lambda *a, **k: None
+        try:
+            for level in args.concurrency:
+                # A fresh orchestrator per level so caches and alert de-duplication start cold
+                orchestrator = HospitalOrchestrator(
+                    voice_generator=VoiceGenerator(cache_dir=os.path.join(audit_dir, f"tts-{level}")),
+                    audit_dir=audit_dir,
+                    reasoning_budget_s=args.reasoning_budget_s,
+                )
+                results.append(asyncio.run(run_level(orchestrator, corpus, level, args.requests)))
+                orchestrator.get_agent("AuditAgent").store.close()
+        finally:
+            builtins.print = real_print
+
+    write_report("pipeline", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
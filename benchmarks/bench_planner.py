@@ -0,0 +1,141 @@
+"""
+PlannerAgent rules: the previous hand-written if/elif planner against the
+compiled decision table, one state at a time and batched.
+
+    python benchmarks/bench_planner.py --states 10000 --batch-sizes 1 100 10000
+
+States cover every risk level and intent the pipeline produces (plus a None
+intent and reasoning), with random symptoms. Reports per-state cost of each
+variant, the cost of the vectorized rule matching alone (`decide_batch`, on
+Python lists and on string arrays) and how many states the table plans
+differently from the old rules (expected: none).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import write_report
+from agents.planner import BUILTIN_RULES, PATIENT_MESSAGES
+from core.decision_table import DecisionTable
+from core.lexicon import BUILTIN_LEXICON
+from core.state import PatientState
+
+RISK_LEVELS = ["Low", "Moderate", "High", "Critical"]
+INTENTS = ["Requesting Assistance", "Status Inquiry", "General Communication", None]
+
+
+def legacy_plan(state: PatientState):
+    """
+    The previous PlannerAgent.process rules, returning (actions, human in the loop).
+    """
+    actions = []
+    human_in_the_loop = False
+    if state.risk_level in ["High", "Critical"]:
+        actions.append({
+            "type": "alert_staff",
+            "priority": "emergency",
+            "target": "Nurse Station",
+            "message": f"CRITICAL: Patient session {state.session_id} - {state.reasoning}"
+        })
+        human_in_the_loop = True
+    elif state.risk_level == "Moderate":
+        actions.append({
+            "type": "alert_staff",
+            "priority": "standard",
+            "target": "Assigned Nurse",
+            "message": f"Observation: Patient session {state.session_id} reports {', '.join(state.symptoms)}."
+        })
+    if state.intent == "Requesting Assistance":
+        actions.append({"type": "notify_patient", "message": PATIENT_MESSAGES["assistance"]})
+    elif state.risk_level == "Low":
+        actions.append({"type": "notify_patient", "message": PATIENT_MESSAGES["logged"]})
+    else:
+        actions.append({"type": "notify_patient", "message": PATIENT_MESSAGES["alerted"]})
+    return actions, human_in_the_loop
+
+
+def build_states(count: int, rng: random.Random) -> list:
+    symptoms = [entry["name"] for entry in BUILTIN_LEXICON["symptoms"]]
+    return [
+        PatientState(
+            session_id=f"s{i:06d}",
+            risk_level=rng.choice(RISK_LEVELS),
+            intent=rng.choice(INTENTS),
+            symptoms=rng.sample(symptoms, rng.randint(0, 3)),
+            reasoning=rng.choice([None, "Reported chest pain with shortness of breath."]),
+        )
+        for i in range(count)
+    ]
+
+
+def per_state_us(variants: dict, states, repeat: int) -> dict:
+    """
+    Best per-state time of each variant, in microseconds. Runs are
+    interleaved so that load on the host affects every variant alike.
+    """
+    best = {name: float("inf") for name in variants}
+    for _ in range(repeat):
+        for name, fn in variants.items():
+            start = time.perf_counter()
+            fn(states)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: round(seconds / len(states) * 1e6, 3) for name, seconds in best.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=10000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=20, help="Best of this many runs")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    states = build_states(args.states, random.Random(args.seed))
+
+    start = time.perf_counter()
+    table = DecisionTable.from_dict(BUILTIN_RULES)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    expected = [legacy_plan(s) for s in states]
+    mismatches = sum(1 for s, e in zip(states, expected) if table.plan(s) != e)
+    batch_mismatches = sum(1 for got, e in zip(table.plan_batch(states), expected) if got != e)
+
+    columns = {field: [getattr(s, field) for s in states] for field in table.fields}
+    array_columns = {field: np.asarray(column).astype(np.str_) for field, column in columns.items()}
+
+    def batched(size):
+        return lambda items: [table.plan_batch(items[i:i + size]) for i in range(0, len(items), size)]
+
+    timings = per_state_us({
+        "if_elif": lambda items: [legacy_plan(s) for s in items],
+        "table_single": lambda items: [table.plan(s) for s in items],
+        **{f"table_batch_{size}": batched(size) for size in args.batch_sizes},
+        # Rule matching alone, without building the action dicts
+        "decide_batch": lambda items: table.decide_batch(columns),
+        "decide_batch_arrays": lambda items: table.decide_batch(array_columns),
+    }, states, args.repeat)
+
+    results = [{
+        "states": len(states),
+        "compile_ms": round(compile_ms, 3),
+        "if_elif_us_per_state": timings["if_elif"],
+        "table_single_us_per_state": timings["table_single"],
+        "table_batch_us_per_state": {str(size): timings[f"table_batch_{size}"] for size in args.batch_sizes},
+        "decide_batch_us_per_state": timings["decide_batch"],
+        "decide_batch_arrays_us_per_state": timings["decide_batch_arrays"],
+        "parity_mismatches": mismatches,
+        "batch_parity_mismatches": batch_mismatches,
+    }]
+
+    write_report("planner", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
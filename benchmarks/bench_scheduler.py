@@ -0,0 +1,135 @@
+"""
+Per-session pipeline scheduling under rapid speech: the previous policy
+(skip a live update while a run is in progress; final runs ignore the lock)
+against PipelineScheduler (latest-wins partials, finals cancel them).
+
+    python benchmarks/bench_scheduler.py --sessions 8 --word-ms 120 --ollama-ms 250 --ollama-parallel 1
+
+Each session speaks a corpus transcript one word at a time: a partial run
+per word, then the final run. Reports time from the final transcript to its
+run completing, LLM calls made and cancelled, and broadcasts from a run
+older than one the session had already broadcast (out of order).
+`--ollama-parallel 1` serves one LLM request at a time, like a default
+Ollama server; 0 lets them all run at once.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import build_corpus
+from benchmarks.harness import summarize, write_report
+from benchmarks.stubs import StubLatency, StubOllamaClient, install_stubs
+
+POLICIES = ("skip", "latest")
+
+
+async def run_policy(policy: str, corpus: list, args) -> dict:
+    from core.orchestrator import HospitalOrchestrator
+    from core.scheduler import PipelineScheduler
+    from core.state import PatientState
+
+    orchestrator = HospitalOrchestrator(audit_dir=None, dry_run=True,
+                                        reasoning_budget_s=args.reasoning_budget_s)
+    scheduler = PipelineScheduler()
+    locks = set()
+    session_states = {}
+    last_broadcast = {}
+    to_final_ms = []
+    counters = {"runs": 0, "skipped": 0, "out_of_order": 0}
+    calls_before, cancelled_before = StubOllamaClient.calls, StubOllamaClient.cancelled
+
+    async def pipeline(session_id, seq, text, is_final, submitted_at):
+        # What server.py's handle_pipeline does, with broadcasts replaced by an ordering check
+        async def on_agent_complete(agent_name, state):
+            if seq < last_broadcast.get(session_id, -1):
+                counters["out_of_order"] += 1
+            last_broadcast[session_id] = max(seq, last_broadcast.get(session_id, -1))
+
+        counters["runs"] += 1
+        previous = session_states.get(session_id)
+        state = previous.for_next_run(text) if previous else PatientState(session_id=session_id, transcript=text)
+        await orchestrator.run_pipeline(state, on_agent_complete=on_agent_complete,
+                                        max_agents=None if is_final else 2)
+        session_states[session_id] = state
+        if is_final:
+            to_final_ms.append((time.monotonic() - submitted_at) * 1000)
+
+    async def skip_policy(session_id, seq, text, is_final):
+        # The previous handle_pipeline: live updates are dropped while a run is in progress
+        if session_id in locks and not is_final:
+            counters["skipped"] += 1
+            return
+        locks.add(session_id)
+        try:
+            await pipeline(session_id, seq, text, is_final, time.monotonic())
+        finally:
+            locks.discard(session_id)
+
+    async def speak(i, item):
+        session_id = f"s{i:04d}"
+        words = item["text"].split()
+        background = []
+        # Sessions start staggered, as they would on a ward
+        await asyncio.sleep(i * args.word_ms / 1000 / max(args.sessions, 1))
+        for n in range(1, len(words) + 2):
+            is_final = n > len(words)
+            text = " ".join(words[:n])
+            if policy == "skip":
+                background.append(asyncio.create_task(skip_policy(session_id, n, text, is_final)))
+            else:
+                submitted_at = time.monotonic()
+                scheduler.submit(session_id, is_final,
+                                 lambda n=n, t=text, f=is_final, s=submitted_at: pipeline(session_id, n, t, f, s))
+            if not is_final:
+                await asyncio.sleep(args.word_ms / 1000)
+        await asyncio.gather(*background)
+
+    import builtins
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(speak(i, corpus[i % len(corpus)]) for i in range(args.sessions)))
+        while scheduler.stats["active_sessions"]:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        builtins.print = real_print
+
+    return {
+        "policy": policy,
+        "sessions": args.sessions,
+        "elapsed_s": round(elapsed, 3),
+        "time_to_final": summarize(to_final_ms),
+        "pipeline_runs": counters["runs"],
+        "live_updates_skipped": counters["skipped"],
+        "scheduler": scheduler.stats if policy == "latest" else None,
+        "llm_calls": StubOllamaClient.calls - calls_before,
+        "llm_calls_cancelled": StubOllamaClient.cancelled - cancelled_before,
+        "out_of_order_broadcasts": counters["out_of_order"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--word-ms", type=float, default=120, help="Time between partial transcripts")
+    parser.add_argument("--ollama-ms", type=float, default=250)
+    parser.add_argument("--ollama-parallel", type=int, default=1)
+    parser.add_argument("--reasoning-budget-s", type=float, default=4.0)
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=list(POLICIES))
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    install_stubs(StubLatency(ollama_s=args.ollama_ms / 1000, ollama_parallel=args.ollama_parallel))
+    corpus = build_corpus(max(args.sessions, 50))
+    results = [asyncio.run(run_policy(policy, corpus, args)) for policy in args.policies]
+    write_report("scheduler", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
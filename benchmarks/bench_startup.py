@@ -0,0 +1,161 @@
+"""
+Server startup: how long `import server` takes, when the first request is
+answered, when /readyz turns ready, and whether a text-only manual
+transcript is handled while the models are still loading.
+
+    python benchmarks/bench_startup.py --runs 5 --model-load-ms 8000
+
+Each run starts a fresh interpreter (so imports are not cached) with the
+stub models of benchmarks/stubs.py; `--model-load-ms` stands in for loading
+Whisper. `--real-whisper` loads the installed Whisper model instead.
+All times are seconds from the start of `import server`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import REPO_ROOT, summarize, write_report
+
+TRANSCRIPT = "I have crushing chest pain, please help"
+
+
+def get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except OSError:
+        return None, None
+
+
+async def manual_transcript(url: str) -> float:
+    """
+    Seconds until the first state update for a manual transcript.
+    """
+    import websockets
+    async with websockets.connect(url) as ws:
+        await ws.recv()  # session_started
+        start = time.monotonic()
+        await ws.send(json.dumps({"type": "manual_transcript", "text": TRANSCRIPT}))
+        while True:
+            message = json.loads(await asyncio.wait_for(ws.recv(), 30))
+            if message["type"] == "state_delta":
+                return time.monotonic() - start
+
+
+def child(args):
+    """
+    One startup, reported as JSON in `args.result_file` (stdout carries the
+    server's and agents' output, which may still be printing).
+    """
+    from benchmarks.stubs import StubLatency, install_stubs
+    install_stubs(StubLatency(ollama_s=args.ollama_ms / 1000, model_load_s=args.model_load_ms / 1000),
+                  stub_whisper=not args.real_whisper)
+    os.chdir(REPO_ROOT)
+    sys.stdout = open(os.devnull, "w")
+
+    from benchmarks.bench_ws import free_port
+    import threading
+    import uvicorn
+
+    start = time.monotonic()
+    import server
+    imported = time.monotonic() - start
+
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    instance = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = threading.Thread(target=instance.run, daemon=True)
+    serving.start()
+
+    first_response = None
+    while first_response is None:
+        status, _ = get(f"{base}/healthz")
+        if status == 200:
+            first_response = time.monotonic() - start
+        else:
+            time.sleep(0.01)
+
+    # Text-only traffic right away, before the models are ready
+    _, readiness = get(f"{base}/readyz")
+    loading_at_send = not readiness["ready"]
+    transcript_s = asyncio.run(manual_transcript(f"ws://127.0.0.1:{port}/ws"))
+
+    ready = None
+    while ready is None:
+        status, readiness = get(f"{base}/readyz")
+        if status == 200:
+            ready = time.monotonic() - start
+        else:
+            time.sleep(0.02)
+
+    # Stop the server (and the sessions' pipelines on its loop) before reporting
+    instance.should_exit = True
+    serving.join(timeout=10)
+    with open(args.result_file, "w") as f:
+        json.dump({
+            "import_s": imported,
+            "first_response_s": first_response,
+            "ready_s": ready,
+            "manual_transcript_s": transcript_s,
+            "manual_transcript_while_loading": loading_at_send,
+            "components": readiness["components"],
+        }, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model-load-ms", type=float, default=3000)
+    parser.add_argument("--ollama-ms", type=float, default=250)
+    parser.add_argument("--real-whisper", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), "--child",
+               "--model-load-ms", str(args.model_load_ms), "--ollama-ms", str(args.ollama_ms)]
+    if args.real_whisper:
+        command.append("--real-whisper")
+
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.runs):
+            result_file = os.path.join(directory, f"run{i}.json")
+            subprocess.run(command + ["--result-file", result_file], capture_output=True, check=True)
+            with open(result_file) as f:
+                runs.append(json.load(f))
+            print(f"run {i + 1}/{args.runs} done", file=sys.stderr)
+
+    def seconds(key):
+        return summarize([run[key] * 1000 for run in runs])
+
+    results = [{
+        "runs": len(runs),
+        "import": seconds("import_s"),
+        "first_response": seconds("first_response_s"),
+        "ready": seconds("ready_s"),
+        "manual_transcript": seconds("manual_transcript_s"),
+        "manual_transcripts_sent_while_loading": sum(run["manual_transcript_while_loading"] for run in runs),
+        "components_when_ready": runs[-1]["components"],
+    }]
+    write_report("startup", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Replay benchmark for the /ws endpoint with stubbed Whisper, Ollama and TTS.
+
+    python benchmarks/bench_ws.py --concurrency 1 4 16 --sessions 32 --realtime 4
+
+Starts server.py in-process on a free port, then simulated dashboards stream
+generated utterances as binary PCM16 frames. Reports throughput, time from the
+final frame to the final transcript and to the session's staff alert, bytes
+received per session (against what full-state updates would have cost) and
+the server-side per-stage timings carried in agent updates, as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SAMPLE_RATE, ToneVocabulary, build_corpus, to_pcm16
+from benchmarks.harness import REPO_ROOT, stage_summaries, summarize, write_report
+from benchmarks.stubs import StubLatency, StubTranscriber, install_stubs
+from core.audit_store import DEFAULT_AUDIT_DB, AuditStore
+
+CHUNK_S = 0.5
+TRAILING_SILENCE_S = 0.3
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int):
+    import uvicorn
+    import server
+
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+    instance = uvicorn.Server(config)
+    thread = threading.Thread(target=instance.run, daemon=True)
+    thread.start()
+    while not instance.started:
+        time.sleep(0.05)
+    return instance, thread
+
+
+async def run_session(url: str, text: str, vocabulary, realtime: float, expected_critical: bool) -> dict:
+    import websockets
+    from core.framing import CODEC_PCM16, encode_frame
+
+    pcm = to_pcm16(vocabulary.synthesize(text))
+    pcm += b"\x00\x00" * int(TRAILING_SILENCE_S * SAMPLE_RATE)
+    step = int(CHUNK_S * SAMPLE_RATE) * 2
+
+    result = {"expected_critical": expected_critical}
+    async with websockets.connect(url, max_size=None) as ws:
+        started = json.loads(await ws.recv())
+        session_id = started["session_id"]
+        await ws.send(json.dumps({"type": "audio_config", "codec": "pcm16"}))
+
+        async def sender():
+            chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+            for seq, chunk in enumerate(chunks):
+                final = seq == len(chunks) - 1
+                await ws.send(encode_frame(seq, chunk, codec=CODEC_PCM16, sample_rate=SAMPLE_RATE, is_final=final))
+                if final:
+                    result["final_sent"] = time.perf_counter()
+                elif realtime > 0:
+                    await asyncio.sleep(CHUNK_S / realtime)
+
+        send_task = asyncio.create_task(sender())
+        state = {}
+        seq = 0
+        result["bytes"] = result["full_state_bytes"] = 0
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                now = time.perf_counter()
+                result["bytes"] += len(raw)
+                if msg["type"] == "transcription_result" and msg.get("is_final"):
+                    result.setdefault("final_transcript_at", now)
+                    result["transcript"] = msg["text"]
+                if msg["type"] not in ("state_delta", "state_snapshot") or msg["session_id"] != session_id:
+                    result["full_state_bytes"] += len(raw)
+                    continue
+                if msg["type"] == "state_snapshot":
+                    state, seq = msg["state"], msg["seq"]
+                    continue
+                if msg["seq"] != seq + 1:
+                    raise RuntimeError(f"Missed delta {seq + 1} (got {msg['seq']})")
+                seq = msg["seq"]
+                state = dict(state, **msg.get("set", {}))
+                for field, items in msg.get("append", {}).items():
+                    state[field] = state.get(field, []) + items
+                for field, values in msg.get("merge", {}).items():
+                    state[field] = dict(state.get(field, {}), **values)
+                # What the same update cost when every message carried the whole state
+                result["full_state_bytes"] += len(json.dumps({"type": msg["event"], "agent": msg.get("agent"), "state": state}))
+
+                paged = any(a.get("type") == "alert_staff" for a in state.get("executed_actions", []))
+                if paged:
+                    result.setdefault("alert_at", now)
+                if msg["event"] == "agent_update":
+                    result["stage_timings"] = state.get("stage_timings", {})
+                    if msg["agent"] == "AuditAgent":
+                        break
+        finally:
+            await send_task
+    return result
+
+
+async def run_level(url: str, corpus, vocabulary, concurrency: int, sessions: int, realtime: float) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        item = corpus[i % len(corpus)]
+        async with semaphore:
+            return await asyncio.wait_for(
+                run_session(url, item["text"], vocabulary, realtime, item["expected_critical"]), timeout=120
+            )
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    errors = [repr(o) for o in outcomes if isinstance(o, Exception)]
+    done = [o for o in outcomes if not isinstance(o, Exception) and "final_sent" in o]
+    transcript_ms = [(o["final_transcript_at"] - o["final_sent"]) * 1000 for o in done if "final_transcript_at" in o]
+    alert_ms = [max(0.0, (o["alert_at"] - o["final_sent"]) * 1000) for o in done if "alert_at" in o]
+    stage_samples = {}
+    for o in done:
+        for stage, ms in o.get("stage_timings", {}).items():
+            stage_samples.setdefault(stage, []).append(ms)
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "completed": len(done),
+        "errors": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_sessions_per_s": round(len(done) / elapsed, 2),
+        "final_transcript": summarize(transcript_ms),
+        "staff_alert": summarize(alert_ms),
+        "missed_critical_alerts": sum(1 for o in done if o["expected_critical"] and "alert_at" not in o),
+        "bytes_per_session": round(sum(o["bytes"] for o in done) / max(1, len(done))),
+        "full_state_bytes_per_session": round(sum(o["full_state_bytes"] for o in done) / max(1, len(done))),
+        "server_stages": stage_summaries(stage_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--realtime", type=float, default=4.0,
+                        help="Playback speed-up; 0 sends audio as fast as possible")
+    parser.add_argument("--ollama-ms", type=float, default=250)
+    parser.add_argument("--whisper-ms", type=float, default=50)
+    parser.add_argument("--whisper-ms-per-audio-s", type=float, default=20)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    install_stubs(StubLatency(
+        ollama_s=args.ollama_ms / 1000,
+        whisper_s=args.whisper_ms / 1000,
+        whisper_per_audio_s=args.whisper_ms_per_audio_s / 1000,
+        tts_s=args.tts_ms / 1000,
+    ))
+    os.chdir(REPO_ROOT)
+
+    import builtins
+    corpus = build_corpus(max(args.sessions, 50))
+    vocabulary = ToneVocabulary(item["text"] for item in corpus)
+
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    audit_dir = tempfile.TemporaryDirectory()
+    audit = None
+    try:
+        port = free_port()
+        instance, thread = start_server(port)
+        import server
+        server.inference.transcriber = StubTranscriber(vocabulary)
+        audit = server.orchestrator.get_agent("AuditAgent")
+        if audit is not None:
+            audit.store = AuditStore(os.path.join(audit_dir.name, DEFAULT_AUDIT_DB))
+
+        url = f"ws://127.0.0.1:{port}/ws"
+        results = [
+            asyncio.run(run_level(url, corpus, vocabulary, level, args.sessions, args.realtime))
+            for level in args.concurrency
+        ]
+        instance.should_exit = True
+        thread.join(timeout=5)
+    finally:
+        builtins.print = real_print
+        if audit is not None:
+            audit.store.close()
+        audit_dir.cleanup()
+
+    write_report("websocket", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Synthetic transcript corpus and matching generated audio for the benchmarks.
+
+Audio is 16 kHz mono PCM16, like test_whisper.create_dummy_wav, but instead of
+silence every word is a short tone whose pitch identifies it. The stub Whisper
+model in benchmarks/stubs.py recovers the words from the pitches, so the full
+audio path (framing, VAD, streaming windows, batching) runs deterministically.
+"""
+import io
+import random
+import re
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+WORD_S = 0.25
+WORD_GAP_S = 0.08
+SENTENCE_GAP_S = 1.2
+
+TEMPLATES = [
+    ("Help, I have {critical} and it is getting worse.", "critical"),
+    ("Please send someone, I have {critical}.", "critical"),
+    ("I think I have {symptom} since this morning.", "symptom"),
+    ("My {symptom} is bothering me again.", "symptom"),
+    ("When is my next medication due?", None),
+    ("Can you check the status of my test results?", None),
+    ("Thank you, I am feeling fine today.", None),
+    ("Um, yes, I have {symptom} and a little {symptom2}.", "symptom"),
+]
+CRITICAL = ["chest pain", "difficulty breathing"]
+SYMPTOMS = ["fever", "cough", "nausea", "dizziness", "bleeding", "severe headache", "shortness of breath"]
+
+
+def build_corpus(size: int, seed: int = 7) -> list:
+    """
+    Returns `size` transcripts as dicts with `text` and `expected_critical`.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template, kind = rng.choice(TEMPLATES)
+        symptom, symptom2 = rng.sample(SYMPTOMS, 2)
+        text = template.format(critical=rng.choice(CRITICAL), symptom=symptom, symptom2=symptom2)
+        corpus.append({"text": text, "expected_critical": kind == "critical"})
+    return corpus
+
+
+def tokenize(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+class ToneVocabulary:
+    """
+    Maps words to tone frequencies and back.
+    """
+    def __init__(self, texts):
+        words = sorted({word for text in texts for word in tokenize(text)})
+        # 25 Hz apart from 300 Hz: well resolved by a 0.25 s FFT, below Nyquist for ~300 words
+        self.freq_of = {word: 300.0 + 25.0 * i for i, word in enumerate(words)}
+        self.words = words
+
+    def word_for(self, freq: float) -> str:
+        index = int(round((freq - 300.0) / 25.0))
+        if 0 <= index < len(self.words):
+            return self.words[index]
+        return ""
+
+    def synthesize(self, text: str) -> np.ndarray:
+        """
+        float32 PCM for one utterance: one tone per word, short gaps between words.
+        """
+        t = np.arange(int(WORD_S * SAMPLE_RATE)) / SAMPLE_RATE
+        ramp = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.01)
+        gap = np.zeros(int(WORD_GAP_S * SAMPLE_RATE), dtype=np.float32)
+        parts = []
+        for word in tokenize(text):
+            parts.append((0.3 * ramp * np.sin(2 * np.pi * self.freq_of[word] * t)).astype(np.float32))
+            parts.append(gap)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def synthesize_session(self, texts, lead_in_s: float = 0.5) -> np.ndarray:
+        silence = np.zeros(int(SENTENCE_GAP_S * SAMPLE_RATE), dtype=np.float32)
+        parts = [np.zeros(int(lead_in_s * SAMPLE_RATE), dtype=np.float32)]
+        for text in texts:
+            parts.extend([self.synthesize(text), silence])
+        return np.concatenate(parts)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def to_wav(samples: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(to_pcm16(samples))
+    return buf.getvalue()
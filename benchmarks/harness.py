@@ -0,0 +1,53 @@
+"""
+Shared helpers for the benchmark scripts: percentiles and JSON reporting.
+"""
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def summarize(samples_ms) -> dict:
+    """
+    p50/p95/p99/max of a list of millisecond samples.
+    """
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def stage_summaries(stage_samples: dict) -> dict:
+    return {stage: summarize(samples) for stage, samples in sorted(stage_samples.items())}
+
+
+def write_report(name: str, config: dict, results: list, output: str = None):
+    """
+    Prints the machine-readable report and optionally writes it to `output`.
+    """
+    report = {
+        "benchmark": name,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
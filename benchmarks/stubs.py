@@ -0,0 +1,227 @@
+"""
+Deterministic local stand-ins for Whisper, Ollama, gTTS and pyttsx3.
+
+Call `install_stubs()` before importing any project module: it registers
+fake `ollama`, `pyttsx3`, `gtts`, `whisper` and `torch` modules so the
+pipeline and the server run without models, network or audio devices, with
+configurable latencies.
+"""
+import asyncio
+import sys
+import time
+import types
+import weakref
+
+import numpy as np
+
+from benchmarks.corpus import SAMPLE_RATE
+
+CRITICAL = ("chest pain", "difficulty breathing")
+HIGH = ("shortness of breath", "bleeding", "severe headache")
+
+
+class StubLatency:
+    """
+    Latencies in seconds. Whisper cost is `whisper_s + whisper_per_audio_s * audio seconds`;
+    loading the Whisper model takes `model_load_s`. `ollama_parallel` limits
+    concurrent generate calls, as Ollama does (0: unlimited).
+    """
+    def __init__(self, ollama_s=0.25, whisper_s=0.05, whisper_per_audio_s=0.02, tts_s=0.15, speech_s=0.0,
+                 model_load_s=0.0, ollama_parallel=0):
+        self.ollama_s = ollama_s
+        self.ollama_parallel = ollama_parallel
+        self.model_load_s = model_load_s
+        self.whisper_s = whisper_s
+        self.whisper_per_audio_s = whisper_per_audio_s
+        self.tts_s = tts_s
+        self.speech_s = speech_s
+
+
+LATENCY = StubLatency()
+
+
+class StubOllamaClient:
+    """
+    `ollama.AsyncClient` replacement: answers from the symptoms in the prompt.
+    """
+    calls = 0
+    cancelled = 0
+    _slots = weakref.WeakKeyDictionary()
+
+    def __init__(self, host=None, timeout=None, **kwargs):
+        pass
+
+    async def generate(self, model, prompt, keep_alive=None, **kwargs):
+        StubOllamaClient.calls += 1
+        try:
+            if LATENCY.ollama_parallel:
+                loop = asyncio.get_running_loop()
+                if loop not in StubOllamaClient._slots:
+                    StubOllamaClient._slots[loop] = asyncio.Semaphore(LATENCY.ollama_parallel)
+                async with StubOllamaClient._slots[loop]:
+                    await asyncio.sleep(LATENCY.ollama_s)
+            else:
+                await asyncio.sleep(LATENCY.ollama_s)
+        except asyncio.CancelledError:
+            StubOllamaClient.cancelled += 1
+            raise
+        symptoms = ""
+        for line in prompt.splitlines():
+            if "Detected Symptoms:" in line:
+                symptoms = line.split("Detected Symptoms:")[1]
+        if any(s in symptoms for s in CRITICAL):
+            level = "Critical"
+        elif any(s in symptoms for s in HIGH):
+            level = "High"
+        elif symptoms.strip():
+            level = "Moderate"
+        else:
+            level = "Low"
+        return {"response": f"Risk Level: {level}\nReasoning: Stub assessment from reported symptoms ({symptoms.strip() or 'none'})."}
+
+
+class StubTTSEngine:
+    """
+    Speaks for `LATENCY.speech_s` per utterance, firing 'started-word' callbacks
+    between words like pyttsx3 does; stop() cuts the utterance short.
+    """
+    def __init__(self):
+        self._props = {}
+        self._callbacks = {}
+        self._words = []
+        self._stopped = False
+
+    def setProperty(self, name, value):
+        self._props[name] = value
+
+    def connect(self, topic, callback):
+        self._callbacks.setdefault(topic, []).append(callback)
+        return {"topic": topic, "cb": callback}
+
+    def disconnect(self, token):
+        self._callbacks[token["topic"]].remove(token["cb"])
+
+    def say(self, text):
+        self._words.extend(text.split())
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        words, self._words, self._stopped = self._words, [], False
+        for location, word in enumerate(words):
+            for callback in self._callbacks.get("started-word", []):
+                callback(None, location, len(word))
+            if self._stopped:
+                return
+            time.sleep(LATENCY.speech_s / len(words))
+
+
+class StubGTTS:
+    def __init__(self, text, lang="en"):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(LATENCY.tts_s)
+        fp.write(b"ID3" + self.text.encode("utf-8")[:64])
+
+
+class StubTranscriber:
+    """
+    Drop-in for WhisperTranscriber that recognizes the tone-coded words of
+    benchmarks/corpus.py and sleeps for a duration proportional to the audio.
+    """
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.calls = 0
+
+    def _sleep(self, seconds_of_audio: float):
+        time.sleep(LATENCY.whisper_s + LATENCY.whisper_per_audio_s * seconds_of_audio)
+
+    def _recognize(self, audio: np.ndarray) -> list:
+        frame = SAMPLE_RATE // 100
+        n = audio.size // frame
+        if n == 0:
+            return []
+        energy = np.mean(audio[:n * frame].reshape(n, frame) ** 2, axis=1)
+        voiced = energy > 1e-3
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]])))
+        words = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            if end - start < 5:
+                continue
+            chunk = audio[start * frame:end * frame]
+            spectrum = np.abs(np.fft.rfft(chunk * np.hanning(chunk.size)))
+            freq = np.argmax(spectrum) * SAMPLE_RATE / chunk.size
+            word = self.vocabulary.word_for(freq)
+            if word:
+                words.append((start / 100, end / 100, word))
+
+        # Words less than half a second apart form one segment
+        segments = []
+        for start, end, word in words:
+            if segments and start - segments[-1]["end"] < 0.5:
+                segments[-1]["end"] = end
+                segments[-1]["text"] += " " + word
+            else:
+                segments.append({"start": start, "end": end, "text": word})
+        return segments
+
+    def transcribe_segments(self, audio, context: str = "", final: bool = True) -> list:
+        self.calls += 1
+        self._sleep(audio.size / SAMPLE_RATE)
+        return self._recognize(audio)
+
+    def transcribe_batch(self, audios, final: bool = True) -> list:
+        self.calls += 1
+        # A batch costs one fixed overhead plus the longest clip
+        self._sleep(max((a.size for a in audios), default=0) / SAMPLE_RATE)
+        return [self._recognize(a) for a in audios]
+
+    def transcribe(self, audio_bytes: bytes, final: bool = True, raise_errors: bool = False) -> str:
+        from core.audio import decode_audio
+        audio = decode_audio(audio_bytes)
+        self.calls += 1
+        self._sleep(audio.size / SAMPLE_RATE)
+        return " ".join(seg["text"] for seg in self._recognize(audio))
+
+
+def _stub_whisper_module():
+    whisper = types.ModuleType("whisper")
+
+    class _Model:
+        is_multilingual = False
+
+    def load_model(*args, **kwargs):
+        time.sleep(LATENCY.model_load_s)
+        return _Model()
+
+    whisper.load_model = load_model
+    whisper.tokenizer = types.SimpleNamespace(get_tokenizer=lambda *args, **kwargs: None)
+    whisper.audio = types.SimpleNamespace(N_SAMPLES=30 * SAMPLE_RATE, SAMPLE_RATE=SAMPLE_RATE)
+    return whisper
+
+
+def install_stubs(latency: StubLatency = None, stub_whisper: bool = True):
+    """
+    Registers the stub modules. Must run before the project modules are imported.
+    """
+    if latency is not None:
+        for name, value in vars(latency).items():
+            setattr(LATENCY, name, value)
+
+    ollama = types.ModuleType("ollama")
+    ollama.AsyncClient = StubOllamaClient
+    sys.modules["ollama"] = ollama
+
+    pyttsx3 = types.ModuleType("pyttsx3")
+    pyttsx3.init = lambda *args, **kwargs: StubTTSEngine()
+    sys.modules["pyttsx3"] = pyttsx3
+
+    gtts = types.ModuleType("gtts")
+    gtts.gTTS = StubGTTS
+    sys.modules["gtts"] = gtts
+
+    if stub_whisper:
+        sys.modules["whisper"] = _stub_whisper_module()
+        sys.modules.setdefault("torch", types.ModuleType("torch"))
@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from core.metrics import ADMISSION_QUEUED, ADMISSION_SHED, ADMISSION_WAIT_SECONDS
+
+# Most important first: an urgent session's live update outranks a routine final transcript
+PRIORITY_CLASSES = ("urgent_final", "urgent_partial", "routine_final", "routine_partial")
+RANKS = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+
+URGENT_INTENTS = {"Requesting Assistance"}
+URGENT_RISK_LEVELS = {"High", "Critical"}
+
+
+class LoadShed(RuntimeError):
+    """
+    Raised for a partial (live) request dropped to make room for more important work.
+    """
+
+
+def priority_class(urgent: bool, final: bool) -> str:
+    return f"{'urgent' if urgent else 'routine'}_{'final' if final else 'partial'}"
+
+
+def is_urgent(state) -> bool:
+    """
+    Whether a session's detected intent or assessed risk makes its requests urgent.
+    """
+    return state is not None and (state.intent in URGENT_INTENTS or state.risk_level in URGENT_RISK_LEVELS)
+
+
+class AdmissionController:
+    """
+    Admits at most `limit` concurrent requests to a shared model (Whisper,
+    the Ollama server); the others wait in priority order, FIFO within a
+    class. When `max_queue` requests are waiting, the oldest waiting partial
+    request of the lowest class is shed (or the new request, if it is a
+    partial that ranks lower still). Final requests are never shed, and may
+    wait beyond `max_queue`.
+    """
+    def __init__(self, name: str, limit: int, max_queue: int = 64):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.active = 0
+        self.admitted = {name: 0 for name in PRIORITY_CLASSES}
+        self.shed = {name: 0 for name in PRIORITY_CLASSES}
+        # Entries: [rank, sequence, priority, future, enqueued_at]
+        self._waiting = []
+        self._sequence = itertools.count()
+        ADMISSION_QUEUED.set(0, name)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def stats(self) -> dict:
+        queued = {name: 0 for name in PRIORITY_CLASSES}
+        for entry in self._waiting:
+            queued[entry[2]] += 1
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": queued,
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: str):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self, priority: str) -> bool:
+        """
+        Takes a slot only if one is free and nobody is waiting.
+        """
+        if self.active >= self.limit or self._waiting:
+            return False
+        self._admit(priority, 0.0)
+        return True
+
+    async def acquire(self, priority: str):
+        if self.try_acquire(priority):
+            return
+        if len(self._waiting) >= self.max_queue:
+            self._make_room(priority)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [RANKS[priority], next(self._sequence), priority, future, time.monotonic()]
+        heapq.heappush(self._waiting, entry)
+        ADMISSION_QUEUED.set(len(self._waiting), self.name)
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Admitted just as we were cancelled: hand the slot on
+                self.release()
+            elif entry in self._waiting:
+                self._remove(entry)
+            raise
+
+    def release(self):
+        self.active -= 1
+        while self._waiting and self.active < self.limit:
+            entry = heapq.heappop(self._waiting)
+            future = entry[3]
+            if future.done():
+                continue
+            self._admit(entry[2], time.monotonic() - entry[4])
+            future.set_result(None)
+        ADMISSION_QUEUED.set(len(self._waiting), self.name)
+
+    def _admit(self, priority: str, waited_s: float):
+        self.active += 1
+        self.admitted[priority] += 1
+        ADMISSION_WAIT_SECONDS.observe(waited_s, self.name, priority)
+
+    def _make_room(self, priority: str):
+        partials = [entry for entry in self._waiting if entry[2].endswith("_partial")]
+        # Lowest class first, then oldest: its audio or transcript is the most out of date
+        victim = max(partials, key=lambda entry: (entry[0], -entry[1]), default=None)
+        if victim is not None and victim[0] >= RANKS[priority]:
+            self._remove(victim)
+            self._count_shed(victim[2])
+            victim[3].set_exception(LoadShed(f"{self.name} saturated; {victim[2]} request shed"))
+        elif priority.endswith("_partial"):
+            self._count_shed(priority)
+            raise LoadShed(f"{self.name} saturated; {priority} request shed")
+
+    def _remove(self, entry):
+        self._waiting.remove(entry)
+        heapq.heapify(self._waiting)
+        ADMISSION_QUEUED.set(len(self._waiting), self.name)
+
+    def _count_shed(self, priority: str):
+        self.shed[priority] += 1
+        ADMISSION_SHED.inc(self.name, priority)
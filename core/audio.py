@@ -0,0 +1,207 @@
+import io
+import os
+import shutil
+import subprocess
+import threading
+import wave
+import numpy as np
+from core.metrics import AUDIO_DECODE_SECONDS
+
+try:
+    import av
+except ImportError:
+    av = None
+
+SAMPLE_RATE = 16000
+
+
+def get_ffmpeg_exe() -> str:
+    """
+    Resolves the ffmpeg binary, preferring the one bundled with imageio-ffmpeg.
+    """
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def pcm16_to_float32(raw) -> np.ndarray:
+    """
+    Converts little-endian signed 16-bit PCM bytes to float32 samples in [-1, 1).
+    """
+    if not raw:
+        return np.zeros(0, dtype=np.float32)
+    return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Linear-interpolation resampler; adequate for speech going into Whisper.
+    """
+    if src_rate == dst_rate or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    n_out = int(round(samples.size * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def _decode_wav(data: bytes) -> np.ndarray:
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate)
+
+
+def _decode_av(data: bytes) -> np.ndarray:
+    # In-process libav decode: no subprocess, no temp file
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    parts = []
+    with av.open(io.BytesIO(data), mode="r") as container:
+        for frame in container.decode(audio=0):
+            for out in resampler.resample(frame):
+                parts.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            parts.append(out.to_ndarray().reshape(-1))
+    if not parts:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(parts).astype(np.float32) / 32768.0
+
+
+def _decode_ffmpeg_pipe(data: bytes) -> np.ndarray:
+    # Fallback when PyAV is unavailable: bytes go through pipes, never to disk
+    result = subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-nostdin", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "pipe:1",
+        ],
+        input=data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return pcm16_to_float32(result.stdout)
+
+
+def decode_audio(data: bytes, codec: str = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes audio bytes into 16 kHz mono float32 PCM entirely in memory.
+    Args:
+        data: The encoded audio (webm/opus, ogg, mp3, WAV) or raw PCM.
+        codec: "pcm16" for headerless little-endian 16-bit mono PCM; otherwise
+            the container is sniffed.
+        sample_rate: Sample rate of raw PCM input.
+    Returns:
+        The samples as a float32 numpy array.
+    """
+    if not data:
+        return np.zeros(0, dtype=np.float32)
+    if codec == "pcm16":
+        # Zero-decode fast path
+        with AUDIO_DECODE_SECONDS.time("pcm16"):
+            return resample(pcm16_to_float32(data), sample_rate)
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            with AUDIO_DECODE_SECONDS.time("wav"):
+                return _decode_wav(data)
+        except (wave.Error, ValueError) as e:
+            print(f"WAV fast path failed, falling back to full decode: {e}")
+    if av is not None:
+        with AUDIO_DECODE_SECONDS.time("av"):
+            return _decode_av(data)
+    with AUDIO_DECODE_SECONDS.time("ffmpeg_pipe"):
+        return _decode_ffmpeg_pipe(data)
+
+
+class StreamDecoder:
+    """
+    Long-lived ffmpeg process that decodes one continuous container stream
+    (e.g. MediaRecorder webm/opus chunks) into 16 kHz mono float32 PCM.
+    Only the first MediaRecorder chunk carries the container header, so the
+    chunks of a session must all go through the same decoder.
+    """
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            [
+                get_ffmpeg_exe(),
+                "-loglevel", "error",
+                "-fflags", "nobuffer",
+                "-probesize", "4096",
+                "-analyzeduration", "0",
+                "-i", "pipe:0",
+                "-f", "s16le",
+                "-ac", "1",
+                "-ar", str(sample_rate),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._reader = threading.Thread(target=self._pump, daemon=True)
+        self._reader.start()
+
+    def _pump(self):
+        fd = self._process.stdout.fileno()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            with self._lock:
+                self._pending.extend(chunk)
+
+    def _drain(self) -> np.ndarray:
+        with self._lock:
+            usable = len(self._pending) - len(self._pending) % 2
+            raw = bytes(self._pending[:usable])
+            del self._pending[:usable]
+        return pcm16_to_float32(raw)
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """
+        Pushes encoded bytes into the decoder and returns whatever PCM has been
+        decoded so far. Output may lag the input by a chunk; `close` flushes it.
+        """
+        with AUDIO_DECODE_SECONDS.time("stream"):
+            if data:
+                try:
+                    self._process.stdin.write(data)
+                    self._process.stdin.flush()
+                except (BrokenPipeError, ValueError) as e:
+                    print(f"Stream decoder error: {e}")
+            return self._drain()
+
+    def close(self) -> np.ndarray:
+        """
+        Ends the stream and returns the remaining decoded PCM.
+        """
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        self._reader.join(timeout=5)
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        return self._drain()
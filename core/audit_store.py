@@ -0,0 +1,346 @@
+"""
+Append-only audit store: one row per completed encounter in a SQLite
+database (WAL mode), written by a background thread in batches.
+
+    python -m core.audit_store import-logs logs/
+    python -m core.audit_store query --risk Critical --since 2026-01-02T07:00
+"""
+import argparse
+import ast
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from core.metrics import AUDIT_BATCH_SIZE, AUDIT_COMMIT_SECONDS, ERRORS
+
+DEFAULT_AUDIT_DB = "audit.db"
+
+# List and dict fields are stored as JSON text
+JSON_FIELDS = ("symptoms", "actions", "observations", "logs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS encounters (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    transcript TEXT,
+    symptoms TEXT,
+    reasoning TEXT,
+    response_text TEXT,
+    actions TEXT,
+    observations TEXT,
+    logs TEXT,
+    source TEXT NOT NULL DEFAULT 'pipeline'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS encounters_session ON encounters (session_id, recorded_at);
+CREATE INDEX IF NOT EXISTS encounters_time ON encounters (recorded_at);
+CREATE INDEX IF NOT EXISTS encounters_risk ON encounters (risk_level, recorded_at);
+"""
+
+COLUMNS = ("session_id", "recorded_at", "risk_level", "transcript", "symptoms", "reasoning",
+           "response_text", "actions", "observations", "logs", "source")
+# Re-recording an entry (same session and time, e.g. a repeated import) is a no-op
+INSERT = (f"INSERT INTO encounters ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+          "ON CONFLICT (session_id, recorded_at) DO NOTHING")
+DEFAULTS = {"risk_level": "Low", "source": "pipeline"}
+
+
+def parse_time(value) -> Optional[float]:
+    """
+    Unix seconds from a number or an ISO 8601 string (local time if it has no offset).
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+class AuditStore:
+    """
+    `record` only queues the entry; a writer thread commits whatever has
+    queued up (up to `batch_size` entries) in one transaction, so a busy
+    ward costs one fsync per batch instead of a file per encounter.
+    Entries are indexed by session, time and risk level for `query`.
+    """
+    def __init__(self, path: str = os.path.join("logs", DEFAULT_AUDIT_DB), batch_size: int = 512,
+                 max_pending: int = 100000):
+        self.path = path
+        self.batch_size = batch_size
+        # Rows inserted, and rows skipped as already stored (same session and time)
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.dropped = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._readers = threading.local()
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL makes NORMAL durable against application crashes; only a power loss can drop the last commits
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "pending": self.pending,
+            "dropped": self.dropped,
+        }
+
+    def record(self, entry: dict) -> bool:
+        """
+        Queues an encounter (see `entry_from_state` for the fields). Never blocks.
+        """
+        entry = {**DEFAULTS, "recorded_at": time.time(), **{k: v for k, v in entry.items() if v is not None}}
+        row = tuple(
+            json.dumps(entry.get(column), default=str) if column in JSON_FIELDS else entry.get(column)
+            for column in COLUMNS
+        )
+        try:
+            self._queue.put_nowait(("row", row))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            ERRORS.inc("audit")
+            print(f"Audit queue full; dropped the entry for session {entry.get('session_id')}.")
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until everything recorded so far is committed.
+        """
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        self.flush(timeout=10)
+        self._queue.put(("stop", None))
+        self._writer.join(timeout=10)
+
+    def _run(self):
+        conn = self._connect()
+        while True:
+            kind, item = self._queue.get()
+            rows, waiters, stop = [], [], False
+            while True:
+                if kind == "row":
+                    rows.append(item)
+                elif kind == "flush":
+                    waiters.append(item)
+                else:
+                    stop = True
+                if stop or len(rows) >= self.batch_size:
+                    break
+                # Group commit: take everything already queued into this transaction
+                try:
+                    kind, item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                self._commit(conn, rows)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                conn.close()
+                return
+
+    def _commit(self, conn: sqlite3.Connection, rows: list):
+        try:
+            before = conn.total_changes
+            with AUDIT_COMMIT_SECONDS.time(), conn:
+                conn.executemany(INSERT, rows)
+            # ON CONFLICT DO NOTHING rows are not changes
+            inserted = conn.total_changes - before
+            self.written += inserted
+            self.duplicates += len(rows) - inserted
+            self.batches += 1
+            AUDIT_BATCH_SIZE.observe(len(rows))
+        except sqlite3.Error as e:
+            ERRORS.inc("audit")
+            print(f"Failed to write {len(rows)} audit entries: {e}")
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _where(session_id, since, until, risk_levels):
+        clauses, params = [], []
+        if session_id:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if since is not None:
+            clauses.append("recorded_at >= ?")
+            params.append(parse_time(since))
+        if until is not None:
+            clauses.append("recorded_at < ?")
+            params.append(parse_time(until))
+        if risk_levels:
+            clauses.append(f"risk_level IN ({', '.join('?' * len(risk_levels))})")
+            params.extend(risk_levels)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, session_id: str = None, since=None, until=None, risk_levels: Iterable[str] = None,
+              limit: int = 100, offset: int = 0, include_logs: bool = True) -> List[dict]:
+        """
+        Encounters matching all the given filters, newest first.
+        `since`/`until` are unix seconds or ISO 8601 strings.
+        """
+        where, params = self._where(session_id, since, until, list(risk_levels or []))
+        columns = COLUMNS if include_logs else tuple(c for c in COLUMNS if c != "logs")
+        rows = self._reader().execute(
+            f"SELECT id, {', '.join(columns)} FROM encounters{where} ORDER BY recorded_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]).fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            for field in JSON_FIELDS:
+                if entry.get(field) is not None:
+                    entry[field] = json.loads(entry[field])
+            entry["recorded_at_iso"] = datetime.fromtimestamp(entry["recorded_at"]).isoformat()
+            entries.append(entry)
+        return entries
+
+    def count_by_risk(self, since=None, until=None, session_id: str = None) -> dict:
+        where, params = self._where(session_id, since, until, [])
+        rows = self._reader().execute(
+            f"SELECT risk_level, COUNT(*) FROM encounters{where} GROUP BY risk_level", params).fetchall()
+        return {risk_level: count for risk_level, count in rows}
+
+
+def entry_from_state(state, source: str = "pipeline") -> dict:
+    return {
+        "session_id": state.session_id,
+        "recorded_at": time.time(),
+        "risk_level": state.risk_level,
+        "transcript": state.transcript,
+        "symptoms": state.symptoms,
+        "reasoning": state.reasoning,
+        "response_text": state.response_text,
+        "actions": state.executed_actions,
+        "observations": state.observations,
+        "logs": state.agent_logs,
+        "source": source,
+    }
+
+
+LOG_LINE = re.compile(r"^ - \[(?P<timestamp>[^\]]+)\] (?P<agent>[^:]+): (?P<message>.*)$")
+
+
+def parse_text_log(text: str) -> dict:
+    """
+    An audit entry from a legacy `logs/<session_id>.txt` file.
+    """
+    entry = {"logs": []}
+    fields = {"Session": "session_id", "Risk Level": "risk_level", "Transcript": "transcript",
+              "Symptoms": "symptoms", "Reasoning": "reasoning"}
+    in_logs = False
+    for line in text.splitlines():
+        if in_logs:
+            match = LOG_LINE.match(line)
+            if match:
+                entry["logs"].append(match.groupdict())
+            elif entry["logs"]:
+                # Continuation of a multi-line message
+                entry["logs"][-1]["message"] += "\n" + line
+            continue
+        if line == "Logs:":
+            in_logs = True
+            continue
+        key, _, value = line.partition(": ")
+        if key in fields:
+            entry[fields[key]] = None if value == "None" else value
+    try:
+        entry["symptoms"] = ast.literal_eval(entry.get("symptoms") or "[]")
+    except (ValueError, SyntaxError):
+        entry["symptoms"] = [entry["symptoms"]]
+    entry.setdefault("risk_level", "Low")
+    return entry
+
+
+def import_text_logs(store: AuditStore, directory: str) -> Tuple[int, int]:
+    """
+    Loads legacy `<session_id>.txt` audit files into the store. Each is
+    timestamped with its last log entry (or the file's modification time),
+    so importing the same files twice adds nothing.
+    Returns the number of files inserted and of files already in the store
+    (counted from the store's totals, so nothing else should write to it meanwhile).
+    """
+    written, duplicates = store.written, store.duplicates
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".txt"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = parse_text_log(f.read())
+        except OSError as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        entry.setdefault("session_id", os.path.splitext(name)[0])
+        try:
+            entry["recorded_at"] = datetime.fromisoformat(entry["logs"][-1]["timestamp"]).timestamp()
+        except (IndexError, ValueError):
+            entry["recorded_at"] = os.path.getmtime(path)
+        entry["source"] = f"import:{name}"
+        store.record(entry)
+    store.flush()
+    return store.written - written, store.duplicates - duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join("logs", DEFAULT_AUDIT_DB))
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import-logs", help="Import legacy logs/*.txt audit files")
+    importer.add_argument("directory", nargs="?", default="logs")
+    search = commands.add_parser("query", help="Print matching encounters as JSON lines")
+    search.add_argument("--session")
+    search.add_argument("--since")
+    search.add_argument("--until")
+    search.add_argument("--risk", action="append", help="Repeatable")
+    search.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    store = AuditStore(args.db)
+    if args.command == "import-logs":
+        imported, skipped = import_text_logs(store, args.directory)
+        print(f"Imported {imported} audit files into {args.db} ({skipped} already imported).")
+    else:
+        for entry in store.query(args.session, args.since, args.until, args.risk, limit=args.limit):
+            print(json.dumps(entry, default=str))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,24 @@
+import hashlib
+import json
+import time
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+from core.metrics import AGENT_SECONDS
 from core.state import PatientState
 
 class BaseAgent(ABC):
     """
     Abstract Base Class for all agents in the system.
     """
+    # PatientState fields the agent reads and writes. The orchestrator derives
+    # stage dependencies from these; None means "unknown" and makes the agent a
+    # barrier. agent_logs is append-only and never counts as a conflict.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
+    # Whether the output depends only on `reads` and the run has no side
+    # effects; the orchestrator then skips the agent when its inputs are unchanged.
+    memoize: bool = False
+
     def __init__(self, name: str):
         self.name = name
 
@@ -15,6 +29,21 @@ class BaseAgent(ABC):
         """
         pass
 
+    async def run(self, state: PatientState) -> PatientState:
+        """
+        Runs `process`, recording its duration in the metrics and in `state.stage_timings`.
+        """
+        start = time.perf_counter()
+        state = await self.process(state)
+        elapsed = time.perf_counter() - start
+        AGENT_SECONDS.observe(elapsed, self.name, state.risk_level)
+        state.stage_timings[self.name] = round(elapsed * 1000, 3)
+        return state
+
+    def input_fingerprint(self, state: PatientState) -> str:
+        values = {field: getattr(state, field) for field in self.reads}
+        return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
     def log(self, state: PatientState, message: str):
         print(f"[{self.name}] {message}")
         state.add_log(self.name, message)
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class AsyncResultCache:
+    """
+    Bounded LRU cache with per-entry TTL for the results of async calls.
+    Concurrent requests for the same key share one in-flight call instead of
+    each issuing their own. The call runs as its own task and is cancelled
+    once every caller waiting on it has been cancelled. Failed calls are not
+    cached.
+    """
+    def __init__(self, max_entries: int = 512, ttl_s: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self.cancelled = 0
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        # In-flight call -> number of callers waiting on it
+        self._waiters = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_inflight": self.shared,
+            "evictions": self.evictions,
+            "cancelled_inflight": self.cancelled,
+            "hit_ratio": round((self.hits + self.shared) / lookups, 3) if lookups else 0.0
+        }
+
+    def waiters(self, key) -> int:
+        """
+        Number of callers waiting on the in-flight call for `key`.
+        """
+        return self._waiters.get(self._inflight.get(key), 0)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key, compute, retry_on=()):
+        """
+        Returns the cached value for `key`, awaiting `compute()` on a miss.
+        Callers sharing an in-flight call make their own when it fails with
+        one of the `retry_on` exceptions (e.g. it was shed for load).
+        Returns:
+            (value, source) where source is "hit", "shared" or "miss".
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        while True:
+            call = self._inflight.get(key)
+            if call is None:
+                self.misses += 1
+                source = "miss"
+                call = self._inflight[key] = asyncio.ensure_future(compute())
+                call.add_done_callback(lambda done: self._settle(key, done))
+            else:
+                source = "shared"
+            self._waiters[call] = self._waiters.get(call, 0) + 1
+            try:
+                value = await asyncio.shield(call)
+            except asyncio.CancelledError:
+                # Waiting on it, we can't have cancelled the call; a cancelled call
+                # means it was cancelled, not us: make or join a new one
+                if not call.cancelled():
+                    raise
+                continue
+            except retry_on:
+                if source == "miss":
+                    raise
+                continue
+            finally:
+                self._release(call)
+            if source == "shared":
+                self.shared += 1
+            return value, source
+
+    def _release(self, call):
+        self._waiters[call] -= 1
+        if self._waiters[call]:
+            return
+        del self._waiters[call]
+        if not call.done():
+            # Nobody waits for the result any more
+            call.cancel()
+            self.cancelled += 1
+
+    def _settle(self, key, call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        if call.cancelled():
+            return
+        if call.exception() is None:
+            self.put(key, call.result())
@@ -0,0 +1,307 @@
+import itertools
+import json
+import keyword
+import operator
+import os
+import string
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "planner_rules.json")
+
+# State fields action messages can use; list fields are joined with ", "
+TEMPLATE_FIELDS = ("session_id", "risk_level", "intent", "reasoning", "symptoms")
+
+
+def template_fields(template: Optional[str]) -> List[str]:
+    return sorted({name for _, name, _, _ in string.Formatter().parse(template or "") if name})
+
+
+# Action values written into the generated code as literals; others are passed in
+_LITERAL_TYPES = (str, int, float, bool, type(None))
+
+
+def _action_source(action: dict, namespace: dict) -> str:
+    """
+    Python expression building a fresh copy of `action` with its message
+    filled in from `state`, e.g. {'type': 'alert_staff', 'message':
+    f'CRITICAL: {state.session_id}'}. Values it can't write as literals are
+    added to `namespace`.
+    """
+    template = action.get("message")
+    fields = template_fields(template)
+    unknown = set(fields) - set(TEMPLATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown message fields {sorted(unknown)} in action {action}")
+
+    def constant(value):
+        name = f"_value{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    def literal(value):
+        return repr(value) if type(value) in _LITERAL_TYPES else constant(value)
+
+    items = []
+    for key, value in action.items():
+        if key == "message" and fields:
+            parts = []
+            for text, name, spec, conversion in string.Formatter().parse(template):
+                if text:
+                    parts.append("f" + repr(text.replace("{", "{{").replace("}", "}}")))
+                if name is None:
+                    continue
+                # Lists (symptoms) are written "a, b"
+                field = f"_join(state.{name})" if name == "symptoms" else f"state.{name}"
+                if conversion:
+                    field = f"{field}!{conversion}"
+                if spec:
+                    # Passed in, so the generated f-string needs no nested quotes
+                    field = f"{field}:{{{constant(spec)}}}"
+                parts.append("f'{%s}'" % field)
+            items.append(f"{literal(key)}: {' '.join(parts) or repr('')}")
+        else:
+            items.append(f"{literal(key)}: {literal(value)}")
+    return "{" + ", ".join(items) + "}"
+
+
+def _compile(source: str, namespace: dict):
+    """
+    Function of the state returning `source`, an expression of `state`.
+    """
+    namespace = {"_join": ", ".join, **namespace}
+    exec(f"def _build(state):\n    return {source}\n", namespace)
+    return namespace["_build"]
+
+
+def _compile_plan(fields: Sequence[str], cells, remember):
+    """
+    `DecisionTable.plan` for one table: `cells` holds the decision functions
+    nested one dict per condition field, e.g. cells[state.intent][state.risk_level];
+    values missing from it are looked up by `remember`.
+    """
+    lookup = "".join(f"[state.{field}]" if field.isidentifier() and not keyword.iskeyword(field)
+                     else f"[getattr(state, {field!r})]" for field in fields)
+    namespace = {"_cells": cells, "_remember": remember, "_fields": tuple(fields)}
+    exec(
+        "def plan(state):\n"
+        "    try:\n"
+        f"        decide = _cells{lookup}\n"
+        "    except KeyError:\n"
+        "        decide = _remember(tuple(getattr(state, field) for field in _fields))\n"
+        "    return decide(state)\n",
+        namespace,
+    )
+    return namespace["plan"]
+
+
+class DecisionTable:
+    """
+    Declarative action rules, compiled once. Rules are grouped; within a
+    group the first rule whose conditions all hold fires (an if/elif chain)
+    and every group is evaluated in order. A condition maps a state field to
+    the values it may take; a rule without conditions always matches.
+
+        {"groups": [{"name": "staff", "rules": [
+            {"name": "urgent", "when": {"risk_level": ["High", "Critical"]},
+             "action": {"type": "alert_staff", "message": "Session {session_id}"},
+             "human_in_the_loop": true}]}]}
+
+    Compiling gives each condition field value a small integer code (values
+    no rule mentions share one "other" code) and evaluates the rules for
+    every combination of codes up front; each distinct outcome becomes one
+    generated function building its actions.
+    `plan(state)` returns the actions for one state and whether a human must
+    be kept in the loop. It is generated per table (see `_compile_plan`):
+    one dict lookup per condition field, then the outcome's function.
+    `decide_batch` is the NumPy mode: it maps whole columns of values to code
+    arrays and indexes a lookup array holding, per code combination, the
+    rule that fires in each group; `plan_batch` plans a list of states with it.
+    """
+    # Distinct condition value combinations `plan` remembers (values no rule
+    # mentions, e.g. free-text intents, could otherwise grow it without bound)
+    MAX_CACHED_KEYS = 4096
+
+    plan: Callable[[Any], Tuple[List[Dict[str, Any]], bool]]
+
+    def __init__(self, groups: List[Dict[str, Any]]):
+        self.groups = groups
+        rules = [rule for group in groups for rule in group["rules"]]
+        self.fields: Tuple[str, ...] = tuple(sorted({field for rule in rules for field in rule.get("when", {})}))
+        # Per field: value -> code; code len(values) stands for any other value
+        self._codes: List[Dict[Any, int]] = []
+        for field in self.fields:
+            codes = {}
+            for rule in rules:
+                for value in rule.get("when", {}).get(field, ()):
+                    codes.setdefault(value, len(codes))
+            self._codes.append(codes)
+        self._shape = tuple(len(codes) + 1 for codes in self._codes)
+        self._strides = [int(np.prod(self._shape[i + 1:], dtype=np.int64)) for i in range(len(self._shape))]
+        self._messages = [rule["action"].get("message") for rule in rules]
+        # Per field: (value -> code * stride, other code * stride), so a decision index is a sum of lookups
+        self._offsets = [
+            ({value: code * stride for value, code in codes.items()}, (size - 1) * stride)
+            for codes, size, stride in zip(self._codes, self._shape, self._strides)
+        ]
+        # Per field, for string arrays in decide_batch: the rule values as a
+        # sorted string array and the code of each
+        self._sorted_codes = []
+        for codes in self._codes:
+            keys = sorted(codes, key=str)
+            self._sorted_codes.append((np.array([str(v) for v in keys], dtype=np.str_),
+                                       np.array([codes[v] for v in keys], dtype=np.intp)))
+
+        # Per rule, in table order: the function building its action from a state
+        self._builders = []
+        for rule in rules:
+            namespace = {}
+            self._builders.append(_compile(_action_source(rule["action"], namespace), namespace))
+        # Per group: (allowed codes per field index, rule number, human in the loop) per rule
+        compiled = []
+        rule_id = 0
+        for group in groups:
+            compiled_group = []
+            for rule in group["rules"]:
+                conditions = {self.fields.index(field): {self._codes[self.fields.index(field)][v] for v in values}
+                              for field, values in rule.get("when", {}).items()}
+                compiled_group.append((conditions, rule_id, bool(rule.get("human_in_the_loop", False))))
+                rule_id += 1
+            compiled.append(compiled_group)
+
+        # Per code combination (row-major): the rule that fires in each group
+        # (-1: none) and whether any of them keeps a human in the loop, as lookup
+        # arrays for decide_batch, and the function of the state returning
+        # (actions, human in the loop) for plan
+        self._rule_table = np.full(self._shape + (len(groups),), -1, dtype=np.intp)
+        self._human_table = np.zeros(self._shape, dtype=bool)
+        # Generated once per distinct row of rule numbers (many combinations share one)
+        self._by_rules = {}
+        self._decisions = []
+        for combo in itertools.product(*(range(size) for size in self._shape)):
+            row = []
+            human_in_the_loop = False
+            for group in compiled:
+                rule_id = -1
+                for conditions, candidate, human in group:
+                    if all(combo[field] in allowed for field, allowed in conditions.items()):
+                        rule_id = candidate
+                        human_in_the_loop = human_in_the_loop or human
+                        break
+                row.append(rule_id)
+            row = tuple(row)
+            self._rule_table[combo] = row
+            self._human_table[combo] = human_in_the_loop
+            if row not in self._by_rules:
+                namespace = {}
+                sources = [_action_source(rules[r]["action"], namespace) for r in row if r >= 0]
+                self._by_rules[row] = _compile(f"([{', '.join(sources)}], {human_in_the_loop!r})", namespace)
+            self._decisions.append(self._by_rules[row])
+        # Integer key of a row of rule numbers (for plan_batch): the row + 1 in base len(rules) + 1
+        self._row_weights = (len(rules) + 1) ** np.arange(len(groups), dtype=np.int64)
+        self._by_row_key = {int(np.dot(np.add(row, 1), self._row_weights)): decide
+                            for row, decide in self._by_rules.items()}
+
+        # For plan: the functions by the state's condition values, in dicts
+        # nested one per field (see _remember)
+        self._cached = 0
+        self._cells = {}
+        if self.fields:
+            for values in itertools.product(*(list(codes) for codes in self._codes)):
+                self._remember(values)
+            self.plan = _compile_plan(self.fields, self._cells, self._remember)
+        else:
+            self.plan = lambda state, decide=self._decisions[0]: decide(state)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DecisionTable":
+        return cls(data["groups"])
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, fallback: Optional[dict] = None) -> "DecisionTable":
+        """
+        Builds the table from a JSON file (see data/planner_rules.json).
+        Falls back to `fallback` if the file can't be read.
+        """
+        path = path or DEFAULT_RULES_PATH
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"Could not load planner rules {path}: {e}. Using built-in rules.")
+            return cls.from_dict(fallback)
+
+    def static_messages(self) -> List[str]:
+        """
+        Action messages without placeholders, e.g. for precomputing their speech.
+        """
+        return [m for m in self._messages if m and not template_fields(m)]
+
+    def _decision_for(self, values):
+        index = 0
+        for value, (offsets, other) in zip(values, self._offsets):
+            index += offsets.get(value, other)
+        return self._decisions[index]
+
+    def _remember(self, values):
+        """
+        The decision for these condition values, added to the lookup `plan` uses.
+        """
+        decide = self._decision_for(values)
+        if self._cached < self.MAX_CACHED_KEYS:
+            node = self._cells
+            for value in values[:-1]:
+                node = node.setdefault(value, {})
+            if values[-1] not in node:
+                node[values[-1]] = decide
+                self._cached += 1
+        return decide
+
+    def _column_codes(self, i: int, column) -> np.ndarray:
+        """
+        Integer codes of one condition field's values: string arrays by binary
+        search over the rule values, other sequences by dict lookups in C (map).
+        """
+        other = self._shape[i] - 1
+        if isinstance(column, np.ndarray) and column.dtype.kind in "US":
+            keys, key_codes = self._sorted_codes[i]
+            if not keys.size:
+                return np.full(column.shape, other, dtype=np.intp)
+            position = np.minimum(np.searchsorted(keys, column), keys.size - 1)
+            return np.where(keys[position] == column, key_codes[position], other)
+        codes = self._codes[i]
+        return np.fromiter(map(codes.get, column, itertools.repeat(other)), dtype=np.intp, count=len(column))
+
+    def decide_batch(self, columns: Dict[str, Sequence]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decisions for columns of condition field values (e.g. {"risk_level":
+        [...], "intent": [...]}, lists or string arrays), one row per state:
+        the rule number firing in each group (rows x groups, -1 for none; see
+        `rule_action`) and whether a human must be kept in the loop.
+        """
+        index = tuple(self._column_codes(i, columns[field]) for i, field in enumerate(self.fields))
+        return self._rule_table[index], self._human_table[index]
+
+    def rule_action(self, rule_id: int, state) -> Dict[str, Any]:
+        """
+        The action of rule `rule_id` (numbered across groups, in table order) for `state`.
+        """
+        return self._builders[rule_id](state)
+
+    def plan_batch(self, states: Sequence) -> List[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        `plan` for many states: the rules are evaluated for all of them with
+        `decide_batch`; only the action dicts are built per state.
+        """
+        if not states:
+            return []
+        columns = {field: list(map(operator.attrgetter(field), states)) for field in self.fields}
+        rule_ids, _ = self.decide_batch(columns)
+        # Each distinct row of rule numbers is planned by one compiled function;
+        # rows are told apart by a single integer each
+        keys, inverse = np.unique((rule_ids + 1) @ self._row_weights, return_inverse=True)
+        decide = [self._by_row_key[key] for key in keys.tolist()]
+        return [decide[i](state) for i, state in zip(inverse.tolist(), states)]
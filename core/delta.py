@@ -0,0 +1,123 @@
+import json
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+from pydantic import BaseModel, Field
+from core.state import PatientState
+
+
+class StateSnapshotMessage(BaseModel):
+    """
+    Full state of a session at `seq`. Sent on subscribe, on resync and when
+    a session starts being published to a topic.
+    """
+    type: Literal["state_snapshot"] = "state_snapshot"
+    session_id: str
+    seq: int
+    state: Dict[str, Any]
+
+
+class StateDeltaMessage(BaseModel):
+    """
+    Changes since `seq - 1`: `set` replaces fields, `append` extends list
+    fields and `merge` updates keys of dict fields.
+    `event` is what produced it (agent_update, reasoning_update, fast_alert).
+    """
+    type: Literal["state_delta"] = "state_delta"
+    event: str
+    session_id: str
+    seq: int
+    agent: Optional[str] = None
+    set: Dict[str, Any] = Field(default_factory=dict)
+    append: Dict[str, List[Any]] = Field(default_factory=dict)
+    merge: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    audio_alerts: Optional[List[str]] = None
+
+
+def apply_delta(snapshot: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Applies a serialized StateDeltaMessage to a state snapshot (as the dashboard does).
+    """
+    snapshot.update(delta.get("set", {}))
+    for field, items in delta.get("append", {}).items():
+        snapshot[field] = list(snapshot.get(field) or []) + items
+    for field, values in delta.get("merge", {}).items():
+        snapshot[field] = dict(snapshot.get(field) or {}, **values)
+    return snapshot
+
+
+class _SessionStream:
+    __slots__ = ("seq", "snapshot", "topics")
+
+    def __init__(self):
+        self.seq = 0
+        self.snapshot: Dict[str, Any] = {}
+        self.topics: Set[str] = set()
+
+
+class StateDeltaTracker:
+    """
+    Last state sent for each session, so updates go out as deltas against it.
+    Sequence numbers are per session and start at 1; a client that sees a gap
+    asks for a resync and gets a snapshot.
+    """
+    def __init__(self):
+        self._streams: Dict[str, _SessionStream] = {}
+
+    def __len__(self):
+        return len(self._streams)
+
+    def update(self, state: PatientState, event: str, topics: List[str], agent: str = None,
+               audio_alerts: List[str] = None) -> Tuple[str, Optional[str], List[str]]:
+        """
+        Records `state` as the session's latest. Returns the serialized delta,
+        a serialized snapshot for topics the session was not published to
+        before (or None) and those topics.
+        """
+        stream = self._streams.setdefault(state.session_id, _SessionStream())
+        stream.snapshot, changed, appended, merged = state.changes_since(stream.snapshot)
+        stream.seq += 1
+
+        entered = [t for t in topics if t not in stream.topics]
+        stream.topics = set(topics)
+        snapshot = self.snapshot(state.session_id) if entered and stream.seq > 1 else None
+
+        delta = StateDeltaMessage(event=event, session_id=state.session_id, seq=stream.seq, agent=agent,
+                                  set=changed, append=appended, merge=merged, audio_alerts=audio_alerts or None)
+        return delta.model_dump_json(exclude_none=True), snapshot, entered
+
+    def mirror(self, session_id: str, message_type: str, text: str, topics: Optional[List[str]] = None) -> bool:
+        """
+        Follows a session tracked elsewhere (another server worker) from the
+        snapshot and delta messages published for it, so it can be snapshotted
+        and resynced here too. Returns False if a delta doesn't follow the
+        last one seen; the mirror then needs a snapshot.
+        """
+        message = json.loads(text)
+        stream = self._streams.setdefault(session_id, _SessionStream())
+        if topics is not None:
+            stream.topics = set(topics)
+        if message["seq"] <= stream.seq:
+            return True  # Already covered by a snapshot
+        if message_type == "state_snapshot":
+            stream.snapshot, stream.seq = message["state"], message["seq"]
+            return True
+        if message["seq"] != stream.seq + 1:
+            return False
+        apply_delta(stream.snapshot, message)
+        stream.seq = message["seq"]
+        return True
+
+    def topics(self, session_id: str) -> List[str]:
+        stream = self._streams.get(session_id)
+        return sorted(stream.topics) if stream else []
+
+    def snapshot(self, session_id: str) -> Optional[str]:
+        stream = self._streams.get(session_id)
+        if stream is None or stream.seq == 0:
+            return None
+        return StateSnapshotMessage(session_id=session_id, seq=stream.seq, state=stream.snapshot).model_dump_json()
+
+    def sessions_in(self, topic: str) -> List[str]:
+        return [session_id for session_id, stream in self._streams.items() if topic in stream.topics]
+
+    def forget(self, session_id: str):
+        self._streams.pop(session_id, None)
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import struct
+from typing import Callable, Optional
+from core.metrics import ERRORS, EVENT_BUS_MESSAGES
+
+# Messages are length-prefixed JSON objects
+HEADER = struct.Struct("!I")
+MAX_MESSAGE_BYTES = 16 * 2**20
+# A worker whose unsent backlog grows past this is disconnected; it reconnects and resyncs
+MAX_BACKLOG_BYTES = 64 * 2**20
+
+
+def encode(message: dict) -> bytes:
+    payload = json.dumps(message, default=str).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    One length-prefixed frame, header included.
+    """
+    header = await reader.readexactly(HEADER.size)
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Event bus message of {size} bytes")
+    return header + await reader.readexactly(size)
+
+
+class EventBroker:
+    """
+    Relays every message a server worker sends to all the other workers,
+    over a Unix socket. Frames are forwarded as received, without parsing.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.relayed = 0
+        self._writers = set()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                frame = await read_frame(reader)
+                for other in list(self._writers):
+                    if other is writer:
+                        continue
+                    if other.transport.get_write_buffer_size() > MAX_BACKLOG_BYTES:
+                        print("Event broker: dropping a worker that stopped reading.")
+                        self._writers.discard(other)
+                        other.close()
+                        continue
+                    other.write(frame)
+                self.relayed += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"Event broker error: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class EventBusClient:
+    """
+    A server worker's connection to the EventBroker. `publish` never blocks:
+    messages are queued and written by a background task, and dropped (and
+    counted) if the queue is full or the broker is unreachable. Received
+    messages are passed to `on_message` on the event loop.
+    """
+    def __init__(self, path: str, worker_id: str, on_message: Callable[[dict], None],
+                 max_pending: int = 4096, reconnect_s: float = 0.5):
+        self.path = path
+        self.worker_id = worker_id
+        self.on_message = on_message
+        self.reconnect_s = reconnect_s
+        self.connected = False
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self._max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "worker": self.worker_id,
+            "connected": self.connected,
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize() if self._queue else 0,
+        }
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self._max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def publish(self, message: dict) -> bool:
+        if self._queue is None or not self.connected:
+            self.dropped += 1
+            EVENT_BUS_MESSAGES.inc("dropped")
+            return False
+        try:
+            self._queue.put_nowait(encode(dict(message, origin=self.worker_id)))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            EVENT_BUS_MESSAGES.inc("dropped")
+            return False
+        except Exception as e:
+            ERRORS.inc("event_bus")
+            print(f"Could not encode event bus message: {e}")
+            return False
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except (OSError, ConnectionError):
+                await asyncio.sleep(self.reconnect_s)
+                continue
+            self.connected = True
+            receiver = asyncio.create_task(self._receive(reader))
+            try:
+                while not receiver.done():
+                    getter = asyncio.ensure_future(self._queue.get())
+                    await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        break
+                    writer.write(getter.result())
+                    await writer.drain()
+                    self.sent += 1
+                    EVENT_BUS_MESSAGES.inc("sent")
+            except asyncio.CancelledError:
+                receiver.cancel()
+                writer.close()
+                raise
+            except (OSError, ConnectionError):
+                pass
+            self.connected = False
+            receiver.cancel()
+            writer.close()
+            print(f"Worker {self.worker_id} lost the event bus; reconnecting.")
+            await asyncio.sleep(self.reconnect_s)
+
+    async def _receive(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                frame = await read_frame(reader)
+                message = json.loads(frame[HEADER.size:])
+                self.received += 1
+                EVENT_BUS_MESSAGES.inc("received")
+                try:
+                    self.on_message(message)
+                except Exception as e:
+                    ERRORS.inc("event_bus")
+                    print(f"Event bus handler error: {e}")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            ERRORS.inc("event_bus")
+            print(f"Event bus read error: {e}")
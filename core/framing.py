@@ -0,0 +1,105 @@
+"""
+Binary audio frames for the /ws endpoint.
+
+Every binary WebSocket message carries one frame: a fixed 14-byte
+little-endian header followed by the audio payload.
+
+    offset  size  field
+    0       2     magic        b"AF"
+    2       1     version      PROTOCOL_VERSION
+    3       1     flags        bit 0 = FLAG_FINAL (last frame of the utterance)
+    4       1     codec        CODEC_WEBM_OPUS or CODEC_PCM16
+    5       1     reserved     0
+    6       4     sequence     uint32, 0 for the first frame of an utterance, +1 per frame
+    10      4     sample_rate  uint32, Hz, MIN_SAMPLE_RATE..MAX_SAMPLE_RATE
+                               (informational for webm/opus)
+    14      n     payload      codec-specific bytes (may be empty on a final frame)
+
+CODEC_WEBM_OPUS payloads are consecutive MediaRecorder chunks of one
+continuous stream. CODEC_PCM16 payloads are headerless mono signed 16-bit PCM.
+
+The server advertises `protocol_descriptor()` as `audio_protocol` in its
+`session_started` message; the client picks a codec with
+`{"type": "audio_config", "codec": "<name>"}` and the server confirms with
+`audio_config_ack`. A sequence gap is reported as an `audio_error` message
+and the current utterance is discarded; a malformed frame is reported as an
+`audio_error` and dropped.
+"""
+import struct
+
+MAGIC = b"AF"
+PROTOCOL_VERSION = 1
+
+FLAG_FINAL = 0x01
+
+CODEC_WEBM_OPUS = 0
+CODEC_PCM16 = 1
+CODEC_NAMES = {CODEC_WEBM_OPUS: "webm-opus", CODEC_PCM16: "pcm16"}
+
+HEADER = struct.Struct("<2sBBBxII")
+
+# Telephony up to studio rates; anything else is a corrupt header
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 192000
+
+
+class FrameError(ValueError):
+    """
+    Raised when a binary message is not a valid audio frame.
+    """
+
+
+class AudioFrame:
+    """
+    A parsed frame. `payload` is a memoryview into the received message, so no
+    audio bytes are copied while parsing.
+    """
+    __slots__ = ("sequence", "codec", "sample_rate", "is_final", "payload")
+
+    def __init__(self, sequence: int, codec: int, sample_rate: int, is_final: bool, payload: memoryview):
+        self.sequence = sequence
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.is_final = is_final
+        self.payload = payload
+
+    @property
+    def codec_name(self) -> str:
+        return CODEC_NAMES[self.codec]
+
+
+def is_frame(data) -> bool:
+    return len(data) >= HEADER.size and bytes(data[:2]) == MAGIC
+
+
+def parse_frame(data) -> AudioFrame:
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise FrameError(f"Frame shorter than {HEADER.size}-byte header")
+    magic, version, flags, codec, sequence, sample_rate = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise FrameError("Bad frame magic")
+    if version != PROTOCOL_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    if codec not in CODEC_NAMES:
+        raise FrameError(f"Unknown codec id {codec}")
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        raise FrameError(f"Sample rate {sample_rate} Hz outside {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz")
+    return AudioFrame(sequence, codec, sample_rate, bool(flags & FLAG_FINAL), view[HEADER.size:])
+
+
+def encode_frame(sequence: int, payload: bytes, codec: int = CODEC_WEBM_OPUS,
+                 sample_rate: int = 16000, is_final: bool = False) -> bytes:
+    flags = FLAG_FINAL if is_final else 0
+    return HEADER.pack(MAGIC, PROTOCOL_VERSION, flags, codec, sequence, sample_rate) + bytes(payload)
+
+
+def protocol_descriptor() -> dict:
+    """
+    Advertised in the `session_started` message so clients can negotiate a codec.
+    """
+    return {
+        "version": PROTOCOL_VERSION,
+        "header_bytes": HEADER.size,
+        "codecs": list(CODEC_NAMES.values()),
+    }
@@ -0,0 +1,204 @@
+import asyncio
+import itertools
+import queue
+import threading
+import time
+import numpy as np
+from core.admission import RANKS, AdmissionController
+from core.audio import SAMPLE_RATE
+from core.metrics import WHISPER_BATCH_SIZE, WHISPER_SECONDS
+
+
+class InferenceQueueFull(RuntimeError):
+    """
+    Raised when a non-blocking submission finds the inference queue full.
+    """
+
+
+class InferenceService:
+    """
+    Owns the Whisper model on a dedicated worker thread so transcription never
+    runs on the asyncio event loop.
+    Segment requests of the same kind (live partial or final) that arrive
+    within `batch_window_ms` of each other are decoded together in one
+    batched pass; callers simply await the result. The priority class tells
+    a cascading transcriber which model to use (see core/transcriber.py).
+    With a `loader` instead of a transcriber, the model is loaded (and, with
+    `warm_up`, run once on silence) on the worker thread, so nothing waits
+    for it at startup; requests queue until it is ready.
+    Requests reach the worker through `admission` (by default one batch in
+    flight, `max_pending` waiting): they wait in priority order and live
+    partials may be shed (see core/admission.py). Admitted requests queue for
+    the worker in the same priority order, so an urgent request is decoded
+    before routine ones admitted ahead of it.
+    """
+    def __init__(self, transcriber=None, max_pending: int = 32, max_batch: int = 8, batch_window_ms: float = 20,
+                 loader=None, warm_up: bool = False, admission: AdmissionController = None):
+        self.transcriber = transcriber
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.admission = admission or AdmissionController("whisper", limit=max_batch, max_queue=max_pending)
+        self.batch_window = batch_window_ms / 1000.0
+        self.batches_run = 0
+        self.items_decoded = 0
+        self.load_error = None
+        self.load_seconds = None
+        self.loaded = threading.Event()
+
+        self._loader = loader
+        self._warm_up = warm_up
+
+        # Entries: (rank, sequence, item); the close sentinel ranks below every class
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._worker = threading.Thread(target=self._run, name="whisper-inference", daemon=True)
+        self._worker.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def state(self) -> str:
+        if not self.loaded.is_set():
+            return "loading"
+        return "failed" if self.transcriber is None else "ready"
+
+    def _load(self):
+        start = time.monotonic()
+        try:
+            if self.transcriber is None and self._loader is not None:
+                transcriber = self._loader()
+                if self.transcriber is None:
+                    self.transcriber = transcriber
+            if self._warm_up and self.transcriber is not None:
+                # First inference allocates buffers and primes kernels; pay for it now
+                with WHISPER_SECONDS.time("warmup"):
+                    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+                    if hasattr(self.transcriber, "warm_up"):
+                        # Every model of a cascade
+                        self.transcriber.warm_up(silence)
+                    else:
+                        self.transcriber.transcribe_segments(silence)
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"Failed to load the transcription model: {e}")
+        self.load_seconds = time.monotonic() - start
+        self.loaded.set()
+
+    async def transcribe_segments(self, audio, context: str = "", block: bool = True,
+                                  priority: str = "routine_final") -> list:
+        """
+        Transcribes decoded PCM into segments (see `WhisperTranscriber.transcribe_segments`).
+        Batched requests share the clinical prompt, so `context` only applies
+        when the request is decoded on its own.
+        """
+        return await self._submit("segments", (audio, context), block, priority)
+
+    async def transcribe(self, audio_bytes: bytes, block: bool = True, priority: str = "routine_final") -> str:
+        """
+        Transcribes a complete encoded recording (see `WhisperTranscriber.transcribe`).
+        """
+        return await self._submit("bytes", audio_bytes, block, priority)
+
+    async def _submit(self, kind, payload, block, priority):
+        if not block:
+            if not self.admission.try_acquire(priority):
+                raise InferenceQueueFull(f"{self.admission.queued} transcription requests already waiting")
+        else:
+            await self.admission.acquire(priority)
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._put(RANKS[priority], (kind, payload, loop, future, priority.endswith("_final")))
+            return await future
+        finally:
+            self.admission.release()
+
+    def _put(self, rank: int, item):
+        self._queue.put((rank, next(self._sequence), item))
+
+    def _run(self):
+        self._load()
+        while True:
+            first = self._queue.get()[2]
+            if first is None:
+                break
+            batch = [first]
+            others = []
+            if first[0] == "segments":
+                deadline = time.monotonic() + self.batch_window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)[2]
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._put(len(RANKS), None)
+                        break
+                    same_kind = item[0] == "segments" and item[4] == first[4]
+                    (batch if same_kind else others).append(item)
+                self._run_segments(batch)
+            else:
+                self._run_single(first)
+            # Segment requests of the other kind (partial vs final) form their own batch
+            rest = [item for item in others if item[0] == "segments"]
+            if rest:
+                self._run_segments(rest)
+            for item in others:
+                if item[0] != "segments":
+                    self._run_single(item)
+
+    def _run_segments(self, batch):
+        try:
+            self._require_model()
+            WHISPER_BATCH_SIZE.observe(len(batch))
+            final = batch[0][4]
+            if len(batch) == 1:
+                audio, context = batch[0][1]
+                with WHISPER_SECONDS.time("segments"):
+                    results = [self.transcriber.transcribe_segments(audio, context=context, final=final)]
+            else:
+                with WHISPER_SECONDS.time("batch"):
+                    results = self.transcriber.transcribe_batch([item[1][0] for item in batch], final=final)
+            self.batches_run += 1
+            self.items_decoded += len(batch)
+            for item, result in zip(batch, results):
+                self._resolve(item, result)
+        except Exception as e:
+            for item in batch:
+                self._resolve(item, error=e)
+
+    def _run_single(self, item):
+        try:
+            self._require_model()
+            with WHISPER_SECONDS.time("full"):
+                result = self.transcriber.transcribe(item[1], final=item[4])
+            self._resolve(item, result)
+        except Exception as e:
+            self._resolve(item, error=e)
+
+    def _require_model(self):
+        if self.transcriber is None:
+            raise RuntimeError(f"Transcription model unavailable: {self.load_error}")
+
+    @staticmethod
+    def _resolve(item, result=None, error=None):
+        loop, future = item[2], item[3]
+
+        def _set():
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        loop.call_soon_threadsafe(_set)
+
+    def close(self):
+        self._put(len(RANKS), None)
+        self._worker.join(timeout=5)
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "symptom_lexicon.json")
+
+# Same word characters as the `\b` boundaries the detector used to match on;
+# clause punctuation is kept as a token because it closes a negation scope
+# ("No, I have chest pain" reports chest pain).
+TOKEN_PATTERN = re.compile(r"\w+|[.,!?;:]")
+PUNCTUATION = {".", ",", "!", "?", ";", ":"}
+
+# Used when the lexicon file is missing or unreadable
+BUILTIN_LEXICON = {
+    "symptoms": [
+        {"name": "chest pain", "category": "cardiac"},
+        {"name": "shortness of breath", "category": "respiratory"},
+        {"name": "difficulty breathing", "category": "respiratory"},
+        {"name": "dizziness", "category": "neurological"},
+        {"name": "severe headache", "category": "neurological"},
+        {"name": "bleeding", "category": "trauma"},
+        {"name": "fever", "category": "infection"},
+        {"name": "cough", "category": "respiratory"},
+        {"name": "nausea", "category": "gastrointestinal"},
+    ],
+    "negations": ["no", "not", "denies", "without", "never", "don't", "doesn't", "didn't"],
+    # A new first-person clause ends the scope too: "I am not sure I have chest pain"
+    "scope_terminators": ["but", "however", "although", "though", "except", "yet", "i", "my"],
+    "negation_window": 5,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SymptomMatch(NamedTuple):
+    symptom: str      # Canonical symptom name
+    category: str
+    term: str         # Lexicon term that matched (the symptom itself or a synonym)
+    start: int        # Token span in the transcript
+    end: int
+    negated: bool
+
+
+class SymptomLexicon:
+    """
+    Symptom terms and synonyms compiled into a word-level trie, so matching
+    costs one pass over the transcript regardless of lexicon size. Matches are
+    leftmost-longest and never overlap. A negation cue ("no", "denies", ...)
+    negates the symptoms in the next `negation_window` tokens until a scope
+    terminator ("but", "I", ...) or clause punctuation (including ","). Scopes
+    err short: a missed negation over-reports a symptom, a wrong one hides it.
+    """
+    _END = ""  # Trie key holding the (canonical, category, term) entry
+
+    def __init__(self, symptoms: list, negations: list = (), scope_terminators: list = (), negation_window: int = 5):
+        self.categories: Dict[str, str] = {}
+        self.negation_window = negation_window
+        self.scope_terminators = set(scope_terminators)
+        self._trie = {}
+        self._negation_trie = {}
+        self.term_count = 0
+
+        for entry in symptoms:
+            name = entry["name"].lower()
+            category = entry.get("category", "general")
+            self.categories[name] = category
+            for term in [name] + [s.lower() for s in entry.get("synonyms", [])]:
+                if self._insert(self._trie, term, (name, category, term)):
+                    self.term_count += 1
+
+        for cue in negations:
+            self._insert(self._negation_trie, cue.lower(), cue)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SymptomLexicon":
+        return cls(
+            data.get("symptoms", []),
+            negations=data.get("negations", []),
+            scope_terminators=data.get("scope_terminators", []),
+            negation_window=data.get("negation_window", 5),
+        )
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SymptomLexicon":
+        """
+        Builds the lexicon from a JSON file (see data/symptom_lexicon.json).
+        Falls back to the built-in symptom list if the file can't be read.
+        """
+        path = path or DEFAULT_LEXICON_PATH
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Could not load symptom lexicon {path}: {e}. Using built-in symptoms.")
+            return cls.from_dict(BUILTIN_LEXICON)
+
+    def _insert(self, trie: dict, term: str, value) -> bool:
+        tokens = tokenize(term)
+        if not tokens:
+            return False
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if self._END in node:
+            return False  # First definition of a term wins
+        node[self._END] = value
+        return True
+
+    def _longest(self, trie: dict, tokens: List[str], start: int):
+        """
+        Longest trie entry starting at `start`, as (end, value), or None.
+        """
+        node = trie
+        best = None
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if self._END in node:
+                best = (i + 1, node[self._END])
+        return best
+
+    def match(self, text: str) -> List[SymptomMatch]:
+        tokens = tokenize(text)
+        matches = []
+        negated_until = -1
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in PUNCTUATION or token in self.scope_terminators:
+                negated_until = -1
+                i += 1
+                continue
+
+            # Symptoms take precedence over cues ("no" is never part of a symptom today,
+            # but a lexicon may define e.g. "not eating")
+            found = self._longest(self._trie, tokens, i)
+            if found:
+                end, (name, category, term) = found
+                matches.append(SymptomMatch(name, category, term, i, end, i < negated_until))
+                i = end
+                continue
+
+            cue = self._longest(self._negation_trie, tokens, i)
+            if cue:
+                end = cue[0]
+                negated_until = end + self.negation_window
+                i = end
+                continue
+            i += 1
+        return matches
+
+    def detect(self, text: str) -> List[str]:
+        """
+        Canonical symptoms that are present (not negated), in order of first mention.
+        """
+        return list(dict.fromkeys(m.symptom for m in self.match(text) if not m.negated))
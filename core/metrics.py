@@ -0,0 +1,247 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+
+class LatencyWindow:
+    """
+    Rolling window of recent latency samples (seconds) with percentile lookups.
+    """
+    def __init__(self, size: int = 1024):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1)
+        }
+
+
+# Latency buckets (seconds) spanning sub-millisecond agents to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """
+    Point-in-time value; either set explicitly or read from a callback at scrape time.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._functions = {}
+
+    def set(self, value: float, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def set_function(self, fn, *labelvalues):
+        self._functions[labelvalues] = fn
+
+    def render(self) -> list:
+        for labels, fn in self._functions.items():
+            try:
+                self.set(float(fn()), *labels)
+            except Exception as e:
+                print(f"Gauge {self.name} callback failed: {e}")
+        return super().render()
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observing is a bisect and three additions under a lock.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # [per-bucket counts..., +Inf count], sum, count
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labelvalues):
+        return _Timer(self, labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def render(self) -> list:
+        lines = []
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start", "elapsed")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.elapsed, *self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Named collection of metrics, rendered in the Prometheus text format.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served at /metrics
+REGISTRY = MetricsRegistry()
+
+AGENT_SECONDS = REGISTRY.histogram(
+    "agentalert_agent_process_seconds", "Time spent in BaseAgent.process.", ("agent", "risk_level"))
+PIPELINE_RUNS = REGISTRY.counter(
+    "agentalert_pipeline_runs_total", "Pipeline runs by kind and how they ended.", ("kind", "outcome"))
+TIME_TO_FINAL_SECONDS = REGISTRY.histogram(
+    "agentalert_time_to_final_seconds", "Time from a final transcript to its pipeline run completing.")
+STAGE_RUNS = REGISTRY.counter(
+    "agentalert_pipeline_stages_total", "Pipeline stages run or skipped because their inputs were unchanged.", ("agent", "outcome"))
+AUDIO_DECODE_SECONDS = REGISTRY.histogram(
+    "agentalert_audio_decode_seconds", "Audio decode time per call.", ("path",))
+WHISPER_SECONDS = REGISTRY.histogram(
+    "agentalert_whisper_seconds", "Whisper inference time per model call.", ("kind",))
+WHISPER_TIER_SECONDS = REGISTRY.histogram(
+    "agentalert_whisper_tier_seconds", "Whisper model time per call, by cascade tier and model.", ("tier", "model"))
+WHISPER_ESCALATIONS = REGISTRY.counter(
+    "agentalert_whisper_escalations_total", "Final transcripts the partial model was (not) confident about.", ("outcome",))
+WHISPER_BATCH_SIZE = REGISTRY.histogram(
+    "agentalert_whisper_batch_size", "Requests decoded per Whisper call.", (), buckets=(1, 2, 4, 8, 16, 32))
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "agentalert_admission_wait_seconds", "Time a request waited for a model slot, by priority class.", ("resource", "priority"))
+ADMISSION_SHED = REGISTRY.counter(
+    "agentalert_admission_shed_total", "Partial requests shed because the model was saturated.", ("resource", "priority"))
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "agentalert_admission_queued", "Requests waiting for a model slot.", ("resource",))
+OLLAMA_SECONDS = REGISTRY.histogram(
+    "agentalert_ollama_request_seconds", "Ollama generate round-trip time.", ("model",))
+TTS_SECONDS = REGISTRY.histogram(
+    "agentalert_tts_seconds", "Speech synthesis time.", ("engine",))
+SPEECH_WAIT_SECONDS = REGISTRY.histogram(
+    "agentalert_speech_wait_seconds", "Time a patient response waits before playback starts.", ("priority",))
+SPEECH_DROPPED = REGISTRY.counter(
+    "agentalert_speech_dropped_total", "Patient responses not (fully) spoken.", ("reason",))
+WS_SEND_SECONDS = REGISTRY.histogram(
+    "agentalert_ws_send_seconds", "Time to send one WebSocket message.", ("message_type",))
+PUBSUB_DELIVERY_SECONDS = REGISTRY.histogram(
+    "agentalert_pubsub_delivery_seconds", "Time from publish to the message being sent on a connection.", ("message_type",))
+PUBSUB_BYTES = REGISTRY.counter(
+    "agentalert_pubsub_bytes_total", "Bytes queued to dashboard connections.", ("message_type",))
+PUBSUB_DROPPED = REGISTRY.counter(
+    "agentalert_pubsub_dropped_subscribers_total", "Dashboard connections dropped for falling behind.", ("reason",))
+EVENT_BUS_MESSAGES = REGISTRY.counter(
+    "agentalert_event_bus_messages_total", "Messages exchanged with other server workers.", ("direction",))
+AUDIT_COMMIT_SECONDS = REGISTRY.histogram(
+    "agentalert_audit_commit_seconds", "Time to commit one batch of audit entries.")
+AUDIT_BATCH_SIZE = REGISTRY.histogram(
+    "agentalert_audit_batch_size", "Audit entries per commit.", (), buckets=(1, 4, 16, 64, 256, 1024))
+STARTUP_SECONDS = REGISTRY.gauge(
+    "agentalert_startup_seconds", "Seconds from server start until each component was ready.", ("component",))
+ERRORS = REGISTRY.counter(
+    "agentalert_errors_total", "Errors by stage.", ("stage",))
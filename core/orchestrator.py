@@ -1,31 +1,191 @@
-from typing import List
+import asyncio
+from typing import Dict, List, Set
 from core.base import BaseAgent
+from core.metrics import STAGE_RUNS
 from core.state import PatientState
 from agents.detector import DetectorAgent
 from agents.reasoner import ReasonerAgent
 from agents.planner import PlannerAgent
 from agents.executor import ExecutorAgent
+from agents.alert_voice import AlertVoiceAgent
 from agents.feedback import FeedbackAgent
+from agents.audit import AuditAgent
 
 class HospitalOrchestrator:
     """
     Orchestrates the flow of agents for patient risk detection.
+    Agents declare the PatientState fields they read and write; an agent
+    waits only for earlier agents it conflicts with, so independent stages
+    run concurrently and latency follows the critical path.
+    A memoized agent whose inputs match the ones it last ran on in this
+    state (see `PatientState.for_next_run`) is skipped and its previous
+    output kept, so a repeated or filler-only transcript re-runs only the
+    stages with side effects.
     """
-    def __init__(self, ollama_model: str = "llama3"):
+    def __init__(self, ollama_model: str = "llama3", reasoning_budget_s: float = 4.0,
+                 voice_generator=None, audit_dir: str = "logs", dry_run: bool = False,
+                 planner_rules_path: str = None, llm_admission=None, batch_planning: bool = False):
+        # dry_run: actions are recorded but nobody is paged and nothing is spoken
+        # planner_rules_path: site-specific action rules (default data/planner_rules.json)
+        # llm_admission: AdmissionController shared by all sessions' LLM requests
+        # batch_planning: plan concurrently running pipelines together (see PlannerAgent)
         self.agents: List[BaseAgent] = [
             DetectorAgent(),
-            ReasonerAgent(model_name=ollama_model),
-            PlannerAgent(),
-            ExecutorAgent(),
-            FeedbackAgent()
+            ReasonerAgent(model_name=ollama_model, latency_budget_s=reasoning_budget_s, admission=llm_admission),
+            PlannerAgent(rules_path=planner_rules_path, batched=batch_planning),
+            ExecutorAgent(dry_run=dry_run),
         ]
+        if voice_generator is not None:
+            self.agents.append(AlertVoiceAgent(voice_generator))
+        self.agents.append(FeedbackAgent(speak=not dry_run))
+        if audit_dir:
+            self.agents.append(AuditAgent(log_dir=audit_dir))
+        self.get_agent("ReasonerAgent").on_late_escalation = self.replan
+        self._graphs = {}
 
-    async def run_pipeline(self, state: PatientState, on_agent_complete=None, max_agents: int = None) -> PatientState:
+    def get_agent(self, name: str) -> BaseAgent:
+        return next((agent for agent in self.agents if agent.name == name), None)
+
+    @staticmethod
+    def build_graph(agents: List[BaseAgent]) -> Dict[str, Set[str]]:
+        """
+        Maps each agent name to the earlier agents it must wait for: an agent
+        depends on an earlier one when it reads what that one writes, or writes
+        what it reads or writes. Agents without declarations are barriers.
+        """
+        deps = {}
+        for i, agent in enumerate(agents):
+            deps[agent.name] = set()
+            for earlier in agents[:i]:
+                if None in (agent.reads, agent.writes, earlier.reads, earlier.writes):
+                    deps[agent.name].add(earlier.name)
+                    continue
+                reads, writes = set(agent.reads), set(agent.writes)
+                if reads & set(earlier.writes) or writes & (set(earlier.writes) | set(earlier.reads)):
+                    deps[agent.name].add(earlier.name)
+        return deps
+
+    def _graph_for(self, agents: List[BaseAgent]) -> Dict[str, Set[str]]:
+        key = tuple(agent.name for agent in agents)
+        if key not in self._graphs:
+            self._graphs[key] = self.build_graph(agents)
+        return self._graphs[key]
+
+    async def run_pipeline(self, state: PatientState, on_agent_complete=None, max_agents: int = None,
+                           on_fast_alert=None) -> PatientState:
         print(f"\n--- Starting Orchestration for Session {state.session_id} (max_agents: {max_agents}) ---")
         agents_to_run = self.agents[:max_agents] if max_agents else self.agents
-        for agent in agents_to_run:
-            state = await agent.process(state)
+        runs_executor = any(agent.name == "ExecutorAgent" for agent in agents_to_run)
+        deps = self._graph_for(agents_to_run)
+        tasks = {}
+        snapshots = {}
+
+        async def run_agent(agent: BaseAgent):
+            if deps[agent.name]:
+                await asyncio.gather(*(tasks[name] for name in deps[agent.name]))
+            fingerprint = agent.input_fingerprint(state) if agent.memoize else None
+            if fingerprint is not None and state.stage_inputs.get(agent.name) == fingerprint:
+                self._count_stage(state, agent.name, "skipped")
+                agent.log(state, "Inputs unchanged; kept the previous result.")
+            else:
+                if fingerprint is not None:
+                    # Recorded before the run so the agent can drop it (e.g. for a fallback result)
+                    state.stage_inputs[agent.name] = fingerprint
+                try:
+                    result = await agent.run(state)
+                except BaseException:
+                    # Failed or cancelled: the output is incomplete and must not be reused
+                    state.stage_inputs.pop(agent.name, None)
+                    raise
+                if result is not state:
+                    # The agent returned a new object: merge back only what it declared
+                    fields = agent.writes if agent.writes is not None else type(result).model_fields
+                    for field in fields:
+                        setattr(state, field, getattr(result, field))
+                    state.stage_inputs = result.stage_inputs
+                self._count_stage(state, agent.name, "executed")
+            if agent.name == "DetectorAgent" and runs_executor and ReasonerAgent.is_rule_critical(state):
+                await self._dispatch_fast_alert(state, on_fast_alert)
             if on_agent_complete:
-                await on_agent_complete(agent.name, state)
+                # Concurrent agents keep mutating the shared state; callbacks see it as of completion
+                snapshots[agent.name] = state.model_copy(deep=True)
+
+        for agent in agents_to_run:
+            tasks[agent.name] = asyncio.ensure_future(run_agent(agent))
+
+        try:
+            # Callbacks fire in pipeline order, each as soon as its agent (and all before it) finished
+            for agent in agents_to_run:
+                await tasks[agent.name]
+                if on_agent_complete:
+                    await on_agent_complete(agent.name, snapshots.pop(agent.name))
+        finally:
+            for task in tasks.values():
+                task.cancel()
         print(f"--- Orchestration Complete for Session {state.session_id} ---\n")
         return state
+
+    @staticmethod
+    def _count_stage(state: PatientState, agent_name: str, outcome: str):
+        runs = state.stage_runs.setdefault(agent_name, {"executed": 0, "skipped": 0})
+        runs[outcome] += 1
+        STAGE_RUNS.inc(agent_name, outcome)
+
+    @staticmethod
+    def stage_summary(state: PatientState) -> dict:
+        """
+        Stages executed and skipped over the runs of a session's state.
+        """
+        return {
+            "executed": sum(runs["executed"] for runs in state.stage_runs.values()),
+            "skipped": sum(runs["skipped"] for runs in state.stage_runs.values()),
+            "by_agent": state.stage_runs,
+        }
+
+    async def replan(self, state: PatientState) -> PatientState:
+        """
+        Plans and executes again for a completed state whose risk level a late
+        LLM answer raised, so the escalation pages staff. The ExecutorAgent's
+        de-duplication turns a page already sent at that priority into an
+        annotation, and a patient message already given is not repeated.
+        """
+        planner = self.get_agent("PlannerAgent")
+        state = await planner.run(state)
+        # The next run keeps this plan unless its inputs change again
+        state.stage_inputs[planner.name] = planner.input_fingerprint(state)
+
+        followup = state.model_copy(deep=True)
+        followup.planned_actions = [
+            action for action in state.planned_actions
+            if not (action.get("type") == "notify_patient" and action.get("message") == state.response_text)
+        ]
+        followup.executed_actions = []
+        followup = await self.get_agent("ExecutorAgent").run(followup)
+        state.executed_actions.extend(followup.executed_actions)
+        state.response_text = followup.response_text
+        state.agent_logs.extend(followup.agent_logs[len(state.agent_logs):])
+        return state
+
+    async def _dispatch_fast_alert(self, state: PatientState, on_fast_alert=None):
+        """
+        Pages staff for rule-critical symptoms before the LLM has answered.
+        The regular Planner/Executor pass later annotates this alert (or
+        escalates it) through the ExecutorAgent's de-duplication.
+        """
+        fast_state = state.model_copy(deep=True)
+        fast_state.risk_level = "Critical"
+        fast_state.reasoning = f"Fast-path rule: critical symptoms detected ({', '.join(fast_state.symptoms)})."
+        fast_state = await self.get_agent("PlannerAgent").run(fast_state)
+        fast_state.planned_actions = [
+            {**action, "path": "fast"}
+            for action in fast_state.planned_actions
+            if action.get("type") == "alert_staff"
+        ]
+        fast_state = await self.get_agent("ExecutorAgent").run(fast_state)
+
+        state.alerts_triggered.append("fast_path_staff_alert")
+        state.human_in_the_loop_required = True
+        state.executed_actions.extend(fast_state.executed_actions)
+        state.agent_logs.extend(fast_state.agent_logs[len(state.agent_logs):])
+        if on_fast_alert:
+            await on_fast_alert(fast_state)
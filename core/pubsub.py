@@ -0,0 +1,187 @@
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, Optional, Set
+from core.metrics import ERRORS, PUBSUB_BYTES, PUBSUB_DELIVERY_SECONDS, PUBSUB_DROPPED, WS_SEND_SECONDS
+
+# Topics a state update is published to, besides its own session
+CRITICAL_TOPIC = "critical"
+CRITICAL_RISK_LEVELS = ("High", "Critical")
+
+
+def session_topic(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def ward_topic(ward: str) -> str:
+    return f"ward:{ward}"
+
+
+class Subscriber:
+    """
+    One dashboard connection: a bounded queue of serialized messages drained
+    by its own writer task, so a slow browser only ever delays itself.
+    """
+    def __init__(self, websocket, hub: "PubSubHub", max_queue: int, send_timeout_s: float):
+        self.websocket = websocket
+        self.topics: Set[str] = set()
+        self.sent = 0
+        self._hub = hub
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._send_timeout = send_timeout_s
+        self._task = asyncio.create_task(self._writer())
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def offer(self, message_type: str, text: str) -> bool:
+        try:
+            self._queue.put_nowait((message_type, text, time.monotonic()))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _writer(self):
+        try:
+            while True:
+                message_type, text, queued_at = await self._queue.get()
+                with WS_SEND_SECONDS.time(message_type):
+                    await asyncio.wait_for(self.websocket.send_text(text), self._send_timeout)
+                PUBSUB_DELIVERY_SECONDS.observe(time.monotonic() - queued_at, message_type)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._hub.drop(self.websocket, "send_timeout")
+        except Exception:
+            # Closed connection
+            self._hub.drop(self.websocket, "send_error")
+
+    def close(self):
+        self._task.cancel()
+
+
+class PubSubHub:
+    """
+    Topic-based fan-out for dashboard updates. Each message is serialized
+    once and queued on every subscriber of any of its topics; a subscriber
+    whose queue fills up or whose send stalls is dropped and disconnected.
+    Connection lookups are dictionary lookups.
+    """
+    def __init__(self, max_queue: int = 256, send_timeout_s: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout_s
+        self.published = 0
+        self.dropped = 0
+        self.subscribers: Dict[object, Subscriber] = {}
+        self._topics: Dict[str, Set[Subscriber]] = {}
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def __contains__(self, websocket) -> bool:
+        return websocket in self.subscribers
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.subscribers),
+            "topics": {topic: len(subs) for topic, subs in self._topics.items()},
+            "published": self.published,
+            "dropped_subscribers": self.dropped,
+            "max_pending": max((s.pending for s in self.subscribers.values()), default=0),
+        }
+
+    def register(self, websocket, topics: Iterable[str] = ()) -> Subscriber:
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            subscriber = self.subscribers[websocket] = Subscriber(websocket, self, self.max_queue, self.send_timeout)
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        return subscriber
+
+    def unregister(self, websocket) -> Optional[Subscriber]:
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is None:
+            return None
+        for topic in subscriber.topics:
+            members = self._topics.get(topic)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self._topics[topic]
+        subscriber.close()
+        return subscriber
+
+    def subscribe(self, websocket, topic: str):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.topics.add(topic)
+            self._topics.setdefault(topic, set()).add(subscriber)
+
+    def unsubscribe(self, websocket, topic: str):
+        subscriber = self.subscribers.get(websocket)
+        members = self._topics.get(topic)
+        if subscriber is None or members is None:
+            return
+        subscriber.topics.discard(topic)
+        members.discard(subscriber)
+        if not members:
+            del self._topics[topic]
+
+    def drop(self, websocket, reason: str):
+        """
+        Disconnects a subscriber that can't keep up.
+        """
+        if self.unregister(websocket) is None:
+            return
+        self.dropped += 1
+        PUBSUB_DROPPED.inc(reason)
+        print(f"Dropping dashboard connection ({reason}).")
+        asyncio.ensure_future(self._close(websocket))
+
+    async def _close(self, websocket):
+        try:
+            # 1013: try again later
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def send(self, websocket, message_type: str, message) -> bool:
+        """
+        Queues a message for one connection, in order with its topic messages.
+        """
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            return False
+        text = message if isinstance(message, str) else json.dumps(message, default=str)
+        if not subscriber.offer(message_type, text):
+            self.drop(websocket, "queue_full")
+            return False
+        PUBSUB_BYTES.inc(message_type, amount=len(text))
+        return True
+
+    def publish(self, topics: Iterable[str], message_type: str, message) -> int:
+        """
+        Serializes `message` once and queues it for every subscriber of any
+        of `topics` (each subscriber gets it once). Returns the recipient count.
+        """
+        recipients = set()
+        for topic in topics:
+            recipients |= self._topics.get(topic, set())
+        self.published += 1
+        if not recipients:
+            return 0
+        try:
+            text = message if isinstance(message, str) else json.dumps(message, default=str)
+        except Exception as e:
+            ERRORS.inc("pubsub")
+            print(f"Could not serialize {message_type}: {e}")
+            return 0
+        slow = [s for s in recipients if not s.offer(message_type, text)]
+        for subscriber in slow:
+            self.drop(subscriber.websocket, "queue_full")
+        delivered = len(recipients) - len(slow)
+        PUBSUB_BYTES.inc(message_type, amount=len(text) * delivered)
+        return delivered
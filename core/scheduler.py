@@ -0,0 +1,121 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict
+from core.metrics import ERRORS, PIPELINE_RUNS, TIME_TO_FINAL_SECONDS
+
+
+class _Run:
+    __slots__ = ("is_final", "start", "submitted_at", "task")
+
+    def __init__(self, is_final: bool, start: Callable[[], Awaitable]):
+        self.is_final = is_final
+        self.start = start
+        self.submitted_at = time.monotonic()
+        self.task = None
+
+
+class _Session:
+    __slots__ = ("pending", "current", "worker")
+
+    def __init__(self):
+        self.pending = deque()
+        self.current = None
+        self.worker = None
+
+
+class PipelineScheduler:
+    """
+    Runs each session's pipeline runs one at a time, in submission order,
+    so a session's results are never broadcast out of order.
+    Latest wins for live (partial) runs: a new partial replaces a queued
+    one, and a final run drops queued partials and cancels a running one
+    (its LLM request included). Final runs are never dropped or cancelled.
+    """
+    def __init__(self):
+        self.submitted = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.failed = 0
+        self._sessions: Dict[str, _Session] = {}
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "active_sessions": len(self._sessions),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def submit(self, session_id: str, is_final: bool, start: Callable[[], Awaitable]):
+        """
+        Queues `start()` (called when the run begins) for the session.
+        """
+        self.submitted += 1
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+        run = _Run(is_final, start)
+
+        if is_final:
+            self._drop_partials(session)
+        elif session.pending and not session.pending[-1].is_final:
+            self._count_coalesced(session.pending.pop())
+        session.pending.append(run)
+
+        if session.worker is None:
+            session.worker = asyncio.create_task(self._drain(session_id, session))
+
+    def cancel_partials(self, session_id: str):
+        """
+        Drops the session's live runs (e.g. it disconnected); final runs still complete.
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._drop_partials(session)
+
+    def _drop_partials(self, session: _Session):
+        for run in [run for run in session.pending if not run.is_final]:
+            session.pending.remove(run)
+            self._count_coalesced(run)
+        current = session.current
+        if current is not None and not current.is_final and current.task is not None and not current.task.done():
+            current.task.cancel()
+
+    def _count_coalesced(self, run: _Run):
+        self.coalesced += 1
+        PIPELINE_RUNS.inc("final" if run.is_final else "partial", "coalesced")
+
+    async def _drain(self, session_id: str, session: _Session):
+        try:
+            while session.pending:
+                run = session.current = session.pending.popleft()
+                kind = "final" if run.is_final else "partial"
+                run.task = asyncio.ensure_future(run.start())
+                try:
+                    await run.task
+                except asyncio.CancelledError:
+                    if not run.task.cancelled():
+                        raise
+                    # Superseded by a final run
+                    self.cancelled += 1
+                    PIPELINE_RUNS.inc(kind, "cancelled")
+                except Exception as e:
+                    self.failed += 1
+                    ERRORS.inc("pipeline")
+                    PIPELINE_RUNS.inc(kind, "failed")
+                    print(f"Pipeline run for {session_id} failed: {e}")
+                else:
+                    self.completed += 1
+                    PIPELINE_RUNS.inc(kind, "completed")
+                    if run.is_final:
+                        TIME_TO_FINAL_SECONDS.observe(time.monotonic() - run.submitted_at)
+                finally:
+                    session.current = None
+        finally:
+            if self._sessions.get(session_id) is session:
+                del self._sessions[session_id]
@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional
+from core.metrics import ERRORS, SPEECH_DROPPED, SPEECH_WAIT_SECONDS, TTS_SECONDS, LatencyWindow
+from core.voice_generator import PYTTSX3_LOCK
+
+# Lower plays first; anything not listed is routine
+SPEECH_PRIORITIES = {"Critical": 0, "High": 1}
+ROUTINE = 2
+
+
+class _Utterance:
+    __slots__ = ("session_id", "text", "priority", "enqueued_at", "generation")
+
+    def __init__(self, session_id, text, priority, generation):
+        self.session_id = session_id
+        self.text = text
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.generation = generation
+
+
+class SpeechWorker:
+    """
+    Speaks patient responses on a dedicated thread that owns the pyttsx3
+    engine, so callers only enqueue. Critical/High messages jump ahead of
+    routine ones and cut off a routine message that is already playing. A
+    newer message for a session supersedes its older ones that have not
+    started yet. The engine is initialized on that thread too; messages
+    queued meanwhile are spoken once it is up.
+    """
+    def __init__(self, rate: int = 150):
+        self.rate = rate
+        self.available = False  # Engine initialized
+        self.failed = False     # Engine could not be initialized; nothing will be spoken
+        self.spoken = 0
+        self.dropped_stale = 0
+        self.preempted = 0
+        # Enqueue-to-playback latency by priority name
+        self.latency = {}
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._latest = {}  # session_id -> generation of its newest message
+        self._cond = threading.Condition()
+        self._current: Optional[_Utterance] = None
+        self._cut_off = False
+        self._engine = None
+
+        self._thread = threading.Thread(target=self._run, name="speech-output", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return sum(1 for u in self._heap if not self._is_stale(u[2]))
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "failed": self.failed,
+            "queue_depth": self.depth,
+            "spoken": self.spoken,
+            "dropped_stale": self.dropped_stale,
+            "preempted": self.preempted,
+            "playback_latency": {name: window.summary() for name, window in self.latency.items()},
+        }
+
+    def say(self, session_id: str, text: str, risk_level: str = "Low"):
+        """
+        Queues `text` and returns immediately.
+        """
+        if self.failed or not text:
+            return
+        priority = SPEECH_PRIORITIES.get(risk_level, ROUTINE)
+        with self._cond:
+            generation = next(self._counter)
+            self._latest[session_id] = generation
+            heapq.heappush(self._heap, (priority, generation, _Utterance(session_id, text, priority, generation)))
+            self._cond.notify()
+
+    def _is_stale(self, utterance: _Utterance) -> bool:
+        return self._latest.get(utterance.session_id) != utterance.generation
+
+    def _next(self) -> _Utterance:
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, utterance = heapq.heappop(self._heap)
+                if self._is_stale(utterance):
+                    self.dropped_stale += 1
+                    SPEECH_DROPPED.inc("stale")
+                    continue
+                # Forget the session once its newest message is taken, so _latest stays bounded
+                del self._latest[utterance.session_id]
+                self._current = utterance
+                return utterance
+
+    def _on_word(self, utterance: _Utterance):
+        # Runs inside runAndWait on the worker thread, where engine.stop() is safe
+        current = self._current
+        if current is not utterance or current.priority < ROUTINE:
+            return  # Not our routine message playing (the engine is shared; see _speak)
+        with self._cond:
+            urgent = any(entry[0] < ROUTINE and not self._is_stale(entry[2]) for entry in self._heap)
+        if urgent and not self._cut_off:
+            self._cut_off = True
+            self.preempted += 1
+            SPEECH_DROPPED.inc("preempted")
+            self._engine.stop()
+
+    def _speak(self, utterance: _Utterance):
+        """
+        Speaks one message; the caller holds PYTTSX3_LOCK. pyttsx3.init()
+        returns the same engine to every caller (e.g. Pyttsx3Backend), so the
+        preemption callback is only connected while this message plays.
+        """
+        token = self._engine.connect('started-word', lambda name, location, length: self._on_word(utterance))
+        try:
+            self._engine.say(utterance.text)
+            self._engine.runAndWait()
+        finally:
+            self._engine.disconnect(token)
+
+    def _run(self):
+        try:
+            import pyttsx3
+            with PYTTSX3_LOCK:
+                self._engine = pyttsx3.init()
+                self._engine.setProperty('rate', self.rate)
+            self.available = True
+        except Exception as e:
+            print(f"Failed to initialize TTS engine: {e}")
+            self.failed = True
+            with self._cond:
+                self._heap.clear()
+                self._latest.clear()
+            return
+
+        while True:
+            utterance = self._next()
+            waited = time.monotonic() - utterance.enqueued_at
+            name = next((k for k, v in SPEECH_PRIORITIES.items() if v == utterance.priority), "routine")
+            self.latency.setdefault(name, LatencyWindow()).observe(waited)
+            SPEECH_WAIT_SECONDS.observe(waited, name)
+            try:
+                with PYTTSX3_LOCK, TTS_SECONDS.time("pyttsx3"):
+                    self._speak(utterance)
+                if not self._cut_off:
+                    self.spoken += 1
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                ERRORS.inc("tts")
+            finally:
+                self._current = None
+                self._cut_off = False
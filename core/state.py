@@ -1,13 +1,18 @@
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+_MISSING = object()
+
 class PatientState(BaseModel):
     """
     Represents the unified state of a patient encounter as it flows through the agentic system.
     """
     session_id: str
     timestamp: datetime = Field(default_factory=datetime.now)
+    # Monotonic creation time, used for latency measurements only
+    created_monotonic: float = Field(default_factory=time.monotonic, exclude=True)
     
     # Input Data
     audio_path: Optional[str] = None
@@ -29,11 +34,21 @@ class PatientState(BaseModel):
     
     # Feedback & Observation
     response_text: Optional[str] = None
+    # URLs of the spoken alert clips; delivered separately, never serialized with the state
+    alert_audio: List[str] = Field(default_factory=list, exclude=True)
     observations: List[str] = Field(default_factory=list)
     human_in_the_loop_required: bool = False
     
     # History
     agent_logs: List[Dict[str, Any]] = Field(default_factory=list)
+    # Milliseconds spent per stage (agents, audio decode, Whisper)
+    stage_timings: Dict[str, float] = Field(default_factory=dict)
+    # Fingerprint of the inputs each memoized stage last ran on, and how often
+    # each stage ran or was skipped over the session (see HospitalOrchestrator)
+    stage_inputs: Dict[str, str] = Field(default_factory=dict, exclude=True)
+    stage_runs: Dict[str, Dict[str, int]] = Field(default_factory=dict, exclude=True)
+    # Set for live previews of a partial transcript; their model requests yield to final ones
+    is_partial: bool = Field(default=False, exclude=True)
 
     def add_log(self, agent_name: str, message: str):
         self.agent_logs.append({
@@ -42,5 +57,45 @@ class PatientState(BaseModel):
             "message": message
         })
 
+    def for_next_run(self, transcript: Optional[str]) -> "PatientState":
+        """
+        A copy for the session's next pipeline run on `transcript`. Memoized
+        stage outputs (symptoms, risk, plan) and their input fingerprints are
+        kept; what the run's side effects produce starts empty.
+        """
+        return self.model_copy(deep=True, update={
+            "transcript": transcript,
+            "timestamp": datetime.now(),
+            "created_monotonic": time.monotonic(),
+            "executed_actions": [],
+            "response_text": None,
+            "alert_audio": [],
+            "observations": [],
+            "alerts_triggered": [],
+            "agent_logs": [],
+            "stage_timings": {},
+        })
+
     def to_dict(self):
         return self.model_dump()
+
+    def changes_since(self, previous: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, List[Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Compares the state with an earlier `model_dump(mode="json")` snapshot.
+        Returns (snapshot, set, append, merge): the new snapshot, fields whose
+        value changed, list fields that only grew (as their new items) and
+        dict fields that only gained or updated keys (as those keys).
+        """
+        snapshot = self.model_dump(mode="json")
+        changed, appended, merged = {}, {}, {}
+        for field, value in snapshot.items():
+            old = previous.get(field, _MISSING)
+            if old == value:
+                continue
+            if isinstance(value, list) and isinstance(old, list) and len(value) > len(old) and value[:len(old)] == old:
+                appended[field] = value[len(old):]
+            elif isinstance(value, dict) and isinstance(old, dict) and old and old.keys() <= value.keys():
+                merged[field] = {k: v for k, v in value.items() if old.get(k, _MISSING) != v}
+            else:
+                changed[field] = value
+        return snapshot, changed, appended, merged
@@ -0,0 +1,183 @@
+import asyncio
+import time
+import numpy as np
+from core.admission import LoadShed, priority_class
+from core.audio import SAMPLE_RATE, StreamDecoder
+
+
+class StreamingTranscriber:
+    """
+    Per-session incremental transcription.
+    Keeps decoded audio in a bounded rolling window and only re-transcribes the
+    audio that has not been committed yet (plus a short overlap for context).
+    Segments that end well before the live edge are committed and never
+    transcribed again, so the cost of each update stays constant no matter how
+    long the session runs.
+    With a VoiceActivityDetector attached, silence never reaches Whisper and
+    utterances are closed on the server when trailing silence is detected.
+    """
+    def __init__(self, inference, sample_rate: int = SAMPLE_RATE,
+                 overlap_s: float = 1.0, holdback_s: float = 1.5,
+                 max_window_s: float = 12.0, min_new_s: float = 1.0, vad=None):
+        self.inference = inference
+        self.sample_rate = sample_rate
+        self.overlap = int(overlap_s * sample_rate)
+        self.holdback = holdback_s
+        self.max_window = int(max_window_s * sample_rate)
+        self.min_new = int(min_new_s * sample_rate)
+        self.vad = vad
+        # Set by the server from the session's detected intent and risk; raises Whisper priority
+        self.urgent = False
+        self.shed = 0
+
+        self.committed = []
+        self.partial = ""
+        # Milliseconds spent decoding and in Whisper for the latest update
+        self.timings = {}
+        self._decoder = None
+        # Rolling window: `_context` samples of already-committed audio followed by pending audio
+        self._window = np.zeros(0, dtype=np.float32)
+        self._context = 0
+        self._new = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def text(self) -> str:
+        return " ".join(part for part in self.committed + [self.partial] if part)
+
+    async def feed_encoded(self, data: bytes) -> list:
+        """
+        Appends a chunk of the session's encoded (webm/opus) stream.
+        """
+        if self._decoder is None:
+            self._decoder = StreamDecoder(self.sample_rate)
+        start = time.perf_counter()
+        pcm = self._decoder.feed(data)
+        self.timings["audio_decode"] = round((time.perf_counter() - start) * 1000, 3)
+        return await self.feed_pcm(pcm)
+
+    async def feed_pcm(self, pcm: np.ndarray) -> list:
+        """
+        Appends decoded PCM and transcribes it once enough new speech is buffered.
+        Returns:
+            A list of (text, is_final) transcript updates; `is_final` is set when
+            the VAD detected the end of an utterance.
+        """
+        pieces = self.vad.process(pcm) if self.vad is not None else [(pcm, False)]
+        updates = []
+        for speech, ended in pieces:
+            self._append(speech)
+            if ended:
+                text = await self._close_utterance()
+                if text:
+                    updates.append((text, True))
+        if self._new >= self.min_new:
+            try:
+                await self._step(final=False)
+            except LoadShed:
+                # Whisper is saturated: skip this live update, the audio stays pending
+                self.shed += 1
+                return updates
+            if self.text:
+                updates.append((self.text, False))
+        return updates
+
+    async def finish(self) -> str:
+        """
+        Flushes the decoder, commits everything that is left and resets the stream.
+        """
+        if self._decoder is not None:
+            decoder, self._decoder = self._decoder, None
+            tail = await asyncio.to_thread(decoder.close)
+            pieces = self.vad.process(tail) if self.vad is not None else [(tail, False)]
+            for speech, _ in pieces:
+                self._append(speech)
+        if self.vad is not None:
+            self.vad.end_utterance()
+        text = await self._close_utterance()
+        await self.reset()
+        return text
+
+    async def reset(self):
+        """
+        Discards the stream's audio and text. Closing the decoder (joining its
+        pump thread and ffmpeg) happens off the event loop.
+        """
+        decoder, self._decoder = self._decoder, None
+        self.committed = []
+        self.partial = ""
+        self._window = np.zeros(0, dtype=np.float32)
+        self._context = 0
+        self._new = 0
+        if decoder is not None:
+            await asyncio.to_thread(decoder.close)
+
+    def _append(self, pcm: np.ndarray):
+        if pcm.size:
+            self._window = np.concatenate([self._window, pcm])
+            self._new += pcm.size
+
+    async def _close_utterance(self) -> str:
+        if self._new:
+            await self._step(final=True)
+        if self.partial:
+            # The pending window was already transcribed by the last step
+            self.committed.append(self.partial)
+            self.partial = ""
+        text = self.text
+        # Start the next utterance with a clean window; the decoder keeps running
+        self.committed = []
+        self._window = np.zeros(0, dtype=np.float32)
+        self._context = 0
+        self._new = 0
+        return text
+
+    async def _step(self, final: bool):
+        # Steps are serialized; audio appended while one is awaiting stays pending
+        async with self._lock:
+            window = self._window
+            new, self._new = self._new, 0
+            context_text = " ".join(self.committed[-3:])
+            start = time.perf_counter()
+            try:
+                segments = await self.inference.transcribe_segments(
+                    window, context=context_text, priority=priority_class(self.urgent, final))
+            except LoadShed:
+                self._new += new
+                raise
+            self.timings["whisper"] = round((time.perf_counter() - start) * 1000, 3)
+
+            window_end = window.size / self.sample_rate
+            context_end = self._context / self.sample_rate
+            overflow = window.size > self.max_window
+
+            pending = []
+            commit_until = None
+            for i, seg in enumerate(segments):
+                # Segments centred inside the overlap were committed by a previous step
+                if (seg["start"] + seg["end"]) / 2 <= context_end:
+                    continue
+                is_last = i == len(segments) - 1
+                if final or seg["end"] <= window_end - self.holdback or (overflow and not is_last):
+                    self.committed.append(seg["text"])
+                    commit_until = seg["end"]
+                else:
+                    pending.append(seg["text"])
+            if overflow and commit_until is None and pending:
+                # A single utterance filled the whole window: commit it rather than grow
+                self.committed.extend(pending)
+                commit_until = window_end
+                pending = []
+            self.partial = " ".join(pending)
+
+            if commit_until is not None:
+                self._trim(int(commit_until * self.sample_rate))
+            elif overflow and not pending:
+                # Nothing but silence in a full window: keep only the overlap
+                self._trim(window.size)
+
+    def _trim(self, commit_sample: int):
+        commit_sample = min(commit_sample, self._window.size)
+        start = max(commit_sample - self.overlap, 0)
+        self._window = self._window[start:].copy()
+        self._context = commit_sample - start
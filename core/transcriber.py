@@ -1,7 +1,12 @@
 import whisper
+import torch
 import os
-import tempfile
+from contextlib import contextmanager
+from typing import Optional
 import numpy as np
+from core.audio import decode_audio
+from core.metrics import WHISPER_ESCALATIONS, WHISPER_TIER_SECONDS
+from core.vad import VoiceActivityDetector
 
 # Ensure ffmpeg is found
 try:
@@ -13,45 +18,278 @@ try:
 except ImportError:
     pass
 
-class WhisperTranscriber:
-    def __init__(self, model_size="base"):
+CLINICAL_PROMPT = "A medical encounter. The patient is describing symptoms: chest pain, shortness of breath, dizziness, heart palpitations."
+
+# whisper.transcribe's default: a segment this likely to be silence is not speech (if also low confidence)
+NO_SPEECH_THRESHOLD = 0.6
+
+# Loaded models by size; a server loading them before forking workers shares the weights
+_MODELS = {}
+
+
+def load_model(model_size="base"):
+    model = _MODELS.get(model_size)
+    if model is None:
         print(f"Loading Whisper model: {model_size}...")
-        self.model = whisper.load_model(model_size)
+        model = _MODELS[model_size] = whisper.load_model(model_size)
         print("Whisper model loaded.")
+    return model
+
+
+class _Tier:
+    """
+    One model of the cascade, with its tokenizer and torch thread count.
+    """
+    def __init__(self, name: str, model_size: str, threads: Optional[int]):
+        self.name = name
+        self.model_size = model_size
+        self.model = load_model(model_size)
+        self.threads = threads
+        kwargs = {"num_languages": self.model.num_languages} if hasattr(self.model, "num_languages") else {}
+        self.tokenizer = whisper.tokenizer.get_tokenizer(self.model.is_multilingual, **kwargs)
 
-    def transcribe(self, audio_bytes: bytes) -> str:
+    @contextmanager
+    def running(self):
+        """
+        Runs the model with this tier's thread count (restored afterwards) and times it.
+        """
+        previous = torch.get_num_threads() if self.threads else None
+        if previous is not None and previous != self.threads:
+            torch.set_num_threads(self.threads)
+        try:
+            with WHISPER_TIER_SECONDS.time(self.name, self.model_size):
+                yield self.model
+        finally:
+            if previous is not None and previous != self.threads:
+                torch.set_num_threads(previous)
+
+
+class WhisperTranscriber:
+    """
+    Transcribes with `model_size`, or with a two-model cascade when
+    `partial_model_size` is given: live partials (`final=False`) use the
+    small, fast partial model and final transcripts the more accurate one.
+    Both stay in memory; `partial_threads` and `final_threads` cap the torch
+    threads each uses (by default, torch's setting is left alone).
+    With `escalate_logprob`, a final is first decoded by the partial model and
+    only decoded again by the final model when that result is not confident:
+    a segment's average log-probability is below `escalate_logprob`, or its
+    no-speech probability is above `escalate_no_speech`.
+    """
+    def __init__(self, model_size="base", partial_model_size: Optional[str] = None,
+                 partial_threads: Optional[int] = None, final_threads: Optional[int] = None,
+                 escalate_logprob: Optional[float] = None, escalate_no_speech: float = NO_SPEECH_THRESHOLD):
+        self.final_tier = _Tier("final", model_size, final_threads)
+        if partial_model_size and partial_model_size != model_size:
+            self.partial_tier = _Tier("partial", partial_model_size, partial_threads)
+        else:
+            self.partial_tier = self.final_tier
+        self.escalate_logprob = escalate_logprob if self.is_cascade else None
+        self.escalate_no_speech = escalate_no_speech
+        self.accepted = 0
+        self.escalated = 0
+        # The final model, as before the cascade
+        self.model = self.final_tier.model
+        self.tokenizer = self.final_tier.tokenizer
+
+    @property
+    def is_cascade(self) -> bool:
+        return self.partial_tier is not self.final_tier
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "final_model": self.final_tier.model_size,
+            "partial_model": self.partial_tier.model_size,
+            "escalate_logprob": self.escalate_logprob,
+            "finals_accepted_from_partial_model": self.accepted,
+            "finals_escalated": self.escalated,
+        }
+
+    def warm_up(self, audio: np.ndarray):
+        """
+        Runs each model once (the first inference allocates buffers and primes kernels).
+        """
+        for tier in {id(tier): tier for tier in (self.final_tier, self.partial_tier)}.values():
+            try:
+                self._run(tier, audio, CLINICAL_PROMPT)
+            except Exception as e:
+                print(f"Transcription Error: {e}")
+
+    def transcribe(self, audio_bytes: bytes, final: bool = True, raise_errors: bool = False) -> str:
         """
         Transcribes audio bytes using Whisper.
         Args:
             audio_bytes: The raw audio data (webm/wav/mp3 etc.)
+            final: Whether this is a final transcript (selects the cascade tier).
+            raise_errors: Raise on failure instead of returning the error as the text.
         Returns:
             The transcribed text.
         """
-        # Save bytes to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_audio:
-            temp_audio.write(audio_bytes)
-            temp_audio_path = temp_audio.name
+        try:
+            # Only speech reaches the model; pure silence skips Whisper entirely
+            audio = VoiceActivityDetector().speech_only(decode_audio(audio_bytes))
+            if audio.size == 0:
+                return ""
+            result = self._transcribe(audio, CLINICAL_PROMPT, final)
+            return result.get("text", "").strip()
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Transcription Error: {e}")
+            return f"Error transcribing audio: {e}"
 
+    def transcribe_segments(self, audio: np.ndarray, context: str = "", final: bool = True) -> list:
+        """
+        Transcribes decoded 16 kHz mono float32 PCM.
+        Args:
+            audio: The samples to transcribe.
+            context: Previously committed text, appended to the clinical prompt.
+            final: Whether this is a final transcript (selects the cascade tier).
+        Returns:
+            Whisper segments as dicts with `start`, `end` (seconds) and `text`.
+        """
+        if audio.size == 0:
+            return []
+        prompt = f"{CLINICAL_PROMPT} {context}".strip() if context else CLINICAL_PROMPT
         try:
-            # Clinical prompt to guide the model and reduce hallucinations
-            prompt = "A medical encounter. The patient is describing symptoms: chest pain, shortness of breath, dizziness, heart palpitations."
-            
-            # Transcribe with optimized parameters
-            result = self.model.transcribe(
-                temp_audio_path, 
+            result = self._transcribe(audio.astype(np.float32, copy=False), prompt, final)
+        except Exception as e:
+            print(f"Transcription Error: {e}")
+            return []
+        return [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+            for seg in result.get("segments", [])
+            if seg.get("text", "").strip()
+        ]
+
+    def _transcribe(self, audio, prompt: str, final: bool) -> dict:
+        if not final:
+            return self._run(self.partial_tier, audio, prompt)
+        if self.escalate_logprob is None:
+            return self._run(self.final_tier, audio, prompt)
+        result = self._run(self.partial_tier, audio, prompt)
+        if self._confident([(seg["avg_logprob"], seg["no_speech_prob"]) for seg in result.get("segments", [])]):
+            self._count(escalated=False)
+            return result
+        self._count(escalated=True)
+        return self._run(self.final_tier, audio, prompt)
+
+    @staticmethod
+    def _run(tier: _Tier, audio, prompt: str) -> dict:
+        with tier.running() as model:
+            return model.transcribe(
+                audio,
                 fp16=False,
+                # Clinical prompt to guide the model and reduce hallucinations
                 initial_prompt=prompt,
-                condition_on_previous_text=False, # Helps reduce repetitions/hallucinations
-                temperature=0.0 # More deterministic
+                condition_on_previous_text=False,  # Helps reduce repetitions/hallucinations
+                temperature=0.0  # More deterministic
             )
-            return result.get("text", "").strip()
+
+    def _confident(self, scores) -> bool:
+        """
+        Whether the partial model's (avg_logprob, no_speech_prob) scores make a final pass unnecessary.
+        """
+        return all(logprob >= self.escalate_logprob and no_speech <= self.escalate_no_speech
+                   for logprob, no_speech in scores)
+
+    def _count(self, escalated: bool):
+        if escalated:
+            self.escalated += 1
+        else:
+            self.accepted += 1
+        WHISPER_ESCALATIONS.inc("escalated" if escalated else "accepted")
+
+    def transcribe_batch(self, audios: list, final: bool = True) -> list:
+        """
+        Transcribes several PCM clips with a single batched decoder pass.
+        Clips longer than Whisper's 30 s window fall back to `transcribe_segments`.
+        Returns one segment list per clip, in order.
+        """
+        results = [[] for _ in audios]
+        batch = []
+        for i, audio in enumerate(audios):
+            if audio.size == 0:
+                continue
+            if audio.size > whisper.audio.N_SAMPLES:
+                results[i] = self.transcribe_segments(audio, final=final)
+            else:
+                batch.append(i)
+        if not batch:
+            return results
+
+        if not final or self.escalate_logprob is None:
+            self._decode_into(self.final_tier if final else self.partial_tier, audios, batch, results)
+            return results
+
+        # Cascade: clips the partial model is not confident about are decoded again by the final model
+        decoded = self._decode_into(self.partial_tier, audios, batch, results)
+        escalate = []
+        for i, result in zip(batch, decoded):
+            confident = self._confident([(result.avg_logprob, result.no_speech_prob)])
+            self._count(escalated=not confident)
+            if not confident:
+                escalate.append(i)
+        if escalate:
+            self._decode_into(self.final_tier, audios, escalate, results)
+        return results
+
+    def _decode_into(self, tier: _Tier, audios: list, batch: list, results: list) -> list:
+        """
+        Decodes the clips at indices `batch` in one pass of `tier`'s model and
+        stores their segments in `results`. Returns the decoding results.
+        """
+        try:
+            with tier.running() as model:
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(audios[i].astype(np.float32, copy=False)),
+                        n_mels=model.dims.n_mels
+                    )
+                    for i in batch
+                ]).to(model.device)
+                options = whisper.DecodingOptions(
+                    fp16=False,
+                    temperature=0.0,
+                    prompt=CLINICAL_PROMPT,
+                    without_timestamps=False
+                )
+                decoded = whisper.decode(model, mels, options)
         except Exception as e:
-            print(f"Transcription Error: {e}")
-            return f"Error transcribing audio: {e}"
-        finally:
-            # Clean up
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
+            print(f"Batched Transcription Error: {e}")
+            return []
+
+        for i, result in zip(batch, decoded):
+            # Same silence gate as whisper.transcribe's defaults
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < -1.0:
+                results[i] = []
+                continue
+            duration = audios[i].size / whisper.audio.SAMPLE_RATE
+            results[i] = self._segments_from_tokens(result.tokens, duration, tier.tokenizer)
+        return decoded
+
+    def _segments_from_tokens(self, tokens, duration: float, tokenizer=None) -> list:
+        """
+        Splits a decoded token sequence into segments at its timestamp tokens.
+        """
+        tokenizer = tokenizer or self.tokenizer
+        ts_begin = tokenizer.timestamp_begin
+        segments = []
+        start = 0.0
+        text_tokens = []
+        for token in tokens:
+            if token >= ts_begin:
+                t = (token - ts_begin) * 0.02
+                if text_tokens:
+                    segments.append({"start": start, "end": t, "text": tokenizer.decode(text_tokens).strip()})
+                    text_tokens = []
+                start = t
+            else:
+                text_tokens.append(token)
+        if text_tokens:
+            segments.append({"start": start, "end": duration, "text": tokenizer.decode(text_tokens).strip()})
+        return [seg for seg in segments if seg["text"]]
 
 if __name__ == "__main__":
     # Test (requires an actual audio file)
@@ -0,0 +1,142 @@
+import numpy as np
+from core.audio import SAMPLE_RATE
+
+
+class VoiceActivityDetector:
+    """
+    Energy-based voice activity detection and endpointing on 16 kHz PCM.
+    Frames are classified in one vectorized pass per chunk against an adaptive
+    noise floor; non-speech frames are dropped and an utterance is closed once
+    `endpoint_ms` of trailing silence follows speech.
+    """
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                 min_db: float = -45.0, margin_db: float = 10.0, max_floor_db: float = -45.0,
+                 hangover_ms: int = 300, preroll_ms: int = 90, endpoint_ms: int = 800):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.min_db = min_db
+        self.margin_db = margin_db
+        self.max_floor_db = max_floor_db
+        self.hangover = max(hangover_ms // frame_ms, 0)
+        self.preroll = max(preroll_ms // frame_ms, 0)
+        self.endpoint_frames = max(endpoint_ms // frame_ms, 1)
+
+        self.total_frames = 0
+        self.speech_frames = 0
+        self.utterances = 0
+
+        self._floor = None
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._raw_tail = np.zeros(self.hangover, dtype=bool)
+        self._in_speech = False
+        self._silence_run = 0
+
+    @property
+    def stats(self) -> dict:
+        processed = self.total_frames * self.frame_ms / 1000
+        speech = self.speech_frames * self.frame_ms / 1000
+        return {
+            "processed_s": round(processed, 2),
+            "speech_s": round(speech, 2),
+            "skipped_s": round(processed - speech, 2),
+            "skipped_ratio": round(1 - speech / processed, 3) if processed else 0.0,
+            "utterances": self.utterances
+        }
+
+    def process(self, pcm: np.ndarray) -> list:
+        """
+        Classifies a chunk of PCM.
+        Returns:
+            A list of (speech_pcm, utterance_ended) pieces in order. Silence is
+            never returned; `utterance_ended` marks where an endpoint was detected.
+        """
+        if self._remainder.size:
+            pcm = np.concatenate([self._remainder, pcm])
+        n = pcm.size // self.frame
+        self._remainder = pcm[n * self.frame:].copy()
+        if n == 0:
+            return []
+
+        frames = pcm[:n * self.frame].reshape(n, self.frame)
+        energy = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+        raw = energy > self._threshold(energy)
+        speech = self._smooth(raw)
+
+        self.total_frames += n
+        self.speech_frames += int(speech.sum())
+        return self._split(frames, speech)
+
+    def end_utterance(self):
+        """
+        Closes the current utterance without waiting for trailing silence.
+        """
+        if self._in_speech:
+            self.utterances += 1
+        self._in_speech = False
+        self._silence_run = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def speech_only(self, pcm: np.ndarray, gap_ms: int = 200) -> np.ndarray:
+        """
+        Returns just the speech in a complete recording, with short gaps between utterances.
+        """
+        pieces = [piece for piece, _ in self.process(pcm) if piece.size]
+        self.end_utterance()
+        if not pieces:
+            return np.zeros(0, dtype=np.float32)
+        gap = np.zeros(int(self.sample_rate * gap_ms / 1000), dtype=np.float32)
+        joined = [pieces[0]]
+        for piece in pieces[1:]:
+            joined.extend([gap, piece])
+        return np.concatenate(joined)
+
+    def _threshold(self, energy: np.ndarray) -> float:
+        quiet = float(np.percentile(energy, 10))
+        if self._floor is None:
+            self._floor = quiet
+        elif quiet < self._floor:
+            self._floor = 0.7 * self._floor + 0.3 * quiet
+        else:
+            # Rise slowly so sustained speech does not become the new floor
+            self._floor = 0.98 * self._floor + 0.02 * quiet
+        floor = min(self._floor, self.max_floor_db)
+        return max(self.min_db, floor + self.margin_db)
+
+    def _smooth(self, raw: np.ndarray) -> np.ndarray:
+        n = raw.size
+        speech = raw.copy()
+        if self.hangover:
+            # Extend speech forward, carrying the previous chunk's tail across the boundary
+            extended = np.concatenate([self._raw_tail, raw]).astype(np.int32)
+            window = np.convolve(extended, np.ones(self.hangover + 1, dtype=np.int32))[:extended.size]
+            speech |= window[-n:] > 0
+            self._raw_tail = extended[-self.hangover:].astype(bool)
+        if self.preroll:
+            # Extend speech backward to keep soft word onsets
+            window = np.convolve(raw[::-1].astype(np.int32), np.ones(self.preroll + 1, dtype=np.int32))[:n]
+            speech |= window[::-1] > 0
+        return speech
+
+    def _split(self, frames: np.ndarray, speech: np.ndarray) -> list:
+        boundaries = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [speech.size]])
+
+        pieces = []
+        current = []
+        for start, end in zip(starts, ends):
+            if speech[start]:
+                current.append(frames[start:end].reshape(-1))
+                self._in_speech = True
+                self._silence_run = 0
+                continue
+            self._silence_run += end - start
+            if self._in_speech and self._silence_run >= self.endpoint_frames:
+                pieces.append((np.concatenate(current) if current else np.zeros(0, dtype=np.float32), True))
+                current = []
+                self._in_speech = False
+                self.utterances += 1
+        if current:
+            pieces.append((np.concatenate(current), False))
+        return pieces
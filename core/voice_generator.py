@@ -1,32 +1,286 @@
-from gtts import gTTS
+import asyncio
 import base64
+import hashlib
 import io
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+try:
+    from gtts import gTTS
+except ImportError:
+    gTTS = None
+from core.metrics import ERRORS, TTS_SECONDS
+
+# pyttsx3.init() hands every caller the same engine, which is not thread-safe
+PYTTSX3_LOCK = threading.Lock()
+
+MIME_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+
+
+class GTTSBackend:
+    """
+    Google Translate TTS. Needs network access.
+    """
+    kind = "gtts"
+    extension = "mp3"
 
-class VoiceGenerator:
     def __init__(self, lang="en"):
         self.lang = lang
+        self.name = f"{self.kind}-{lang}"
 
-    def text_to_speech_base64(self, text: str) -> str:
+    def synthesize(self, text: str) -> bytes:
+        if gTTS is None:
+            raise ImportError("gTTS library missing")
+        fp = io.BytesIO()
+        gTTS(text=text, lang=self.lang).write_to_fp(fp)
+        return fp.getvalue()
+
+
+class Pyttsx3Backend:
+    """
+    Offline TTS through the local speech engine (SAPI5, NSSpeech or eSpeak).
+    """
+    kind = "pyttsx3"
+    extension = "wav"
+
+    def __init__(self, rate=150):
+        self.rate = rate
+        self.name = f"{self.kind}-{rate}"
+
+    def synthesize(self, text: str) -> bytes:
+        import pyttsx3
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with PYTTSX3_LOCK:
+                engine = pyttsx3.init()
+                engine.setProperty("rate", self.rate)
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+def default_backend(lang="en"):
+    """
+    Backend named by the TTS_BACKEND environment variable ("gtts" or "pyttsx3").
+    """
+    if os.environ.get("TTS_BACKEND", "gtts").lower() == "pyttsx3":
+        return Pyttsx3Backend()
+    return GTTSBackend(lang)
+
+
+class SpeechCache:
+    """
+    Content-addressed store of synthesized audio: an LRU in memory bounded by
+    `max_memory_bytes`, backed by files under `directory` bounded by
+    `max_disk_bytes` (least recently used files are removed first).
+    """
+    def __init__(self, directory: Optional[str] = "cache/tts", max_memory_bytes: int = 32 * 2**20,
+                 max_disk_bytes: int = 256 * 2**20):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    @staticmethod
+    def key_for(backend_name: str, text: str) -> str:
+        return hashlib.sha256(f"{backend_name}|{text}".encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def __contains__(self, key: str) -> bool:
+        # Memory only; a disk lookup is I/O and belongs on a worker
+        return key in self._memory
+
+    def get(self, key: str, extension: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        if self.directory:
+            path = self._path(key, extension)
+            try:
+                with open(path, "rb") as f:
+                    audio = f.read()
+                os.utime(path)  # Marks the file as recently used
+                self.disk_hits += 1
+                self._remember(key, audio)
+                return audio
+            except FileNotFoundError:
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, key: str, extension: str, audio: bytes):
+        self._remember(key, audio)
+        if self.directory:
+            path = self._path(key, extension)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+            self._trim_disk()
+
+    def _remember(self, key: str, audio: bytes):
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _trim_disk(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+class VoiceGenerator:
+    """
+    Text-to-speech for the dashboard. Synthesis runs on a small worker pool
+    and is cached by content: audio is addressed by a key derived from the
+    backend and the text, which the server exposes at /tts/<key>.
+    """
+    def __init__(self, lang="en", backend=None, cache_dir: Optional[str] = "cache/tts",
+                 max_workers: int = 4, max_memory_bytes: int = 32 * 2**20, max_disk_bytes: int = 256 * 2**20):
+        self.lang = lang
+        self.backend = backend or default_backend(lang)
+        self.cache = SpeechCache(cache_dir, max_memory_bytes=max_memory_bytes, max_disk_bytes=max_disk_bytes)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES.get(self.backend.extension, "application/octet-stream")
+
+    def audio_url(self, key: str) -> str:
+        return f"/tts/{key}.{self.backend.extension}"
+
+    def key_for(self, text: str) -> str:
+        return SpeechCache.key_for(self.backend.name, text)
+
+    def synthesize(self, text: str) -> Optional[str]:
+        """
+        Returns the cache key of the audio for `text`, synthesizing it on a
+        miss, or None if synthesis failed. Blocks; concurrent calls for the
+        same text share one synthesis.
         """
-        Converts text to speech and returns it as a base64 encoded MP3 string.
+        future = self.submit(text)
+        return future.result() if future else None
+
+    def submit(self, text: str) -> Optional[Future]:
+        """
+        Schedules synthesis on the worker pool; the future resolves to the key.
         """
         if not text:
+            return None
+        key = self.key_for(text)
+        if key in self.cache:
+            # Cached phrases never queue behind slow syntheses
+            future = Future()
+            future.set_result(key)
+            return future
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            created = future is None
+            if created:
+                future = self._inflight[key] = self._pool.submit(self._synthesize, key, text)
+        if created:
+            # Outside the lock: the callback runs immediately if synthesis already finished
+            future.add_done_callback(lambda _f: self._forget(key))
+        return future
+
+    async def synthesize_async(self, text: str) -> Optional[str]:
+        future = self.submit(text)
+        return await asyncio.wrap_future(future) if future else None
+
+    def precompute(self, phrases: Iterable[str]) -> List[Future]:
+        """
+        Warms the cache with fixed phrases (e.g. the planner's patient messages) in the background.
+        """
+        return [f for f in (self.submit(text) for text in phrases) if f]
+
+    def get_audio(self, key: str) -> Optional[Tuple[bytes, str]]:
+        audio = self.cache.get(key, self.backend.extension)
+        return (audio, self.mime_type) if audio is not None else None
+
+    def text_to_speech_base64(self, text: str) -> str:
+        """
+        Converts text to speech and returns it as a base64 encoded audio string.
+        """
+        key = self.synthesize(text)
+        if not key:
             return ""
-            
+        audio = self.cache.get(key, self.backend.extension)
+        return base64.b64encode(audio).decode("utf-8") if audio else ""
+
+    def _forget(self, key: str):
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+
+    def _synthesize(self, key: str, text: str) -> Optional[str]:
+        if self.cache.get(key, self.backend.extension) is not None:
+            return key
         try:
-            tts = gTTS(text=text, lang=self.lang)
-            fp = io.BytesIO()
-            tts.write_to_fp(fp)
-            fp.seek(0)
-            
-            audio_base64 = base64.b64encode(fp.read()).decode('utf-8')
-            return audio_base64
+            with TTS_SECONDS.time(self.backend.kind):
+                audio = self.backend.synthesize(text)
+            self.cache.put(key, self.backend.extension, audio)
+            return key
         except Exception as e:
             print(f"TTS Error: {e}")
-            return ""
+            ERRORS.inc("tts")
+            return None
+
 
 if __name__ == "__main__":
     generator = VoiceGenerator()
+    start = time.perf_counter()
     b64 = generator.text_to_speech_base64("I have a severe chest pain")
-    print(f"Generated {len(b64)} bytes of base64 audio.")
+    print(f"Generated {len(b64)} bytes of base64 audio in {time.perf_counter() - start:.2f}s.")
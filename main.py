@@ -8,30 +8,35 @@ async def main():
     print("====================================================")
     print("  AGENTIC PATIENT RISK DETECTION & ALERTING SYSTEM  ")
     print("====================================================")
-    print("Real-time voice-activated monitoring started.")
+    print("Console monitoring started.")
     print("TIP: Run 'python server.py' for the visual dashboard.")
-    print("Press Ctrl+C to stop.")
+    print("Type what the patient says and press Enter; Ctrl+C or Ctrl+D to stop.")
     
     # Initialize the orchestrator
     orchestrator = HospitalOrchestrator(ollama_model="llama3")
     
+    # One long-lived state for the monitoring session: each pass starts from the
+    # previous one, so stages whose inputs haven't changed are not run again
+    state = None
+    session_id = str(uuid.uuid4())[:8]
+
     try:
         while True:
-            # Create a new state for each "breath" or "incident" 
-            # In a real system, this would be a continuous stream window
-            session_id = str(uuid.uuid4())[:8]
-            state = PatientState(session_id=session_id)
-            
-            # Run the agent pipeline
-            # 1. Listen (waits for voice activity)
-            # 2. Reason
-            # 3. Plan
-            # 4. Act
-            # 5. Respond
-            await orchestrator.run_pipeline(state)
-            
-            print(f"\n[SYSTEM] Ready for next input...\n")
-            
+            # 1. Listen: the pipeline runs only when a new transcript arrives.
+            # Typed here; the dashboard server takes it from the microphone instead.
+            try:
+                text = (await asyncio.to_thread(input, "Patient> ")).strip()
+            except EOFError:
+                break
+            if not text:
+                continue
+
+            # 2. Reason  3. Plan  4. Act  5. Respond
+            state = state.for_next_run(text) if state else PatientState(session_id=session_id, transcript=text)
+            state = await orchestrator.run_pipeline(state)
+            stages = orchestrator.stage_summary(state)
+            print(f"\n[SYSTEM] Session stages run: {stages['executed']}, skipped: {stages['skipped']}. Ready for next input...\n")
+
     except KeyboardInterrupt:
         print("\nShutting down safely...")
     except Exception as e:
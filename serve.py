@@ -0,0 +1,131 @@
+"""
+Multi-process dashboard server: several server.py workers sharing one port.
+
+    python serve.py --workers 4 --port 8000
+
+The Whisper model (or both models of a cascade) is loaded once, before the
+workers fork, so its weights are shared copy-on-write instead of loaded per
+worker. A session lives on the worker that accepted its WebSocket: its audio,
+transcription and pipeline never leave that worker. Workers share dashboard
+updates through an event broker on a Unix socket, so a critical alert raised
+on one worker reaches dashboards connected to any of them (ward and
+all-critical topics, snapshots and resyncs included). A worker that exits is
+restarted.
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+
+def run_broker(path: str):
+    import asyncio
+    from core.eventbus import EventBroker
+    try:
+        asyncio.run(EventBroker(path).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_worker(worker_id: int, sock: socket.socket, options: dict):
+    os.environ["AGENTALERT_WORKER_ID"] = str(worker_id)
+    os.environ["AGENTALERT_EVENT_BUS"] = options["bus_path"]
+    try:
+        import torch
+        # Split the cores between workers instead of every worker using all of them
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // options["workers"]))
+    except ImportError:
+        pass
+
+    import uvicorn
+    # Builds this worker's orchestrator, services and threads; the model is already in memory
+    import server
+    config = uvicorn.Config(server.app, log_level=options["log_level"])
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--whisper-partial-model", help="Smaller model for live partials (see WHISPER_PARTIAL_MODEL)")
+    parser.add_argument("--no-preload", action="store_true", help="Let each worker load its own Whisper model")
+    parser.add_argument("--bus-path", default=os.path.join(tempfile.gettempdir(), f"agentalert-bus-{os.getpid()}.sock"))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    os.environ["WHISPER_MODEL"] = args.whisper_model
+    if args.whisper_partial_model:
+        os.environ["WHISPER_PARTIAL_MODEL"] = args.whisper_partial_model
+    if not args.no_preload:
+        from core.transcriber import load_model
+        load_model(args.whisper_model)
+        if args.whisper_partial_model:
+            load_model(args.whisper_partial_model)
+    # Modules every worker needs, imported once here and shared
+    import fastapi, uvicorn  # noqa: F401
+    import core.orchestrator  # noqa: F401
+    # Objects alive now are never collected; keeps the GC from writing to (and copying) shared pages
+    gc.freeze()
+
+    sock = bind(args.host, args.port)
+    options = {"bus_path": args.bus_path, "workers": args.workers, "log_level": args.log_level}
+    context = multiprocessing.get_context("fork")
+
+    def start_broker():
+        process = context.Process(target=run_broker, args=(args.bus_path,), name="event-broker", daemon=True)
+        process.start()
+        return process
+
+    def start_worker(worker_id):
+        process = context.Process(target=run_worker, args=(worker_id, sock, options), name=f"worker-{worker_id}")
+        process.start()
+        return process
+
+    # Stop cleanly on SIGTERM as on Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    broker = start_broker()
+    workers = {worker_id: start_worker(worker_id) for worker_id in range(args.workers)}
+    print(f"Serving on {args.host}:{args.port} with {args.workers} workers (event bus {args.bus_path}).")
+    try:
+        while True:
+            time.sleep(1)
+            if not broker.is_alive():
+                print("Event broker exited; restarting it.")
+                broker = start_broker()
+            for worker_id, process in list(workers.items()):
+                if not process.is_alive():
+                    print(f"Worker {worker_id} exited with code {process.exitcode}; restarting it.")
+                    workers[worker_id] = start_worker(worker_id)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in list(workers.values()) + [broker]:
+            if process.is_alive():
+                process.terminate()
+        for process in list(workers.values()) + [broker]:
+            process.join(timeout=10)
+        sock.close()
+        if os.path.exists(args.bus_path):
+            os.unlink(args.bus_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import time
+# Startup time is measured from here
+STARTED_AT = time.monotonic()
+
 import asyncio
 import uuid
 import json
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 import uvicorn
 import os
 
@@ -19,89 +25,340 @@ except ImportError:
 
 from core.state import PatientState
 from core.orchestrator import HospitalOrchestrator
-from core.transcriber import WhisperTranscriber
+from core.streaming import StreamingTranscriber
+from core.inference import InferenceService
+from core.audio import decode_audio
+from core.vad import VoiceActivityDetector
+from core.metrics import REGISTRY, STARTUP_SECONDS
+from core.framing import CODEC_NAMES, CODEC_PCM16, FrameError, is_frame, parse_frame, protocol_descriptor
 from core.voice_generator import VoiceGenerator
+from core.delta import StateDeltaTracker
+from core.pubsub import CRITICAL_RISK_LEVELS, CRITICAL_TOPIC, PubSubHub, session_topic, ward_topic
+from core.eventbus import EventBusClient
+from core.scheduler import PipelineScheduler
+from core.admission import AdmissionController, LoadShed, is_urgent, priority_class
+
+@asynccontextmanager
+async def lifespan(app):
+    if bus is not None:
+        bus.start()
+    # Connections are accepted right away; models load in the background
+    warmup = asyncio.create_task(warm_up())
+    yield
+    warmup.cancel()
+    if bus is not None:
+        bus.stop()
+    if audit is not None:
+        await asyncio.to_thread(audit.store.close)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Admission control for the models every session shares: at most the given number of
+# requests in flight; the rest wait by priority (urgent sessions, then final transcripts)
+# and live partials are shed when the queue is full
+ADMISSION_QUEUE = int(os.environ.get("ADMISSION_QUEUE", "64"))
+whisper_admission = AdmissionController("whisper", limit=int(os.environ.get("WHISPER_CONCURRENCY", "8")),
+                                        max_queue=ADMISSION_QUEUE)
+llm_admission = AdmissionController("ollama", limit=int(os.environ.get("OLLAMA_CONCURRENCY", "4")),
+                                    max_queue=ADMISSION_QUEUE)
 
 # Global orchestrator and tools
-orchestrator = HospitalOrchestrator(ollama_model="llama3")
-transcriber = WhisperTranscriber(model_size="base")
 voice_gen = VoiceGenerator()
+orchestrator = HospitalOrchestrator(ollama_model="llama3", voice_generator=voice_gen,
+                                    planner_rules_path=os.environ.get("PLANNER_RULES"),
+                                    llm_admission=llm_admission)
+# The patient messages are fixed; synthesize them once in the background
+voice_gen.precompute(orchestrator.get_agent("PlannerAgent").rules.static_messages())
+audit = orchestrator.get_agent("AuditAgent")
+
+def _env_number(name, cast):
+    value = os.environ.get(name)
+    return cast(value) if value else None
+
+def load_transcriber():
+    # Imported here, on the inference thread: whisper and torch take seconds to import.
+    # Under serve.py the models are already loaded (before the workers forked) and shared.
+    from core.transcriber import WhisperTranscriber
+    # WHISPER_PARTIAL_MODEL: a smaller model for live partials (WHISPER_MODEL does the finals);
+    # with WHISPER_ESCALATE_LOGPROB, finals go to WHISPER_MODEL only when the small model is unsure
+    return WhisperTranscriber(model_size=os.environ.get("WHISPER_MODEL", "base"),
+                              partial_model_size=os.environ.get("WHISPER_PARTIAL_MODEL") or None,
+                              partial_threads=_env_number("WHISPER_PARTIAL_THREADS", int),
+                              final_threads=_env_number("WHISPER_FINAL_THREADS", int),
+                              escalate_logprob=_env_number("WHISPER_ESCALATE_LOGPROB", float))
+
+# Whisper loads and runs on its own worker thread; the event loop only awaits results.
+# Audio that arrives while it loads waits in the queue; manual transcripts don't need it.
+inference = InferenceService(loader=load_transcriber, warm_up=True, admission=whisper_admission)
 
 # Ensure static directory exists
 if not os.path.exists("static"):
     os.makedirs("static")
 
-# Helper to broadcast status
-active_connections = []
+# Dashboard connections and their topic subscriptions
+hub = PubSubHub()
 
-# Track active pipeline tasks to prevent overlaps
-session_locks = {}
+# Ward of each session, if the dashboard gave one (?ward=...)
+session_wards = {}
 
-async def broadcast_agent_status(agent_name, state):
-    data = {
-        "type": "agent_update",
-        "agent": agent_name,
-        "state": state.to_dict()
+# Sessions with an open connection, and the last state sent for each (updates go out as deltas)
+connected_sessions = set()
+state_tracker = StateDeltaTracker()
+
+# One pipeline run at a time per session; live updates are coalesced, latest wins
+scheduler = PipelineScheduler()
+
+# Per-session incremental transcription state
+session_streams = {}
+
+# Each session's latest completed pipeline state; the next run starts from it and skips unchanged stages
+session_states = {}
+
+# State of each session's most recently started run; late LLM answers for older runs aren't broadcast
+running_states = {}
+
+def on_bus_message(message):
+    kind = message.get("kind")
+    session_id = message.get("session_id")
+    if kind == "publish":
+        # An update for a session on another worker: keep a mirror for snapshots and
+        # resyncs, and deliver it to this worker's subscribers of its topics
+        snapshot = message["type"] == "state_snapshot"
+        in_sync = state_tracker.mirror(session_id, message["type"], message["text"],
+                                       None if snapshot else message["topics"])
+        hub.publish(message["topics"], message["type"], message["text"])
+        if not in_sync:
+            bus.publish({"kind": "resync", "session_id": session_id})
+    elif kind == "resync" and session_id in connected_sessions:
+        snapshot = state_tracker.snapshot(session_id)
+        if snapshot:
+            bus.publish({"kind": "snapshot", "session_id": session_id,
+                         "topics": state_tracker.topics(session_id), "text": snapshot})
+    elif kind == "snapshot" and session_id not in connected_sessions:
+        state_tracker.mirror(session_id, "state_snapshot", message["text"], message["topics"])
+    elif kind == "forget" and session_id not in connected_sessions:
+        state_tracker.forget(session_id)
+
+# Set by serve.py when running several workers: dashboard updates are shared through its event broker
+WORKER_ID = os.environ.get("AGENTALERT_WORKER_ID", "0")
+bus = EventBusClient(os.environ["AGENTALERT_EVENT_BUS"], WORKER_ID, on_bus_message) \
+    if os.environ.get("AGENTALERT_EVENT_BUS") else None
+
+def publish(topics, message_type, text, session_id):
+    hub.publish(topics, message_type, text)
+    if bus is not None:
+        bus.publish({"kind": "publish", "session_id": session_id, "topics": topics,
+                     "type": message_type, "text": text})
+
+def forget_session(session_id):
+    state_tracker.forget(session_id)
+    if bus is not None:
+        bus.publish({"kind": "forget", "session_id": session_id})
+
+async def send_message(connection, message_type, text):
+    # Queued behind the connection's earlier messages; its writer task does the sending
+    hub.send(connection, message_type, text)
+
+def topics_for(state):
+    topics = [session_topic(state.session_id)]
+    ward = session_wards.get(state.session_id)
+    if ward:
+        topics.append(ward_topic(ward))
+    if state.risk_level in CRITICAL_RISK_LEVELS:
+        topics.append(CRITICAL_TOPIC)
+    return topics
+
+def publish_state(event_type, state, agent=None, audio_alerts=None):
+    topics = topics_for(state)
+    delta, snapshot, entered = state_tracker.update(state, event_type, topics, agent=agent, audio_alerts=audio_alerts)
+    if snapshot:
+        # Subscribers of a topic the session just joined have no base for the delta
+        publish(entered, "state_snapshot", snapshot, state.session_id)
+    publish(topics, event_type, delta, state.session_id)
+    if state.session_id not in connected_sessions:
+        forget_session(state.session_id)
+
+def send_snapshots(websocket, topic):
+    for sid in state_tracker.sessions_in(topic):
+        hub.send(websocket, "state_snapshot", state_tracker.snapshot(sid))
+
+async def broadcast_state_event(event_type, state):
+    publish_state(event_type, state)
+
+async def broadcast_reasoning_update(state):
+    # A late LLM answer refined a state whose pipeline already completed
+    if running_states.get(state.session_id, state) is not state:
+        return  # A newer run has already been broadcast
+    await broadcast_state_event("reasoning_update", state)
+
+async def broadcast_fast_alert(state):
+    # Staff were paged by rule before the LLM answered
+    await broadcast_state_event("fast_alert", state)
+
+orchestrator.get_agent("ReasonerAgent").on_late_assessment = broadcast_reasoning_update
+feedback = orchestrator.get_agent("FeedbackAgent")
+
+# Scrape-time gauges for state owned by other components
+REGISTRY.gauge("agentalert_whisper_queue_depth", "Transcription requests waiting for the model.").set_function(
+    lambda: inference.pending)
+REGISTRY.gauge("agentalert_speech_queue_depth", "Patient responses waiting to be spoken.").set_function(
+    lambda: feedback.speech.depth if feedback.speech else 0)
+_reasoner_cache = REGISTRY.gauge("agentalert_reasoner_cache_lookups", "ReasonerAgent cache lookups by result.", ("result",))
+for _result in ("hits", "misses", "shared_inflight"):
+    _reasoner_cache.set_function(lambda r=_result: orchestrator.get_agent("ReasonerAgent").cache.stats[r], _result)
+
+# Readiness of the components loaded in the background: loading, ready, failed or disabled
+llm_state = "loading"
+
+async def warm_up_llm():
+    global llm_state
+    # Pull the Ollama model into memory so the first patient doesn't pay for it
+    llm_state = "ready" if await orchestrator.get_agent("ReasonerAgent").warm_up() else "failed"
+    if llm_state == "ready":
+        STARTUP_SECONDS.set(time.monotonic() - STARTED_AT, "llm")
+
+async def wait_for_transcription():
+    while not inference.loaded.is_set():
+        await asyncio.sleep(0.05)
+    if inference.state == "ready":
+        STARTUP_SECONDS.set(time.monotonic() - STARTED_AT, "transcription")
+
+async def warm_up():
+    await asyncio.gather(warm_up_llm(), wait_for_transcription())
+
+def component_states():
+    speech = feedback.speech
+    return {
+        # Required: audio can't be transcribed without it
+        "transcription": inference.state,
+        # Optional: without them risk is assessed by rule and responses aren't spoken
+        "llm": llm_state,
+        "speech": "disabled" if speech is None else
+                  "failed" if speech.failed else "ready" if speech.available else "loading",
+        "event_bus": "disabled" if bus is None else "ready" if bus.connected else "loading",
     }
-    
-    # If the state has new executed actions that are alerts, generate voice
-    if agent_name == "ExecutorAgent" and state.executed_actions:
-        vocal_messages = []
-        for action in state.executed_actions:
-            if action.get("type") in ["alert_staff", "notify_patient"]:
-                msg = action.get("message")
-                if msg and msg not in vocal_messages:
-                    vocal_messages.append(msg)
-        
-        if vocal_messages:
-            full_message = " ".join(vocal_messages)
-            try:
-                voice_b64 = voice_gen.text_to_speech_base64(full_message)
-                data["audio_alert"] = voice_b64
-            except Exception as e:
-                print(f"Voice gen error: {e}")
-
-    # Broadicast to all, but handle dead connections
-    to_remove = []
-    for connection in active_connections:
-        try:
-            await connection.send_text(json.dumps(data, default=str))
-        except Exception:
-            to_remove.append(connection)
-            
-    for conn in to_remove:
-        if conn in active_connections:
-            active_connections.remove(conn)
+
+async def broadcast_agent_status(agent_name, state):
+    # Alert audio is synthesized by AlertVoiceAgent concurrently with the rest of the pipeline;
+    # clients fetch the clips from /tts, which browsers cache since the URLs are content-addressed
+    audio_alerts = state.alert_audio if agent_name == "AlertVoiceAgent" else None
+
+    # One delta, serialized once for all subscribers of the session, its ward and (if High/Critical) all-critical
+    publish_state("agent_update", state, agent=agent_name, audio_alerts=audio_alerts)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
     
     session_id = str(uuid.uuid4())[:8]
-    await websocket.send_text(json.dumps({
+    # Every dashboard follows its own session; ?ward=3A also publishes it to that ward,
+    # ?subscribe=ward:3A,critical follows other topics too
+    ward = websocket.query_params.get("ward")
+    if ward:
+        session_wards[session_id] = ward
+    extra_topics = [t for t in websocket.query_params.get("subscribe", "").split(",") if t]
+    hub.register(websocket, [session_topic(session_id)] + extra_topics)
+    connected_sessions.add(session_id)
+    await send_message(websocket, "session_started", json.dumps({
         "type": "session_started",
-        "session_id": session_id
+        "session_id": session_id,
+        "audio_protocol": protocol_descriptor()
     }))
+    for topic in extra_topics:
+        send_snapshots(websocket, topic)
+
+    # Binary frame protocol state (see core/framing.py)
+    audio_codec = "webm-opus"
+    expected_seq = 0
+
+    async def handle_pipeline(text, is_final, timings=None):
+        # Called by the scheduler when the run starts, after the session's previous run ended
+        previous = session_states.get(session_id)
+        state = previous.for_next_run(text) if previous else PatientState(session_id=session_id, transcript=text)
+        if timings:
+            state.stage_timings.update(timings)
+        state.is_partial = not is_final
+        if session_id in connected_sessions:
+            running_states[session_id] = state
+        await orchestrator.run_pipeline(
+            state,
+            on_agent_complete=broadcast_agent_status,
+            max_agents=None if is_final else 2,
+            on_fast_alert=broadcast_fast_alert
+        )
+        if session_id in connected_sessions:
+            session_states[session_id] = state
+        stream = session_streams.get(session_id)
+        if stream is not None:
+            stream.urgent = is_urgent(state)
+
+    def submit_pipeline(text, is_final, timings=None):
+        scheduler.submit(session_id, is_final, lambda: handle_pipeline(text, is_final, timings))
+
+    def get_stream():
+        stream = session_streams.get(session_id)
+        if stream is None:
+            stream = session_streams[session_id] = StreamingTranscriber(inference, vad=VoiceActivityDetector())
+            stream.urgent = is_urgent(session_states.get(session_id))
+        return stream
 
-    async def handle_pipeline(state, is_final):
-        # Prevent overlapping pipeline runs for the same session
-        if session_id in session_locks and not is_final:
-            print(f"Skipping live update for {session_id} as a pipeline is already running.")
+    def whisper_priority(is_final):
+        return priority_class(is_urgent(session_states.get(session_id)), is_final)
+
+    async def publish_transcript(text, is_final):
+        if text:
+            result = {
+                "type": "transcription_result",
+                "text": text,
+                "is_final": is_final
+            }
+            timings = None
+            stream = session_streams.get(session_id)
+            if stream is not None:
+                # How much audio the VAD kept away from Whisper in this session
+                result["vad"] = stream.vad.stats
+                timings = dict(stream.timings)
+            await send_message(websocket, "transcription_result", json.dumps(result))
+            
+            # Runs in the background; the receiver loop keeps reading audio
+            submit_pipeline(text, is_final, timings)
+
+    async def handle_frame(frame):
+        nonlocal expected_seq
+        if frame.sequence < expected_seq:
+            return  # Duplicate / retransmitted frame
+        if frame.sequence > expected_seq:
+            print(f"Audio frame gap for {session_id}: expected {expected_seq}, got {frame.sequence}")
+            await send_message(websocket, "audio_error", json.dumps({
+                "type": "audio_error",
+                "reason": "sequence_gap",
+                "expected": expected_seq,
+                "received": frame.sequence
+            }))
+            await get_stream().reset()
+            expected_seq = 0
+            return
+        expected_seq += 1
+        if frame.codec_name != audio_codec:
+            await send_message(websocket, "audio_error", json.dumps({
+                "type": "audio_error",
+                "reason": "codec_mismatch",
+                "expected": audio_codec,
+                "received": frame.codec_name
+            }))
             return
 
-        session_locks[session_id] = True
-        try:
-            await orchestrator.run_pipeline(
-                state,
-                on_agent_complete=broadcast_agent_status,
-                max_agents=None if is_final else 2
-            )
-        finally:
-            if session_id in session_locks:
-                del session_locks[session_id]
+        stream = get_stream()
+        if frame.codec == CODEC_PCM16:
+            # Payload is a view into the received message; no intermediate copy
+            updates = await stream.feed_pcm(decode_audio(frame.payload, codec="pcm16", sample_rate=frame.sample_rate))
+        else:
+            updates = await stream.feed_encoded(frame.payload)
+        if frame.is_final:
+            updates.append((await stream.finish(), True))
+            expected_seq = 0
+        for text, is_final in updates:
+            await publish_transcript(text, is_final)
 
     try:
         while True:
@@ -112,54 +369,168 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if msg.get("type") == "manual_transcript":
                     text = msg.get("text")
-                    state = PatientState(session_id=session_id, transcript=text)
-                    asyncio.create_task(handle_pipeline(state, True))
+                    submit_pipeline(text, True)
+                
+                elif msg.get("type") in ("subscribe", "unsubscribe"):
+                    for topic in msg.get("topics", []):
+                        if msg["type"] == "subscribe":
+                            hub.subscribe(websocket, topic)
+                            send_snapshots(websocket, topic)
+                        else:
+                            hub.unsubscribe(websocket, topic)
+                    subscriber = hub.subscribers.get(websocket)
+                    await send_message(websocket, "subscriptions", json.dumps({
+                        "type": "subscriptions",
+                        "topics": sorted(subscriber.topics) if subscriber else []
+                    }))
+                
+                elif msg.get("type") == "resync":
+                    # The client missed a delta for this session
+                    snapshot = state_tracker.snapshot(msg.get("session_id") or session_id)
+                    if snapshot:
+                        hub.send(websocket, "state_snapshot", snapshot)
+                
+                elif msg.get("type") == "audio_config":
+                    requested = msg.get("codec")
+                    if requested in CODEC_NAMES.values():
+                        audio_codec = requested
+                    await send_message(websocket, "audio_config_ack", json.dumps({
+                        "type": "audio_config_ack",
+                        "codec": audio_codec,
+                        "accepted": requested == audio_codec
+                    }))
                 
                 elif msg.get("type") == "audio_transcript":
                     import base64
-                    audio_bytes = base64.b64decode(msg.get("audio"))
+                    audio_bytes = base64.b64decode(msg.get("audio") or "")
                     is_final = msg.get("is_final", True)
                     
                     # Transcribe
-                    text = transcriber.transcribe(audio_bytes)
+                    if msg.get("incremental"):
+                        # Only the new chunk was sent; the session stream keeps the rest
+                        stream = get_stream()
+                        updates = await stream.feed_encoded(audio_bytes)
+                        if is_final:
+                            updates.append((await stream.finish(), True))
+                    else:
+                        try:
+                            updates = [(await inference.transcribe(audio_bytes, priority=whisper_priority(is_final)),
+                                        is_final)]
+                        except LoadShed:
+                            updates = []  # Whisper is saturated; a later update covers this audio
                     
-                    if text:
-                        await websocket.send_text(json.dumps({
-                            "type": "transcription_result",
-                            "text": text,
-                            "is_final": is_final
-                        }))
-                        
-                        state = PatientState(session_id=session_id, transcript=text)
-                        # We use create_task to avoid blocking the receiver loop
-                        asyncio.create_task(handle_pipeline(state, is_final))
+                    for text, update_final in updates:
+                        await publish_transcript(text, update_final)
             
             elif "bytes" in message_data:
                 audio_bytes = message_data["bytes"]
-                text = transcriber.transcribe(audio_bytes)
-                if text:
-                    await websocket.send_text(json.dumps({
-                        "type": "transcription_result",
-                        "text": text,
-                        "is_final": True
-                    }))
-                    state = PatientState(session_id=session_id, transcript=text)
-                    asyncio.create_task(handle_pipeline(state, True))
+                if is_frame(audio_bytes):
+                    try:
+                        frame = parse_frame(audio_bytes)
+                    except FrameError as e:
+                        print(f"Bad audio frame from {session_id}: {e}")
+                        await send_message(websocket, "audio_error", json.dumps({
+                            "type": "audio_error",
+                            "reason": "bad_frame",
+                            "detail": str(e)
+                        }))
+                        continue
+                    await handle_frame(frame)
+                else:
+                    # Unframed binary message: a complete recording
+                    text = await inference.transcribe(audio_bytes, priority=whisper_priority(True))
+                    await publish_transcript(text, True)
                     
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"WS Error for {session_id}: {e}")
     finally:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
-        if session_id in session_locks:
-            del session_locks[session_id]
+        hub.unregister(websocket)
+        session_wards.pop(session_id, None)
+        connected_sessions.discard(session_id)
+        forget_session(session_id)
+        session_states.pop(session_id, None)
+        running_states.pop(session_id, None)
+        scheduler.cancel_partials(session_id)
+        stream = session_streams.pop(session_id, None)
+        if stream is not None:
+            await stream.reset()
+
+@app.get("/stats")
+async def get_stats():
+    reasoner = orchestrator.get_agent("ReasonerAgent")
+    executor = orchestrator.get_agent("ExecutorAgent")
+    return {
+        "reasoner_cache": reasoner.cache.stats if reasoner else None,
+        "reasoner_models": reasoner.stats() if reasoner else None,
+        "pipeline_scheduler": scheduler.stats,
+        "admission": {"whisper": whisper_admission.stats, "ollama": llm_admission.stats},
+        "transcriber": getattr(inference.transcriber, "stats", None),
+        "pipeline_stages": {sid: orchestrator.stage_summary(state) for sid, state in session_states.items()},
+        "alert_latency": {path: window.summary() for path, window in executor.alert_latency.items()} if executor else None,
+        "tts_cache": voice_gen.cache.stats,
+        "pubsub": hub.stats,
+        "event_bus": bus.stats if bus is not None else None,
+        "audit": audit.store.stats if audit is not None else None,
+        "speech_output": feedback.speech.stats if feedback.speech else None
+    }
+
+@app.get("/audit")
+async def get_audit(session_id: Optional[str] = None, risk: Optional[List[str]] = Query(None),
+                    since: Optional[str] = None, until: Optional[str] = None,
+                    limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0),
+                    logs: bool = True):
+    # since/until: unix seconds or ISO 8601; risk is repeatable (?risk=High&risk=Critical)
+    if audit is None:
+        return JSONResponse(status_code=404, content={"error": "Audit trail is disabled"})
+    try:
+        entries = await asyncio.to_thread(audit.store.query, session_id, since, until, risk,
+                                          limit, offset, logs)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": f"Invalid time: {e}"})
+    return {"count": len(entries), "entries": entries}
+
+@app.get("/tts/{clip}")
+async def get_tts(clip: str):
+    key = clip.split(".")[0]
+    found = await asyncio.to_thread(voice_gen.get_audio, key)
+    if found is None:
+        return Response(status_code=404)
+    audio, mime_type = found
+    return Response(content=audio, media_type=mime_type,
+                    headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the event loop is serving requests
+    return {"status": "ok", "uptime_s": round(time.monotonic() - STARTED_AT, 3)}
+
+@app.get("/readyz")
+async def readyz():
+    components = component_states()
+    ready = components["transcription"] == "ready"
+    return JSONResponse(status_code=200 if ready else 503, content={
+        "ready": ready,
+        "components": components,
+        "import_s": round(import_seconds, 3),
+        "uptime_s": round(time.monotonic() - STARTED_AT, 3),
+        "transcription_load_s": round(inference.load_seconds, 3) if inference.load_seconds is not None else None,
+        "transcription_error": inference.load_error,
+    })
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def get():
     with open("static/index.html", "r") as f:
         return HTMLResponse(content=f.read())
 
+import_seconds = time.monotonic() - STARTED_AT
+STARTUP_SECONDS.set(import_seconds, "import")
+
 if __name__ == "__main__":
+    # One process; see serve.py for several workers
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,18 @@
+from core.audit_store import AuditStore, import_text_logs
+
+LEGACY_LOG = """Session: {session}
+[2026-01-02 07:00:00] DetectorAgent: Detected Symptoms: ['fever'], Intent: General Communication
+"""
+
+
+def test_reimport_counts_duplicates_not_inserts(tmp_path):
+    for session in ("a1", "b2"):
+        (tmp_path / f"{session}.txt").write_text(LEGACY_LOG.format(session=session))
+    store = AuditStore(str(tmp_path / "audit.db"))
+    try:
+        assert import_text_logs(store, str(tmp_path)) == (2, 0)
+        assert import_text_logs(store, str(tmp_path)) == (0, 2)
+        assert store.stats["written"] == 2 and store.stats["duplicates"] == 2
+        assert len(store.query()) == 2
+    finally:
+        store.close()
@@ -0,0 +1,19 @@
+import batch
+
+
+class FailingTranscriber:
+    def transcribe(self, audio_bytes: bytes, final: bool = True, raise_errors: bool = False) -> str:
+        if raise_errors:
+            raise RuntimeError("decoder crashed")
+        return "Error transcribing audio: decoder crashed"
+
+
+def test_failed_transcription_is_an_error_record(tmp_path, monkeypatch):
+    recording = tmp_path / "r1.wav"
+    recording.write_bytes(b"not audio")
+    batch._init_worker({"verbose": True, "rules_only": True, "ollama_model": None, "reasoning_budget_s": None,
+                        "audio": False, "include_logs": False, "workers": 1, "whisper_model": "base"})
+    monkeypatch.setattr(batch, "_transcriber", FailingTranscriber())
+
+    [result] = batch.score_chunk(0, [{"id": "r1", "audio_path": str(recording)}])
+    assert result == {"id": "r1", "error": "Transcription failed: decoder crashed"}
@@ -0,0 +1,56 @@
+import asyncio
+import itertools
+
+import numpy as np
+
+from agents.planner import BUILTIN_RULES, PlannerAgent
+from core.decision_table import DecisionTable
+from core.state import PatientState
+
+RISK_LEVELS = ["Low", "Moderate", "High", "Critical", "Unknown"]
+INTENTS = ["Requesting Assistance", "Status Inquiry", "General Communication", None]
+
+
+def states():
+    return [PatientState(session_id=f"s{i}", risk_level=risk, intent=intent)
+            for i, (risk, intent) in enumerate(itertools.product(RISK_LEVELS, INTENTS))]
+
+
+def test_decide_batch_matches_plan():
+    table = DecisionTable.from_dict(BUILTIN_RULES)
+    batch = states()
+    columns = {field: [getattr(s, field) for s in batch] for field in table.fields}
+    for rule_ids, human in (table.decide_batch(columns),
+                            table.decide_batch({f: np.asarray(c).astype(np.str_) for f, c in columns.items()})):
+        assert rule_ids.shape == (len(batch), len(table.groups))
+        for state, rules, human_in_the_loop in zip(batch, rule_ids.tolist(), human.tolist()):
+            actions = [table.rule_action(r, state) for r in rules if r >= 0]
+            assert (actions, human_in_the_loop) == table.plan(state)
+
+def test_plan_batch_matches_plan():
+    table = DecisionTable.from_dict(BUILTIN_RULES)
+    batch = states()
+    assert table.plan_batch(batch) == [table.plan(s) for s in batch]
+
+
+def test_plan_without_rule_values():
+    table = DecisionTable.from_dict(BUILTIN_RULES)
+    state = PatientState(session_id="s", risk_level="Unknown", intent="Something else entirely")
+    actions, human_in_the_loop = table.plan(state)
+    assert [a["type"] for a in actions] == ["notify_patient"]
+    assert not human_in_the_loop
+
+
+def test_batched_planner_plans_concurrent_states_together():
+    planner = PlannerAgent(batched=True)
+    calls = []
+    plan_batch = planner.rules.plan_batch
+    planner.rules.plan_batch = lambda batch: calls.append(len(batch)) or plan_batch(batch)
+
+    async def run():
+        return await asyncio.gather(*(planner.process(s) for s in states()))
+
+    planned = asyncio.run(run())
+    assert calls == [len(planned)]
+    for state in planned:
+        assert (state.planned_actions, state.human_in_the_loop_required) == planner.rules.plan(state)
@@ -0,0 +1,20 @@
+import pytest
+
+from core.framing import CODEC_PCM16, HEADER, MAGIC, PROTOCOL_VERSION, FrameError, encode_frame, parse_frame
+
+
+def test_round_trip():
+    frame = parse_frame(encode_frame(3, b"\x01\x00" * 4, codec=CODEC_PCM16, sample_rate=48000, is_final=True))
+    assert (frame.sequence, frame.codec_name, frame.sample_rate, frame.is_final) == (3, "pcm16", 48000, True)
+    assert bytes(frame.payload) == b"\x01\x00" * 4
+
+
+@pytest.mark.parametrize("sample_rate", [0, 1, 7999, 192001, 2**32 - 1])
+def test_rejects_out_of_range_sample_rate(sample_rate):
+    with pytest.raises(FrameError):
+        parse_frame(encode_frame(0, b"\x00\x00", codec=CODEC_PCM16, sample_rate=sample_rate))
+
+
+def test_rejects_unknown_codec():
+    with pytest.raises(FrameError):
+        parse_frame(HEADER.pack(MAGIC, PROTOCOL_VERSION, 0, 7, 0, 16000))
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from core.admission import AdmissionController
+from core.inference import InferenceService
+
+
+class RecordingTranscriber:
+    """
+    Records the order clips are decoded in; the first call blocks until released.
+    """
+    def __init__(self):
+        self.order = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def transcribe_segments(self, audio, context="", final=True):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.order.append(int(audio[0]))
+        return []
+
+    def transcribe_batch(self, audios, final=True):
+        return [self.transcribe_segments(audio, final=final) for audio in audios]
+
+
+def test_admitted_requests_are_decoded_in_priority_order():
+    async def run():
+        transcriber = RecordingTranscriber()
+        service = InferenceService(transcriber, max_batch=1, batch_window_ms=0,
+                                   admission=AdmissionController("whisper", limit=8))
+        clip = lambda n: np.full(160, n, dtype=np.float32)
+        # Occupies the worker while the others are admitted behind it
+        busy = asyncio.create_task(service.transcribe_segments(clip(0), priority="routine_partial"))
+        await asyncio.to_thread(transcriber.started.wait, 5)
+        routine = [asyncio.create_task(service.transcribe_segments(clip(n), priority="routine_partial"))
+                   for n in range(1, 7)]
+        await asyncio.sleep(0.05)
+        urgent = asyncio.create_task(service.transcribe_segments(clip(99), priority="urgent_final"))
+        await asyncio.sleep(0.05)
+        transcriber.release.set()
+        await asyncio.gather(busy, urgent, *routine)
+        service.close()
+        return transcriber.order
+
+    order = asyncio.run(run())
+    assert order[:2] == [0, 99]
+    assert order[2:] == [1, 2, 3, 4, 5, 6]
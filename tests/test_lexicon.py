@@ -0,0 +1,34 @@
+import pytest
+
+from core.lexicon import BUILTIN_LEXICON, SymptomLexicon
+
+
+@pytest.fixture(params=["file", "builtin"])
+def lexicon(request):
+    if request.param == "file":
+        return SymptomLexicon.load()
+    return SymptomLexicon.from_dict(BUILTIN_LEXICON)
+
+
+@pytest.mark.parametrize("text", [
+    "I don't know, my chest pain is bad",
+    "No, I have chest pain",
+    "I am not feeling well, I have chest pain",
+    "I am not feeling well I have chest pain",
+    "I'm not sure but my chest pain is getting worse",
+])
+def test_negation_does_not_cross_clauses(lexicon, text):
+    assert "chest pain" in lexicon.detect(text)
+
+
+@pytest.mark.parametrize("text", [
+    "no chest pain",
+    "I don't have chest pain",
+    "Patient denies chest pain or dizziness",
+])
+def test_negated_symptoms_are_not_reported(lexicon, text):
+    assert "chest pain" not in lexicon.detect(text)
+
+
+def test_negation_stops_at_terminator(lexicon):
+    assert lexicon.detect("No fever but I have a cough") == ["cough"]
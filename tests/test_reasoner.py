@@ -0,0 +1,92 @@
+import asyncio
+
+import agents.reasoner as reasoner_module
+from agents.reasoner import ReasonerAgent
+from core.orchestrator import HospitalOrchestrator
+from core.state import PatientState
+
+
+class SlowClient:
+    """
+    Ollama client answering after `delay_s`.
+    """
+    def __init__(self, delay_s: float, response: str):
+        self.delay_s = delay_s
+        self.response = response
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, model, prompt, keep_alive=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"response": self.response}
+
+
+def slow_reasoner(monkeypatch, delay_s: float) -> ReasonerAgent:
+    monkeypatch.setattr(reasoner_module, "ollama", object())
+    reasoner = ReasonerAgent(model_name="stub", latency_budget_s=5)
+    reasoner._client = SlowClient(delay_s, "Risk Level: Moderate\nReasoning: Stub.")
+    return reasoner
+
+
+def test_superseded_run_cancels_its_llm_request(monkeypatch):
+    reasoner = slow_reasoner(monkeypatch, 5)
+
+    async def run():
+        run = asyncio.ensure_future(reasoner.process(PatientState(session_id="s", transcript="I feel dizzy")))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert (reasoner._client.calls, reasoner._client.cancelled) == (1, 1)
+    assert reasoner.cache.cancelled == 1
+
+
+def test_shared_llm_request_outlives_a_superseded_run(monkeypatch):
+    reasoner = slow_reasoner(monkeypatch, 0.2)
+
+    async def run():
+        first = asyncio.ensure_future(reasoner.process(PatientState(session_id="a", transcript="I feel dizzy")))
+        second = asyncio.ensure_future(reasoner.process(PatientState(session_id="b", transcript="I feel dizzy")))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await second
+
+    state = asyncio.run(run())
+    assert state.risk_level == "Moderate"
+    assert (reasoner._client.calls, reasoner._client.cancelled) == (1, 0)
+
+
+def test_late_critical_assessment_pages_staff(monkeypatch):
+    monkeypatch.setattr(reasoner_module, "ollama", object())
+    orchestrator = HospitalOrchestrator(ollama_model="stub", reasoning_budget_s=0.05, audit_dir=None)
+    reasoner = orchestrator.get_agent("ReasonerAgent")
+    reasoner._client = SlowClient(0.2, "Risk Level: Critical\nReasoning: Described symptoms of a stroke.")
+
+    async def run():
+        late = asyncio.Event()
+
+        async def on_late_assessment(state):
+            late.set()
+
+        reasoner.on_late_assessment = on_late_assessment
+        state = PatientState(session_id="late", transcript="My face feels strange and my words come out wrong")
+        # Detector, Reasoner, Planner, Executor
+        state = await orchestrator.run_pipeline(state, max_agents=4)
+        committed = (state.risk_level, [a["type"] for a in state.executed_actions])
+        await asyncio.wait_for(late.wait(), 5)
+        return committed, state
+
+    (risk_level, executed), state = asyncio.run(run())
+    assert risk_level == "Low"
+    assert "alert_staff" not in executed
+    assert state.risk_level == "Critical"
+    pages = [a for a in state.executed_actions if a["type"] == "alert_staff"]
+    assert [(a["priority"], a["status"]) for a in pages] == [("emergency", "success")]
+    assert state.human_in_the_loop_required
@@ -0,0 +1,86 @@
+import sys
+import threading
+import time
+import types
+
+from core.speech import SpeechWorker
+
+
+class SharedEngine:
+    """
+    pyttsx3 engine stand-in: one instance for every init() call, like pyttsx3's
+    engine cache, firing 'started-word' between words.
+    """
+    def __init__(self, word_s: float = 0.0):
+        self.word_s = word_s
+        self.callbacks = {}
+        self.spoken = []
+        self.started = threading.Event()
+        self._words = []
+        self._stopped = False
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+        return {"topic": topic, "cb": callback}
+
+    def disconnect(self, token):
+        self.callbacks[token["topic"]].remove(token["cb"])
+
+    def say(self, text):
+        self._words.extend(text.split())
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        words, self._words, self._stopped = self._words, [], False
+        self.started.set()
+        for location, word in enumerate(words):
+            for callback in list(self.callbacks.get("started-word", [])):
+                callback(None, location, len(word))
+            if self._stopped:
+                return
+            self.spoken.append(word)
+            time.sleep(self.word_s)
+
+
+def worker_on(engine, monkeypatch) -> SpeechWorker:
+    monkeypatch.setitem(sys.modules, "pyttsx3", types.SimpleNamespace(init=lambda *args, **kwargs: engine))
+    return SpeechWorker()
+
+
+def wait_for(condition, timeout_s: float = 5):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_preemption_hook_is_connected_only_while_speaking(monkeypatch):
+    engine = SharedEngine()
+    worker = worker_on(engine, monkeypatch)
+    worker.say("s1", "Thank you for sharing", "Low")
+    wait_for(lambda: worker.spoken == 1)
+
+    # Another user of the shared engine (e.g. Pyttsx3Backend) fires no worker callbacks
+    assert engine.callbacks["started-word"] == []
+    engine.say("Saving an alert clip")
+    engine.runAndWait()
+    assert engine.spoken[-4:] == ["Saving", "an", "alert", "clip"]
+    assert worker.preempted == 0
+
+
+def test_urgent_message_cuts_off_routine_one(monkeypatch):
+    engine = SharedEngine(word_s=0.02)
+    worker = worker_on(engine, monkeypatch)
+    worker.say("s1", " ".join(["routine"] * 50), "Low")
+    assert engine.started.wait(5)
+    worker.say("s2", "Help is on the way", "Critical")
+    wait_for(lambda: worker.spoken == 1 and worker._current is None and not worker.depth)
+
+    assert worker.preempted == 1
+    assert engine.spoken[-5:] == ["Help", "is", "on", "the", "way"]
+    assert engine.spoken.count("routine") < 50
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from core.streaming import StreamingTranscriber
+
+
+class SlowDecoder:
+    """
+    Stands in for a StreamDecoder whose ffmpeg process is slow to exit.
+    """
+    def __init__(self):
+        self.release = threading.Event()
+
+    def close(self):
+        self.release.wait(timeout=5)
+
+
+def test_reset_closes_decoder_off_the_event_loop():
+    async def run():
+        stream = StreamingTranscriber(inference=None)
+        decoder = stream._decoder = SlowDecoder()
+        reset = asyncio.create_task(stream.reset())
+        # The loop keeps running while the decoder closes
+        await asyncio.sleep(0.05)
+        assert not reset.done()
+        assert stream._decoder is None and stream.text == ""
+        decoder.release.set()
+        await asyncio.wait_for(reset, timeout=1)
+
+    asyncio.run(run())